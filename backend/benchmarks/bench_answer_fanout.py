@@ -0,0 +1,90 @@
+"""
+Times the analyze step's answer generation against a stub Ollama server that streams the
+short answer in about SHORT_SEC and the full answer in about FULL_SEC: one after the other
+(the old behaviour) versus llm.generate_answers fanning both out at once.
+
+Run from the repository root:
+    python backend/benchmarks/bench_answer_fanout.py
+"""
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+
+from aiohttp import web
+
+STUB_PORT = 11501
+SHORT_SEC = 1.0
+FULL_SEC = 3.0
+TOKENS = 20
+
+# Point the backend at the stub before it reads its settings
+os.environ["OLLAMA_BASE_URL"] = f"http://127.0.0.1:{STUB_PORT}"
+# Add the repository root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from backend.src.constants import OLLAMA_MODEL  # noqa: E402
+from backend.src import llm  # noqa: E402
+
+
+async def stub_tags(request):
+    # Answers the health monitor's probe
+    return web.json_response({"models": [{"name": OLLAMA_MODEL}]})
+
+
+async def stub_generate(request):
+    payload = await request.json()
+    short = "70 words" in payload["prompt"]
+    duration = SHORT_SEC if short else FULL_SEC
+    response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+    await response.prepare(request)
+    for i in range(TOKENS):
+        await asyncio.sleep(duration / TOKENS)
+        await response.write((json.dumps({"response": f"token{i} ", "done": False}) + "\n").encode())
+    await response.write((json.dumps({"response": "", "done": True}) + "\n").encode())
+    return response
+
+
+def run_stub(ready):
+    loop = asyncio.new_event_loop()
+    stub = web.Application()
+    stub.router.add_post("/api/generate", stub_generate)
+    stub.router.add_get("/api/tags", stub_tags)
+    runner = web.AppRunner(stub)
+    loop.run_until_complete(runner.setup())
+    loop.run_until_complete(web.TCPSite(runner, "127.0.0.1", STUB_PORT).start())
+    ready.set()
+    loop.run_forever()
+
+
+def main():
+    ready = threading.Event()
+    threading.Thread(target=run_stub, args=(ready,), daemon=True).start()
+    ready.wait()
+    # A different question for each run, so the second isn't answered from the response cache
+    questions = ["How would you design a rate limiter?", "How would you shard a database of user accounts?"]
+
+    start = time.perf_counter()
+    for options in llm.ANSWER_VARIANTS.values():
+        "".join(llm.generate_answer_stream(questions[0], **options))
+    sequential = time.perf_counter() - start
+
+    start = time.perf_counter()
+    first_token = {}
+    futures = llm.generate_answers(
+        questions[1], on_token=lambda name, token: first_token.setdefault(name, time.perf_counter() - start)
+    )
+    for future in futures.values():
+        future.result()
+    fan_out = time.perf_counter() - start
+
+    print(f"stub latency: short {SHORT_SEC:.1f} s, full {FULL_SEC:.1f} s")
+    print(f"sequential: {sequential:.2f} s")
+    print(f"fan-out:    {fan_out:.2f} s (first tokens: "
+          + ", ".join(f"{name} {1000 * t:.0f} ms" for name, t in first_token.items()) + ")")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Fires N parallel /ask/ requests at the API against a stub Ollama server with a fixed
+latency, and checks that they finish in about max(latency) rather than sum(latency)
+while the / health check stays fast. The transcript and answer caches are disabled, so
+every request reaches Whisper and the stub.
+
+Run from the repository root (needs Whisper, FastAPI and uvicorn installed):
+    python backend/benchmarks/bench_api_concurrency.py [N]
+"""
+import asyncio
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import soundfile as sf
+from aiohttp import ClientSession, FormData, web
+
+STUB_PORT = 11500
+API_PORT = 8765
+LLM_DELAY_SEC = 1.0
+
+# Point the backend at the stub and keep the caches in memory before it reads its settings
+os.environ["OLLAMA_BASE_URL"] = f"http://127.0.0.1:{STUB_PORT}"
+os.environ.pop("RESPONSE_CACHE_DB", None)
+os.environ.pop("TRANSCRIPT_CACHE_DB", None)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import uvicorn  # noqa: E402
+
+from backend.src.constants import OLLAMA_MODEL  # noqa: E402
+from main import app, response_cache, transcript_cache  # noqa: E402
+
+# Identical requests would otherwise be answered from the caches after the warm-up
+response_cache.max_entries = 0
+transcript_cache.max_entries = 0
+
+
+async def stub_tags(request):
+    # Answers the health monitor's probe
+    return web.json_response({"models": [{"name": OLLAMA_MODEL}]})
+
+
+async def stub_generate(request):
+    await asyncio.sleep(LLM_DELAY_SEC)
+    return web.json_response({"response": "stub answer"})
+
+
+def make_clip():
+    buffer = io.BytesIO()
+    sf.write(buffer, np.zeros(16000, dtype=np.float32), 16000, format="WAV")
+    return buffer.getvalue()
+
+
+async def ask(session, clip):
+    form = FormData()
+    form.add_field("audio", clip, filename="clip.wav", content_type="audio/wav")
+    form.add_field("use_llm", "true")
+    start = time.perf_counter()
+    async with session.post(f"http://127.0.0.1:{API_PORT}/ask/", data=form) as response:
+        await response.json()
+    return time.perf_counter() - start
+
+
+async def health(session):
+    start = time.perf_counter()
+    async with session.get(f"http://127.0.0.1:{API_PORT}/") as response:
+        await response.json()
+    return time.perf_counter() - start
+
+
+async def main(n):
+    stub = web.Application()
+    stub.router.add_post("/api/generate", stub_generate)
+    stub.router.add_get("/api/tags", stub_tags)
+    runner = web.AppRunner(stub)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", STUB_PORT).start()
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=API_PORT, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    clip = make_clip()
+    async with ClientSession() as session:
+        single = await ask(session, clip)  # also warms up the Whisper model
+
+        start = time.perf_counter()
+        asks = asyncio.gather(*(ask(session, clip) for _ in range(n)))
+        await asyncio.sleep(0.1)
+        health_latency = await health(session)
+        latencies = await asks
+        wall = time.perf_counter() - start
+
+    print(f"single /ask/: {single:.2f} s")
+    print(f"{n} parallel /ask/: {wall:.2f} s wall (max {max(latencies):.2f} s, sum {sum(latencies):.2f} s)")
+    print(f"health check under load: {1000 * health_latency:.1f} ms")
+
+    server.should_exit = True
+    await server_task
+    await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 8))
@@ -0,0 +1,62 @@
+"""
+Compares per-batch append cost of np.vstack growth against AudioBuffer.
+
+Run from the repository root:
+    python backend/benchmarks/bench_audio_buffer.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add the repository root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from backend.src.audio_buffer import AudioBuffer
+from backend.src.constants import RECORD_SEC, SAMPLE_RATE
+
+MINUTES = 60
+CHECKPOINTS = [1, 10, 30, 60]
+
+
+def bench(append, batch):
+    """Returns the mean append time (ms) over the last minute before each checkpoint."""
+    batches_per_minute = 60 // RECORD_SEC
+    results = {}
+    timings = []
+    for i in range(1, MINUTES * batches_per_minute + 1):
+        start = time.perf_counter()
+        append(batch)
+        timings.append(time.perf_counter() - start)
+        minute = i / batches_per_minute
+        if minute in CHECKPOINTS:
+            results[int(minute)] = 1000 * np.mean(timings[-batches_per_minute:])
+    return results
+
+
+def main():
+    batch = np.random.default_rng(0).standard_normal((SAMPLE_RATE * RECORD_SEC, 1)).astype(np.float32)
+
+    state = {"data": None}
+
+    def vstack_append(sample):
+        state["data"] = sample if state["data"] is None else np.vstack((state["data"], sample))
+
+    buffer = AudioBuffer()
+
+    vstack_results = bench(vstack_append, batch)
+    buffer_results = bench(buffer.append, batch)
+
+    print(f"{RECORD_SEC}s batches at {SAMPLE_RATE} Hz, mean append time (ms)")
+    print(f"{'minutes':>8} {'np.vstack':>12} {'AudioBuffer':>12}")
+    for minute in CHECKPOINTS:
+        print(f"{minute:>8} {vstack_results[minute]:>12.3f} {buffer_results[minute]:>12.3f}")
+
+    start = time.perf_counter()
+    buffer.to_array()
+    print(f"AudioBuffer.to_array() for {MINUTES} min: {1000 * (time.perf_counter() - start):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Compares Whisper's ffmpeg-based loader with the in-process soundfile loader on the same clips.
+
+Run from the repository root:
+    python backend/benchmarks/bench_audio_load.py [clip.wav ...]
+"""
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+# Add the repository root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from backend.src.audio_io import load_audio
+from backend.src.constants import WHISPER_SAMPLE_RATE
+
+DEFAULT_CLIPS = ["out.wav", os.path.join("output", "recorded_audio.wav"),
+                 os.path.join("backend", "src", "test_sounddevice.wav")]
+REPEATS = 20
+
+
+def ffmpeg_load(path):
+    """Same command whisper.audio.load_audio runs for every transcription."""
+    cmd = ["ffmpeg", "-nostdin", "-threads", "0", "-i", path, "-f", "s16le", "-ac", "1",
+           "-acodec", "pcm_s16le", "-ar", str(WHISPER_SAMPLE_RATE), "-"]
+    out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    return np.frombuffer(out, np.int16).flatten().astype(np.float32) / 32768.0
+
+
+def mean_ms(load, path):
+    load(path)  # warm-up
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        load(path)
+    return 1000 * (time.perf_counter() - start) / REPEATS
+
+
+def main():
+    clips = [clip for clip in (sys.argv[1:] or DEFAULT_CLIPS) if os.path.exists(clip)]
+    has_ffmpeg = shutil.which("ffmpeg") is not None
+    if not has_ffmpeg:
+        print("ffmpeg not found on PATH; timing the in-process loader only")
+
+    print(f"{'clip':<40} {'seconds':>8} {'ffmpeg ms':>10} {'soundfile ms':>13}")
+    for clip in clips:
+        seconds = len(load_audio(clip)) / WHISPER_SAMPLE_RATE
+        in_process = mean_ms(load_audio, clip)
+        ffmpeg = f"{mean_ms(ffmpeg_load, clip):10.2f}" if has_ffmpeg else f"{'-':>10}"
+        print(f"{clip:<40} {seconds:8.1f} {ffmpeg} {in_process:13.2f}")
+
+
+if __name__ == "__main__":
+    main()
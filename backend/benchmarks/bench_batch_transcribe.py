@@ -0,0 +1,44 @@
+"""
+Compares clips/sec of a per-file transcribe_audio_locally loop against transcribe_batch_locally.
+
+Run from the repository root (needs Whisper installed):
+    python backend/benchmarks/bench_batch_transcribe.py [N] [clip.wav ...]
+"""
+import os
+import sys
+import time
+
+# Add the repository root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from backend.src.local_whisper import get_model, load_samples, transcribe_audio_locally, transcribe_batch_locally
+
+DEFAULT_CLIPS = ["out.wav", os.path.join("output", "recorded_audio.wav"),
+                 os.path.join("backend", "src", "test_sounddevice.wav")]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    sources = [clip for clip in (sys.argv[2:] or DEFAULT_CLIPS) if os.path.exists(clip)]
+    # Decode up front so both runs measure transcription only
+    clips = [load_samples(sources[i % len(sources)]) for i in range(n)]
+
+    get_model()
+    transcribe_audio_locally(clips[0])  # warm-up
+
+    start = time.perf_counter()
+    for clip in clips:
+        transcribe_audio_locally(clip)
+    loop_sec = time.perf_counter() - start
+
+    start = time.perf_counter()
+    transcribe_batch_locally(clips)
+    batch_sec = time.perf_counter() - start
+
+    print(f"{n} clips")
+    print(f"per-file loop: {n / loop_sec:6.2f} clips/sec")
+    print(f"batched:       {n / batch_sec:6.2f} clips/sec ({loop_sec / batch_sec:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
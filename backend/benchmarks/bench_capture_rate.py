@@ -0,0 +1,77 @@
+"""
+Compares a 44.1 kHz recording with the same audio captured at 16 kHz:
+file size, in-stream resampling cost and (if Whisper is installed) time to transcript.
+
+Run from the repository root:
+    python backend/benchmarks/bench_capture_rate.py [path/to/speech.wav]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import soundfile as sf
+
+# Add the repository root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from backend.src.constants import BLOCK_SIZE, WHISPER_SAMPLE_RATE
+from backend.src.resample import PolyphaseResampler
+
+FULL_BAND_RATE = 44100
+DURATION_SEC = 60
+
+
+def load_clip(path=None):
+    """Returns a mono 44.1 kHz clip: the given file if any, otherwise a synthetic tone mix."""
+    if path:
+        data, rate = sf.read(path, dtype="float32", always_2d=True)
+        data = data.mean(axis=1)
+        if rate != FULL_BAND_RATE:
+            data = PolyphaseResampler(rate, FULL_BAND_RATE).process(data)
+        return data
+    t = np.arange(FULL_BAND_RATE * DURATION_SEC) / FULL_BAND_RATE
+    return (0.3 * np.sin(2 * np.pi * 220 * t) * np.sin(2 * np.pi * 0.5 * t)).astype(np.float32)
+
+
+def stream_resample(clip):
+    """Resamples the clip block by block, the way AudioCapture does in its callback."""
+    resampler = PolyphaseResampler(FULL_BAND_RATE, WHISPER_SAMPLE_RATE)
+    block = BLOCK_SIZE * FULL_BAND_RATE // WHISPER_SAMPLE_RATE
+    return np.concatenate([resampler.process(clip[i:i + block]) for i in range(0, len(clip), block)])
+
+
+def time_transcript(path):
+    try:
+        from backend.src.local_whisper import get_model, transcribe_audio_locally
+    except ImportError:
+        return None
+    get_model()  # keep model loading out of the measurement
+    start = time.perf_counter()
+    transcribe_audio_locally(path)
+    return time.perf_counter() - start
+
+
+def main():
+    clip = load_clip(sys.argv[1] if len(sys.argv) > 1 else None)
+
+    start = time.perf_counter()
+    clip_16k = stream_resample(clip)
+    resample_sec = time.perf_counter() - start
+    audio_sec = len(clip) / FULL_BAND_RATE
+    print(f"In-stream resampling of {audio_sec:.0f}s: {1000 * resample_sec:.1f} ms "
+          f"({audio_sec / resample_sec:.0f}x real time)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, data, rate in [("44.1 kHz", clip, FULL_BAND_RATE), ("16 kHz", clip_16k, WHISPER_SAMPLE_RATE)]:
+            path = os.path.join(tmp, f"{rate}.wav")
+            sf.write(path, data, rate)
+            size_kb = os.path.getsize(path) / 1024
+            elapsed = time_transcript(path)
+            transcript = "whisper not installed" if elapsed is None else f"{elapsed:.2f} s to transcript"
+            print(f"{label:>9}: {size_kb:8.0f} KB, {transcript}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Compares the compiled IntentMatcher with the old per-category substring scans on a large
+synthetic corpus of transcripts: throughput, and how often the two disagree (the old scans
+match inside words, e.g. "hi" in "this" or "hour" in "your", and never match "ATM" in
+lower-cased text). A false hit lets the old scans stop early, so they are also timed on
+transcripts with no keywords and no such traps, where every keyword has to be scanned.
+
+Run from the repository root:
+    python backend/benchmarks/bench_intent_matcher.py [transcripts]
+"""
+import os
+import random
+import sys
+import time
+
+# Add the repository root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from backend.src.llm import BANKING_KEYWORDS, is_banking_question  # noqa: E402
+from backend.src.response_generator import ResponseGenerator  # noqa: E402
+
+# Interview-style filler, with an intent or banking keyword dropped into a fifth of the transcripts
+FILLER = (
+    "so how would you go about designing a system that handles millions of requests per second while keeping "
+    "latency low and making sure the data stays consistent across regions tell me about the tradeoffs we "
+    "considered what happened when the deployment failed and how did the team recover walk me through the "
+    "approach to testing processes deadline"
+).split()
+# Words the old substring scans match by mistake
+TRAPS = "this which thinking sometimes anytime your hourly embankment".split()
+KEYWORDS = (
+    "customer loan credit statement compliance risk payment fraud KYC ATM deposit mortgage interest rate "
+    "hello hi hey thanks thank you goodbye weather forecast time clock"
+).split()
+
+
+def make_transcript(rng, keywords=True):
+    words = rng.choices(FILLER + TRAPS if keywords else FILLER, k=rng.randint(15, 60))
+    if keywords and rng.random() < 0.2:
+        words[rng.randrange(len(words))] = rng.choice(KEYWORDS)
+    return " ".join(words).capitalize() + "?"
+
+
+def legacy_category(query, keywords):
+    query_lower = query.lower()
+    for category, words in keywords.items():
+        if any(word in query_lower for word in words):
+            return category
+    return "default"
+
+
+def legacy_is_banking(transcript):
+    lower_transcript = transcript.lower()
+    return any(keyword in lower_transcript for keyword in BANKING_KEYWORDS)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = random.Random(0)
+    corpora = {
+        "mixed": [make_transcript(rng) for _ in range(n)],
+        "keyword-free": [make_transcript(rng, keywords=False) for _ in range(n)],
+    }
+    generator = ResponseGenerator()
+
+    def new_category(query):
+        intents = generator.matcher.match(query)
+        return next((category for category in generator.keywords if category in intents), "default")
+
+    for corpus_name, corpus in corpora.items():
+        print(f"{n:,} {corpus_name} transcripts:")
+        results = {}
+        for name, fn in [
+            ("legacy categories", lambda q: legacy_category(q, generator.keywords)),
+            ("matcher categories", new_category),
+            ("legacy banking", legacy_is_banking),
+            ("matcher banking", is_banking_question),
+        ]:
+            start = time.perf_counter()
+            results[name] = [fn(query) for query in corpus]
+            elapsed = time.perf_counter() - start
+            print(f"  {name:20s} {elapsed:6.2f} s  ({n / elapsed:,.0f} transcripts/s)")
+
+        for kind in ("categories", "banking"):
+            differ = sum(a != b for a, b in zip(results[f"legacy {kind}"], results[f"matcher {kind}"]))
+            print(f"  {kind}: matcher and legacy disagree on {differ / n:.1%} of transcripts")
+
+
+if __name__ == "__main__":
+    main()
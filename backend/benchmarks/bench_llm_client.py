@@ -0,0 +1,94 @@
+"""
+Measures per-call overhead of the pooled Ollama clients against a stub server that answers
+instantly, compared with a bare requests.post and a fresh aiohttp session per call (a new
+TCP connection each time, as the answer functions used to do).
+
+Run from the repository root:
+    python backend/benchmarks/bench_llm_client.py [calls]
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import aiohttp
+import requests
+from aiohttp import web
+
+STUB_PORT = 11502
+STUB_URL = f"http://127.0.0.1:{STUB_PORT}/api/generate"
+
+# Point the backend at the stub before it reads its settings
+os.environ["OLLAMA_BASE_URL"] = f"http://127.0.0.1:{STUB_PORT}"
+# Add the repository root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from backend.src.llm_client import AsyncOllamaClient, OllamaClient  # noqa: E402
+
+PAYLOAD = {"prompt": "ping", "model": "stub"}
+
+
+async def stub_generate(request):
+    await request.read()
+    return web.json_response({"response": "pong", "done": True})
+
+
+def run_stub(ready):
+    loop = asyncio.new_event_loop()
+    stub = web.Application()
+    stub.router.add_post("/api/generate", stub_generate)
+    runner = web.AppRunner(stub)
+    loop.run_until_complete(runner.setup())
+    loop.run_until_complete(web.TCPSite(runner, "127.0.0.1", STUB_PORT).start())
+    ready.set()
+    loop.run_forever()
+
+
+def time_calls(call, n):
+    call()  # warm-up
+    start = time.perf_counter()
+    for _ in range(n):
+        call()
+    return 1000 * (time.perf_counter() - start) / n
+
+
+async def time_async_calls(call, n):
+    await call()
+    start = time.perf_counter()
+    for _ in range(n):
+        await call()
+    return 1000 * (time.perf_counter() - start) / n
+
+
+async def bare_aiohttp():
+    async with aiohttp.ClientSession() as session:
+        async with session.post(STUB_URL, json=PAYLOAD) as response:
+            await response.json()
+
+
+async def run_async(n):
+    client = AsyncOllamaClient()
+    bare = await time_async_calls(bare_aiohttp, n)
+    pooled = await time_async_calls(lambda: client.generate(PAYLOAD), n)
+    await client.close()
+    return bare, pooled
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    ready = threading.Event()
+    threading.Thread(target=run_stub, args=(ready,), daemon=True).start()
+    ready.wait()
+
+    client = OllamaClient()
+    bare = time_calls(lambda: requests.post(STUB_URL, json=PAYLOAD, timeout=30).json(), n)
+    pooled = time_calls(lambda: client.generate(PAYLOAD), n)
+    print(f"sync,  {n} calls: bare requests.post {bare:.2f} ms/call, pooled client {pooled:.2f} ms/call")
+
+    bare, pooled = asyncio.run(run_async(n))
+    print(f"async, {n} calls: session per call {bare:.2f} ms/call, pooled client {pooled:.2f} ms/call")
+
+
+if __name__ == "__main__":
+    main()
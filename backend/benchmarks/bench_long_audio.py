@@ -0,0 +1,63 @@
+"""
+Reports wall-clock time of parallel chunked transcription against worker count on a long
+fixture, compared with a single sequential model.transcribe pass.
+
+Run from the repository root (needs Whisper installed):
+    python backend/benchmarks/bench_long_audio.py [minutes] [clip.wav ...]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add the repository root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from backend.src.constants import WHISPER_SAMPLE_RATE
+from backend.src.local_whisper import get_model, load_samples, make_chunk_executor, transcribe_long_audio
+
+DEFAULT_CLIPS = ["out.wav", os.path.join("output", "recorded_audio.wav"),
+                 os.path.join("backend", "src", "test_sounddevice.wav")]
+
+
+def build_fixture(minutes, sources):
+    """Tiles the source clips with 1-3 s pauses until the fixture is `minutes` long."""
+    rng = np.random.default_rng(0)
+    clips = [load_samples(source) for source in sources]
+    parts, total = [], 0
+    while total < minutes * 60 * WHISPER_SAMPLE_RATE:
+        clip = clips[len(parts) % len(clips)]
+        pause = np.zeros(int(rng.uniform(1, 3) * WHISPER_SAMPLE_RATE), dtype=np.float32)
+        parts += [clip, pause]
+        total += len(clip) + len(pause)
+    return np.concatenate(parts)
+
+
+def main():
+    minutes = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    sources = [clip for clip in (sys.argv[2:] or DEFAULT_CLIPS) if os.path.exists(clip)]
+    fixture = build_fixture(minutes, sources)
+    cores = os.cpu_count() or 1
+    print(f"{len(fixture) / WHISPER_SAMPLE_RATE / 60:.1f} min fixture, {cores} cores")
+
+    start = time.perf_counter()
+    get_model().transcribe(fixture)
+    sequential = time.perf_counter() - start
+    print(f"{'sequential':>12}: {sequential:7.1f} s")
+
+    workers = 1
+    while workers <= cores:
+        executor = make_chunk_executor(workers)
+        # Occupy every worker once so all models are loaded before timing
+        list(executor.map(time.sleep, [1.0] * workers))
+        start = time.perf_counter()
+        transcribe_long_audio(fixture, executor=executor)
+        elapsed = time.perf_counter() - start
+        executor.shutdown()
+        print(f"{workers:>4} workers: {elapsed:7.1f} s ({sequential / elapsed:.2f}x)")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Compares upload -> first answer token for /ask/stream, sequential (transcribe the whole
+clip, then answer) versus pipelined (answer from the first utterances while the rest is
+transcribed), against a stub Ollama server whose prefill time grows with the prompt.
+Runs alternate between the two modes, with the answer and transcript caches cleared
+before each, after one warm-up run.
+
+Pipelined mode helps spoken questions with pauses in them; a clip with no pause longer
+than PIPELINE_PAUSE_SEC is a single utterance and behaves like the sequential path.
+
+Run from the repository root (needs Whisper, FastAPI and uvicorn installed), on a
+recording of a spoken question (default: the desktop app's last recording):
+    python backend/benchmarks/bench_pipelined_ask.py [clip.wav] [runs]
+"""
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+from aiohttp import ClientSession, FormData, web
+
+STUB_PORT = 11503
+API_PORT = 8766
+PREFILL_SEC_PER_CHAR = 0.002  # about 8 ms per token, a 7B model on CPU
+TOKEN_SEC = 0.05
+TOKENS = 40
+
+# Point the backend at the stub before it reads its settings
+os.environ["OLLAMA_BASE_URL"] = f"http://127.0.0.1:{STUB_PORT}"
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import uvicorn  # noqa: E402
+
+from backend.src.constants import OLLAMA_MODEL, OUTPUT_FILE_NAME  # noqa: E402
+from main import app, response_cache, transcript_cache  # noqa: E402
+
+
+async def stub_tags(request):
+    # Answers the health monitor's probe
+    return web.json_response({"models": [{"name": OLLAMA_MODEL}]})
+
+
+async def stub_generate(request):
+    payload = await request.json()
+    await asyncio.sleep(PREFILL_SEC_PER_CHAR * len(payload["prompt"]))
+    response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+    await response.prepare(request)
+    for i in range(TOKENS):
+        await response.write((json.dumps({"response": f"token{i} ", "done": False}) + "\n").encode())
+        await asyncio.sleep(TOKEN_SEC)
+    await response.write((json.dumps({"response": "", "done": True}) + "\n").encode())
+    return response
+
+
+async def ask(session, clip, pipelined):
+    """Returns (first token, first token of the final answer, done) times in seconds, and the restarts."""
+    form = FormData()
+    form.add_field("audio", clip, filename="clip.wav", content_type="audio/wav")
+    form.add_field("pipelined", "true" if pipelined else "false")
+    start = time.perf_counter()
+    first_token = final_first_token = None
+    restarts = 0
+    async with session.post(f"http://127.0.0.1:{API_PORT}/ask/stream", data=form) as response:
+        event = None
+        async for line in response.content:
+            line = line.decode().strip()
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif event == "token" and final_first_token is None:
+                final_first_token = time.perf_counter() - start
+                first_token = first_token or final_first_token
+            elif event == "restart":
+                restarts += 1
+                final_first_token = None
+            elif event == "error":
+                raise RuntimeError(line)
+    return first_token, final_first_token, time.perf_counter() - start, restarts
+
+
+async def main(path, runs):
+    with open(path, "rb") as f:
+        clip = f.read()
+
+    stub = web.Application()
+    stub.router.add_post("/api/generate", stub_generate)
+    stub.router.add_get("/api/tags", stub_tags)
+    runner = web.AppRunner(stub)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", STUB_PORT).start()
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=API_PORT, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    results = {False: [], True: []}
+    async with ClientSession() as session:
+        await ask(session, clip, pipelined=False)  # warms up Whisper
+        for _ in range(runs):
+            for pipelined in (False, True):
+                response_cache.clear()
+                transcript_cache.clear()
+                results[pipelined].append(await ask(session, clip, pipelined))
+
+    print(f"{path}, {runs} runs per mode, stub prefill {1000 * PREFILL_SEC_PER_CHAR:.0f} ms/char, "
+          f"{TOKENS} tokens at {1000 * TOKEN_SEC:.0f} ms")
+    for pipelined, name in ((False, "sequential"), (True, "pipelined")):
+        first, final_first, done, restarts = zip(*results[pipelined])
+        print(f"  {name:10s} first token {statistics.median(first):.2f} s, "
+              f"first token of final answer {statistics.median(final_first):.2f} s, "
+              f"done {statistics.median(done):.2f} s, restarts {sum(restarts)}")
+
+    server.should_exit = True
+    await server_task
+    await runner.cleanup()
+
+
+if __name__ == "__main__":
+    clip_path = sys.argv[1] if len(sys.argv) > 1 else OUTPUT_FILE_NAME
+    if not os.path.exists(clip_path):
+        sys.exit(f"No recording at {clip_path}: record a question in the desktop app or pass a WAV file")
+    asyncio.run(main(clip_path, int(sys.argv[2]) if len(sys.argv) > 2 else 5))
@@ -0,0 +1,112 @@
+"""
+Measures time to first token for the answer prompt with its static preamble first (as the
+app sends it) and with the question first, against a stub Ollama server that, like a
+loaded model's KV cache, only prefills the prompt tokens after the prefix it shares with
+the previous prompt, at PREFILL_MS_PER_TOKEN per token, one word per token.
+
+Run from the repository root:
+    python backend/benchmarks/bench_prompt_prefix.py [questions]
+"""
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+
+from aiohttp import web
+
+STUB_PORT = 11503
+PREFILL_MS_PER_TOKEN = 4
+
+# Point the backend at the stub before it reads its settings
+os.environ["OLLAMA_BASE_URL"] = f"http://127.0.0.1:{STUB_PORT}"
+# Add the repository root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from backend.src.constants import OLLAMA_MODEL  # noqa: E402
+from backend.src.llm import build_answer_payload  # noqa: E402
+from backend.src.llm_client import OllamaClient  # noqa: E402
+
+QUESTIONS = [
+    "How would you design a URL shortener?",
+    "What is the difference between a process and a thread?",
+    "How do you handle KYC checks for a new retail banking customer?",
+    "Explain REST versus GraphQL.",
+    "Tell me about a time you handled a fraud incident at the bank.",
+]
+QUESTION_MARKER = "Question (transcribed audio):"
+
+previous_prompt = []
+
+
+async def stub_tags(request):
+    # Answers the health monitor's probe
+    return web.json_response({"models": [{"name": OLLAMA_MODEL}]})
+
+
+async def stub_generate(request):
+    global previous_prompt
+    payload = await request.json()
+    tokens = payload["prompt"].split()
+    shared = 0
+    while shared < min(len(tokens), len(previous_prompt)) and tokens[shared] == previous_prompt[shared]:
+        shared += 1
+    previous_prompt = tokens
+    evaluated = len(tokens) - shared
+    await asyncio.sleep(evaluated * PREFILL_MS_PER_TOKEN / 1000)
+    response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+    await response.prepare(request)
+    for word in ["stub", " answer"]:
+        await response.write((json.dumps({"response": word, "done": False}) + "\n").encode())
+    await response.write((json.dumps({"response": "", "done": True}) + "\n").encode())
+    return response
+
+
+def run_stub(ready):
+    loop = asyncio.new_event_loop()
+    stub = web.Application()
+    stub.router.add_post("/api/generate", stub_generate)
+    stub.router.add_get("/api/tags", stub_tags)
+    runner = web.AppRunner(stub)
+    loop.run_until_complete(runner.setup())
+    loop.run_until_complete(web.TCPSite(runner, "127.0.0.1", STUB_PORT).start())
+    ready.set()
+    loop.run_forever()
+
+
+def question_first(payload):
+    """The same prompt with the question moved in front of the preamble."""
+    preamble, question = payload["prompt"].split(QUESTION_MARKER)
+    return {**payload, "prompt": QUESTION_MARKER + question + preamble}
+
+
+def time_to_first_token(client, payloads):
+    latencies = []
+    for payload in payloads:
+        start = time.perf_counter()
+        stream = client.stream(payload)
+        next(stream)
+        latencies.append(1000 * (time.perf_counter() - start))
+        for _ in stream:
+            pass
+    return latencies
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    payloads = [build_answer_payload(QUESTIONS[i % len(QUESTIONS)], short_answer=False) for i in range(n)]
+    ready = threading.Event()
+    threading.Thread(target=run_stub, args=(ready,), daemon=True).start()
+    ready.wait()
+
+    client = OllamaClient()
+    print(f"{n} questions, {PREFILL_MS_PER_TOKEN} ms prefill per uncached token")
+    for name, ordered in (("question first", [question_first(p) for p in payloads]), ("preamble first", payloads)):
+        previous_prompt.clear()
+        latencies = time_to_first_token(client, ordered)
+        print(f"{name}: first token median {sorted(latencies)[n // 2]:.0f} ms, max {max(latencies):.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Streams utterances separated by pauses to /ws/transcribe in real time and measures the
+latency from the end of each utterance to its final transcript.
+
+Start the API first (e.g. `uvicorn main:app` from backend/), then from the repository root:
+    python backend/benchmarks/bench_stream_latency.py [ws://127.0.0.1:8000/ws/transcribe] [clip.wav]
+"""
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+from aiohttp import ClientSession, WSMsgType
+
+# Add the repository root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from backend.src.audio_io import load_audio
+from backend.src.constants import WHISPER_SAMPLE_RATE
+
+CHUNK_SEC = 0.1
+UTTERANCES = 5
+PAUSE_SEC = 2.0
+
+
+async def main(url, clip_path):
+    clip = load_audio(clip_path)
+    rng = np.random.default_rng(0)
+    speech_ends = []  # sample index at which each utterance ends
+    parts = []
+    total = 0
+    for _ in range(UTTERANCES):
+        pause = (rng.standard_normal(int(PAUSE_SEC * WHISPER_SAMPLE_RATE)) * 0.002).astype(np.float32)
+        parts += [pause, clip]
+        total += len(pause) + len(clip)
+        speech_ends.append(total)
+    parts.append((rng.standard_normal(int(PAUSE_SEC * WHISPER_SAMPLE_RATE)) * 0.002).astype(np.float32))
+    pcm = (np.clip(np.concatenate(parts), -1, 1) * 32767).astype(np.int16)
+
+    sent_at = {}  # utterance index -> time its last sample was sent
+    latencies = []
+
+    async with ClientSession() as session:
+        async with session.ws_connect(url) as ws:
+            async def send():
+                chunk = int(CHUNK_SEC * WHISPER_SAMPLE_RATE)
+                for start in range(0, len(pcm), chunk):
+                    await ws.send_bytes(pcm[start:start + chunk].tobytes())
+                    for i, end in enumerate(speech_ends):
+                        if start < end <= start + chunk:
+                            sent_at[i] = time.perf_counter()
+                    await asyncio.sleep(CHUNK_SEC)  # real-time pacing
+                await ws.send_str("end")
+
+            sender = asyncio.create_task(send())
+            finals = 0
+            async for message in ws:
+                if message.type != WSMsgType.TEXT:
+                    break
+                event = message.json()
+                if event["type"] == "final" and finals in sent_at:
+                    latencies.append(1000 * (time.perf_counter() - sent_at[finals]))
+                    print(f"final {finals}: {latencies[-1]:.0f} ms (server {event['latency_ms']:.0f} ms) "
+                          f"{event['text'][:40]!r}")
+                    finals += 1
+            await sender
+
+    if latencies:
+        print(f"end of speech -> final: median {np.median(latencies):.0f} ms, max {max(latencies):.0f} ms")
+
+
+if __name__ == "__main__":
+    url = sys.argv[1] if len(sys.argv) > 1 else "ws://127.0.0.1:8000/ws/transcribe"
+    clip = sys.argv[2] if len(sys.argv) > 2 else "out.wav"
+    asyncio.run(main(url, clip))
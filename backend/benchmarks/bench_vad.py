@@ -0,0 +1,71 @@
+"""
+Measures how much audio the VAD removes from an interview-style recording (speech separated
+by silence, background noise and key clicks) and the transcription time it saves.
+
+Run from the repository root:
+    python backend/benchmarks/bench_vad.py [clip.wav ...]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add the repository root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from backend.src.audio_io import load_audio
+from backend.src.constants import WHISPER_SAMPLE_RATE
+from backend.src.vad import trim_silence
+
+DEFAULT_CLIPS = ["out.wav", os.path.join("output", "recorded_audio.wav"),
+                 os.path.join("backend", "src", "test_sounddevice.wav")]
+
+
+def build_fixture(sources, rng):
+    """Speech clips separated by 3-10 s of low noise with occasional key clicks."""
+    parts = []
+    for clip in [load_audio(source) for source in sources] * 2:
+        gap = (rng.standard_normal(int(rng.uniform(3, 10) * WHISPER_SAMPLE_RATE)) * 0.002).astype(np.float32)
+        for _ in range(3):
+            at = rng.integers(0, len(gap) - 80)
+            gap[at:at + 80] += rng.standard_normal(80).astype(np.float32) * 0.3
+        parts += [gap, clip]
+    return np.concatenate(parts)
+
+
+def time_transcription(samples, vad):
+    try:
+        from backend.src.local_whisper import transcribe_audio_locally
+        start = time.perf_counter()
+        transcribe_audio_locally(samples, vad=vad)
+        return time.perf_counter() - start
+    except Exception:
+        return None
+
+
+def main():
+    sources = [clip for clip in (sys.argv[1:] or DEFAULT_CLIPS) if os.path.exists(clip)]
+    fixture = build_fixture(sources, np.random.default_rng(0))
+
+    start = time.perf_counter()
+    speech, regions = trim_silence(fixture)
+    vad_sec = time.perf_counter() - start
+
+    total = len(fixture) / WHISPER_SAMPLE_RATE
+    kept = len(speech) / WHISPER_SAMPLE_RATE
+    print(f"audio: {total:.1f}s, kept {kept:.1f}s in {len(regions)} region(s), "
+          f"removed {total - kept:.1f}s ({100 * (1 - kept / total):.0f}%)")
+    print(f"VAD time: {1000 * vad_sec:.1f} ms")
+
+    without_vad = time_transcription(fixture, vad=False)
+    if without_vad is None:
+        print("Whisper unavailable; skipping transcription timing")
+        return
+    with_vad = time_transcription(fixture, vad=True)
+    print(f"transcription: {without_vad:.2f}s without VAD, {with_vad:.2f}s with VAD "
+          f"(saved {without_vad - with_vad:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,51 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import List
+import numpy as np
+import soundfile as sf
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-import os
-from src.local_transcription import transcribe_local, generate_answer_with_ollama
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from loguru import logger
+from src.local_transcription import (transcribe_local, transcribe_upload, transcribe_uploads_batch,
+                                     DeadlineExceeded, OllamaError, async_ollama_client,
+                                     generate_answer_with_ollama_async,
+                                     response_cache, stream_answer_with_ollama_async, transcript_cache,
+                                     transcript_key)
+from src.audio_io import load_audio
 from src.response_generator import ResponseGenerator
-from src.constants import OUTPUT_FILE_NAME
+from src.constants import (DISCONNECT_POLL_SEC, JOB_RETRY_AFTER_SEC, OLLAMA_MAX_CONCURRENT, STREAM_MAX_CONNECTIONS,
+                           STREAM_PARTIAL_SEC, STREAM_QUEUE_CHUNKS, TRANSCRIBE_BATCH_SIZE, TRANSCRIBE_WORKERS,
+                           WHISPER_SAMPLE_RATE)
+from src.job_queue import JobQueue, QueueFull
+from src.pipelined_ask import pipelined_answer, split_segments
+from src.resample import PolyphaseResampler
+from src.stream_segmenter import StreamSegmenter
+from src.whisper_pool import WhisperPool
+
+# Whisper is CPU-bound, so it runs in worker processes instead of blocking the event loop
+whisper_pool = WhisperPool()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load and warm up the models before the first request arrives
+    await asyncio.get_running_loop().run_in_executor(None, whisper_pool.start)
+    async_ollama_client.health.start()
+    job_queue.start()
+    yield
+    await job_queue.stop()
+    whisper_pool.shutdown()
+    async_ollama_client.health.stop()
+    await async_ollama_client.close()
 
 # Set up FastAPI app
 app = FastAPI(
     title="Voice Recognition AI REST API",
     description="Endpoints for uploading audio, transcription, and generating LLM or rule-based responses.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -22,52 +58,464 @@ app.add_middleware(
 
 response_generator = ResponseGenerator()
 
+async def run_transcription(audio: UploadFile):
+    return await transcribe_data(await audio.read(), audio.filename)
+
+async def transcribe_data(data: bytes, filename: str):
+    try:
+        # Decoding here is cheap and lets repeat uploads skip the Whisper workers via the transcript cache
+        samples = await asyncio.get_running_loop().run_in_executor(None, load_audio, data)
+    except sf.LibsndfileError:
+        return await asyncio.wrap_future(whisper_pool.submit(transcribe_upload, data, filename))
+
+    key = transcript_key(samples, parallel=False)
+    transcript = transcript_cache.get(key)
+    if transcript is None:
+        transcript = await asyncio.wrap_future(whisper_pool.submit(transcribe_local, samples, False, False))
+        if not transcript.startswith("Transcription error"):
+            transcript_cache.put(key, transcript)
+    return transcript
+
+async def transcribe_samples(samples):
+    # Stream utterances and partials are never repeated, so they bypass the transcript cache
+    return await asyncio.wrap_future(whisper_pool.submit(transcribe_local, samples, False, False))
+
+async def segment_transcripts(data: bytes, filename: str):
+    """
+    Yields the transcripts of the utterances in an upload, in order. All utterances are
+    queued on the Whisper pool at once, so the first is ready well before the whole clip.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        samples = await loop.run_in_executor(None, load_audio, data)
+    except sf.LibsndfileError:
+        yield await asyncio.wrap_future(whisper_pool.submit(transcribe_upload, data, filename))
+        return
+    cached = transcript_cache.get(transcript_key(samples, parallel=False))
+    if cached is not None:
+        yield cached
+        return
+
+    segments = await loop.run_in_executor(None, split_segments, samples)
+    futures = [whisper_pool.submit(transcribe_local, segment, False, False) for segment in segments]
+    # If the caller gives up (client gone, answer failed), the queued utterances still finish
+    # on the pool and their transcripts are discarded; only the wait is cancelled
+    for future in futures:
+        yield await asyncio.shield(asyncio.wrap_future(future))
+
+class ClientDisconnected(Exception):
+    pass
+
+async def until_disconnected(request: Request, awaitable):
+    """
+    Awaits `awaitable`, cancelling it if the client disconnects first, so an answer nobody
+    is waiting for stops generating in Ollama. Raises ClientDisconnected in that case.
+    """
+    task = asyncio.ensure_future(awaitable)
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SEC)
+        if done:
+            return task.result()
+        if await request.is_disconnected():
+            task.cancel()
+            logger.info("Client disconnected, answer cancelled")
+            raise ClientDisconnected()
+
+def answer_with_llm(use_llm: bool):
+    """Whether to answer with the LLM: while Ollama's circuit is open, answers come from the rules instead."""
+    if use_llm and async_ollama_client.health.is_open():
+        logger.warning("Ollama is unavailable, answering with the rule-based generator")
+        return False
+    return use_llm
+
+async def rule_based_stream(transcript: str):
+    yield response_generator.generate_response(transcript)
+
+async def ask_pipelined(data: bytes, filename: str, use_llm: bool):
+    """
+    Transcript, answer and whether it was truncated, for /ask/ in pipelined mode (see
+    pipelined_answer). A failed generation becomes the answer text, as in the non-pipelined
+    mode, and transcription carries on so the transcript is still returned.
+    """
+    async def llm_stream(question):
+        started = False
+        try:
+            async for token in stream_answer_with_ollama_async(question):
+                started = True
+                yield token
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.error(f"Error generating answer: {e}")
+            if isinstance(e, OllamaError):
+                error = f"Error generating answer: {e}"
+            else:
+                error = "Sorry, I couldn't generate an answer. Make sure Ollama is running correctly."
+            yield f"\n{error}" if started else error
+
+    answer_stream = llm_stream if use_llm else rule_based_stream
+    transcript, parts, truncated = "", [], False
+    async for kind, value in pipelined_answer(segment_transcripts(data, filename), answer_stream):
+        if kind == "token":
+            parts.append(value)
+        elif kind == "restart":
+            parts.clear()
+        elif kind == "transcript":
+            transcript = value
+        elif kind == "done":
+            truncated = value
+    return transcript, "".join(parts), truncated
+
+# Status for a request the client gave up on (nobody reads it, but it shows up in access logs)
+CLIENT_CLOSED_REQUEST = 499
+
 @app.get("/")
 def health_check():
     return {"status": "ok", "message": "Voice Recognition AI backend is running."}
 
+@app.get("/health/ollama")
+def ollama_status():
+    """Whether Ollama is reachable and has the model loaded, and the state of its circuit breaker."""
+    return async_ollama_client.health.status()
+
+@app.get("/cache/stats")
+def cache_stats():
+    """Answer and transcript cache hit rates, and the generation time the answer cache has saved."""
+    return {"responses": response_cache.stats(), "transcripts": transcript_cache.stats()}
+
 @app.post("/transcribe/")
 async def transcribe_audio(audio: UploadFile = File(...)):
     try:
-        os.makedirs(os.path.dirname(OUTPUT_FILE_NAME), exist_ok=True)
-        with open(OUTPUT_FILE_NAME, "wb") as f:
-            f.write(await audio.read())
-        transcript = transcribe_local(OUTPUT_FILE_NAME)
+        transcript = await run_transcription(audio)
         return {"transcript": transcript}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Transcription failed: {e}")
-    finally:
-        if os.path.exists(OUTPUT_FILE_NAME):
-            os.remove(OUTPUT_FILE_NAME)
+
+@app.post("/transcribe/batch")
+async def transcribe_batch(audios: List[UploadFile] = File(...)):
+    """
+    Transcribe many clips at once. Batches are spread over the Whisper workers and
+    results come back in upload order, with an error per clip that failed.
+    """
+    try:
+        uploads = [(await audio.read(), audio.filename) for audio in audios]
+        chunks = [uploads[i:i + TRANSCRIBE_BATCH_SIZE] for i in range(0, len(uploads), TRANSCRIBE_BATCH_SIZE)]
+        batches = await asyncio.gather(*(
+            asyncio.wrap_future(whisper_pool.submit(transcribe_uploads_batch, chunk)) for chunk in chunks
+        ))
+        results = [result for batch in batches for result in batch]
+        return {"results": [
+            {"filename": audio.filename, "transcript": result["text"], "error": result["error"]}
+            for audio, result in zip(audios, results)
+        ]}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch transcription failed: {e}")
 
 @app.post("/generate-response/")
-async def generate_response(transcript: str = Form(...), use_llm: bool = Form(True)):
+async def generate_response(request: Request, transcript: str = Form(...), use_llm: bool = Form(True)):
     try:
+        use_llm = answer_with_llm(use_llm)
         if use_llm:
-            answer = generate_answer_with_ollama(transcript)
+            answer, truncated = await until_disconnected(request, generate_answer_with_ollama_async(transcript))
         else:
-            answer = response_generator.generate_response(transcript)
-        return {"answer": answer}
+            answer, truncated = response_generator.generate_response(transcript), False
+        return {"answer": answer, "truncated": truncated, "source": "llm" if use_llm else "rules"}
+    except ClientDisconnected:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Response generation failed: {e}")
 
 @app.post("/ask/")
-async def ask_endpoint(audio: UploadFile = File(...), use_llm: bool = Form(True)):
+async def ask_endpoint(request: Request, audio: UploadFile = File(...), use_llm: bool = Form(True),
+                       pipelined: bool = Form(False)):
     """
     One endpoint: Upload audio, transcribe, and get a response (LLM or rule-based).
+    The answer is cut short at ANSWER_DEADLINE_SEC ("truncated" is then true), and dropped
+    if the client disconnects.
+    While Ollama is unavailable the rule-based answer is returned; "source" says which one it is.
+    With `pipelined`, the clip is transcribed utterance by utterance and answering starts
+    on the first ones, overlapping the rest of the transcription.
     """
     try:
-        os.makedirs(os.path.dirname(OUTPUT_FILE_NAME), exist_ok=True)
-        with open(OUTPUT_FILE_NAME, "wb") as f:
-            f.write(await audio.read())
-        transcript = transcribe_local(OUTPUT_FILE_NAME)
-        if use_llm:
-            answer = generate_answer_with_ollama(transcript)
+        if pipelined:
+            use_llm = answer_with_llm(use_llm)
+            transcript, answer, truncated = await until_disconnected(
+                request, ask_pipelined(await audio.read(), audio.filename, use_llm)
+            )
         else:
-            answer = response_generator.generate_response(transcript)
-        return {"transcript": transcript, "answer": answer}
+            transcript = await run_transcription(audio)
+            use_llm = answer_with_llm(use_llm)
+            if use_llm:
+                answer, truncated = await until_disconnected(request, generate_answer_with_ollama_async(transcript))
+            else:
+                answer, truncated = response_generator.generate_response(transcript), False
+        return {"transcript": transcript, "answer": answer, "truncated": truncated,
+                "source": "llm" if use_llm else "rules"}
+    except ClientDisconnected:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Processing failed: {e}")
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def answer_events(transcript: str, use_llm: bool):
+    """
+    Server-sent events for an answer: "token" events as the LLM produces text, then "done"
+    (or "error" if generation fails part way). "done" says whether the answer was truncated by
+    the answer deadline. If the client disconnects, the response is cancelled, which stops
+    the generation in Ollama.
+    """
+    try:
+        if answer_with_llm(use_llm):
+            async for token in stream_answer_with_ollama_async(transcript):
+                yield sse_event("token", {"text": token})
+        else:
+            yield sse_event("token", {"text": response_generator.generate_response(transcript)})
+        yield sse_event("done", {"truncated": False})
+    except DeadlineExceeded:
+        yield sse_event("done", {"truncated": True})
+    except Exception as e:
+        logger.error(f"Error streaming answer: {e}")
+        yield sse_event("error", {"detail": f"Response generation failed: {e}"})
+
+@app.post("/generate-response/stream")
+async def generate_response_stream(transcript: str = Form(...), use_llm: bool = Form(True)):
+    """
+    Streaming variant of /generate-response/, sent as server-sent events.
+    """
+    return StreamingResponse(answer_events(transcript, use_llm), media_type="text/event-stream")
+
+async def pipelined_events(data: bytes, filename: str, use_llm: bool):
+    answer_stream = stream_answer_with_ollama_async if answer_with_llm(use_llm) else rule_based_stream
+    try:
+        async for kind, value in pipelined_answer(segment_transcripts(data, filename), answer_stream):
+            if kind == "done":
+                yield sse_event("done", {"truncated": value})
+            elif kind == "restart":
+                yield sse_event("restart", {"question": value})
+            else:
+                yield sse_event(kind, {"text": value})
+    except Exception as e:
+        logger.error(f"Error in pipelined answer: {e}")
+        yield sse_event("error", {"detail": f"Processing failed: {e}"})
+
+@app.post("/ask/stream")
+async def ask_stream(audio: UploadFile = File(...), use_llm: bool = Form(True), pipelined: bool = Form(False)):
+    """
+    Streaming variant of /ask/: a "transcript" event once transcription is done, then the answer
+    as "token" events.
+
+    With `pipelined`, answer tokens can start before transcription is done: a "segment" event
+    for each utterance transcribed, "token" events from as soon as the question has a few
+    words, a "restart" event if a later utterance changes the question (the tokens so far
+    are void), then "transcript" and "done".
+    """
+    if pipelined:
+        data = await audio.read()
+        return StreamingResponse(pipelined_events(data, audio.filename, use_llm), media_type="text/event-stream")
+    try:
+        transcript = await run_transcription(audio)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Processing failed: {e}")
-    finally:
-        if os.path.exists(OUTPUT_FILE_NAME):
-            os.remove(OUTPUT_FILE_NAME)
\ No newline at end of file
+
+    async def events():
+        yield sse_event("transcript", {"text": transcript})
+        async for event in answer_events(transcript, use_llm):
+            yield event
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+async def transcribe_job(job):
+    audio = job.data.pop("audio")  # not needed once transcribed
+    job.result["transcript"] = await transcribe_data(audio, job.data["filename"])
+
+async def answer_job(job):
+    transcript = job.result["transcript"]
+    use_llm = answer_with_llm(job.data["use_llm"])
+    if use_llm:
+        job.result["answer"], job.result["truncated"] = await generate_answer_with_ollama_async(transcript)
+    else:
+        job.result["answer"], job.result["truncated"] = response_generator.generate_response(transcript), False
+    job.result["source"] = "llm" if use_llm else "rules"
+
+# Each stage runs as many jobs at once as its backend can serve
+job_queue = JobQueue([
+    ("transcription", transcribe_job, TRANSCRIBE_WORKERS),
+    ("answer", answer_job, OLLAMA_MAX_CONCURRENT),
+])
+
+@app.post("/jobs", status_code=202)
+async def submit_job(audio: UploadFile = File(...), use_llm: bool = Form(True), priority: int = Form(0)):
+    """
+    Queues audio for transcription and an answer, like /ask/, and returns the job at once.
+    Poll GET /jobs/{id} or follow GET /jobs/{id}/events for the result. Higher `priority`
+    jobs run first. When the queue is full the request is refused with a 429.
+    """
+    try:
+        job = job_queue.submit({"audio": await audio.read(), "filename": audio.filename, "use_llm": use_llm},
+                               priority)
+    except QueueFull as e:
+        return JSONResponse({"detail": f"Too many jobs, try again later ({e})"}, status_code=429,
+                            headers={"Retry-After": str(JOB_RETRY_AFTER_SEC)})
+    return job.to_dict()
+
+def get_job_or_404(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No job {job_id} (finished jobs expire)")
+    return job
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    return get_job_or_404(job_id).to_dict()
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """
+    Server-sent events for a job: a "stage" event for each transition (including those
+    before subscribing), then "done" or "failed" with the whole job.
+    """
+    job = get_job_or_404(job_id)
+
+    async def events():
+        async for event in job.events():
+            if event["status"] in ("done", "failed"):
+                yield sse_event(event["status"], job.to_dict())
+            else:
+                yield sse_event("stage", event)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+stream_slots = asyncio.Semaphore(STREAM_MAX_CONNECTIONS)
+STREAM_FORMATS = {"s16le": np.int16, "f32le": np.float32}
+WS_UNSUPPORTED_DATA = 1003
+WS_INVALID_PAYLOAD = 1007
+WS_INTERNAL_ERROR = 1011
+
+class StreamInputError(Exception):
+    """The client sent something the stream can't use; `code` is the WebSocket close code to reply with."""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+@app.websocket("/ws/transcribe")
+async def transcribe_stream(websocket: WebSocket, format: str = "s16le", rate: int = WHISPER_SAMPLE_RATE):
+    """
+    Streaming transcription. Send mono PCM as binary messages (`format` s16le or f32le at
+    `rate` Hz) and the text message "end" when done. The server cuts the stream at pauses and
+    sends {"type": "partial"} updates while someone is speaking and {"type": "final"} per utterance.
+    """
+    await websocket.accept()
+    if format not in STREAM_FORMATS:
+        await websocket.close(code=WS_UNSUPPORTED_DATA, reason=f"Unsupported format {format}; use s16le or f32le")
+        return
+    if stream_slots.locked():
+        await websocket.close(code=1013, reason="Too many concurrent streams, try again later")
+        return
+
+    async with stream_slots:
+        # Bounded queue: when transcription falls behind, we stop reading and TCP pushes back on the client
+        chunks = asyncio.Queue(maxsize=STREAM_QUEUE_CHUNKS)
+        receiver = asyncio.create_task(receive_stream(websocket, chunks, STREAM_FORMATS[format], rate))
+        try:
+            await process_stream(websocket, chunks)
+        except WebSocketDisconnect:
+            logger.debug("Stream client disconnected")
+        except Exception as e:
+            code = e.code if isinstance(e, StreamInputError) else WS_INTERNAL_ERROR
+            logger.warning(f"Closing stream with code {code}: {e}")
+            await close_with_error(websocket, code, str(e))
+        finally:
+            receiver.cancel()
+            await asyncio.gather(receiver, return_exceptions=True)
+
+async def close_with_error(websocket: WebSocket, code: int, message: str):
+    """Tells the client what went wrong, then closes the socket with `code`."""
+    try:
+        await websocket.send_json({"type": "error", "message": message})
+        await websocket.close(code=code, reason=message[:120])  # close reasons are limited to 123 bytes
+    except (WebSocketDisconnect, RuntimeError):
+        pass  # the client is already gone
+
+async def receive_stream(websocket: WebSocket, chunks: asyncio.Queue, dtype, rate: int):
+    """
+    Reads PCM messages into `chunks` until "end" or a disconnect, then puts None. A sample
+    may be split across messages; its bytes are carried over to the next message. If the
+    input is unusable, or reading fails, the error is put on the queue instead of None.
+    """
+    resampler = PolyphaseResampler(rate, WHISPER_SAMPLE_RATE) if rate != WHISPER_SAMPLE_RATE else None
+    sample_bytes = np.dtype(dtype).itemsize
+    remainder = b""
+    end = None
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect" or message.get("text") == "end":
+                break
+            if message.get("text") is not None:
+                raise StreamInputError(WS_UNSUPPORTED_DATA, 'Send audio as binary messages and "end" as text')
+            data = remainder + (message.get("bytes") or b"")
+            whole = len(data) - len(data) % sample_bytes
+            remainder = data[whole:]
+            if not whole:
+                continue
+            samples = np.frombuffer(data[:whole], dtype=dtype).astype(np.float32)
+            if dtype == np.int16:
+                samples /= 32768.0
+            elif not np.isfinite(samples).all():
+                raise StreamInputError(WS_INVALID_PAYLOAD, "Audio contains NaN or infinite samples")
+            if resampler is not None:
+                samples = resampler.process(samples)
+            await chunks.put((samples, time.perf_counter()))
+        if remainder:
+            raise StreamInputError(WS_INVALID_PAYLOAD, f"Stream ended in the middle of a {sample_bytes}-byte sample")
+    except Exception as e:
+        end = e
+    await chunks.put(end)
+
+async def process_stream(websocket: WebSocket, chunks: asyncio.Queue):
+    segmenter = StreamSegmenter()
+    arrivals = []  # (samples received so far, arrival time), to time end of speech -> final
+    last_partial = 0.0
+
+    async def send_final(final):
+        start, end, samples = final
+        text = await transcribe_samples(samples)
+        # Latency from the arrival of the chunk holding the end of speech to the final transcript
+        arrived = next((t for received, t in arrivals if received >= end), arrivals[-1][1])
+        latency_ms = 1000 * (time.perf_counter() - arrived)
+        logger.debug(f"Stream final after {latency_ms:.0f} ms: {text[:50]}...")
+        await websocket.send_json({
+            "type": "final", "text": text.strip(), "start": start / WHISPER_SAMPLE_RATE,
+            "end": end / WHISPER_SAMPLE_RATE, "latency_ms": round(latency_ms, 1),
+        })
+        del arrivals[:max(0, len(arrivals) - 1)]
+
+    while True:
+        item = await chunks.get()
+        if isinstance(item, Exception):
+            raise item
+        if item is None:
+            final = segmenter.pop_final(flush=True)
+            if final:
+                await send_final(final)
+            await websocket.close()
+            return
+
+        samples, arrived = item
+        segmenter.feed(samples)
+        arrivals.append((segmenter.received, arrived))
+
+        final = segmenter.pop_final()
+        if final:
+            await send_final(final)
+        elif chunks.empty() and time.perf_counter() - last_partial >= STREAM_PARTIAL_SEC:
+            # Only decode partials when caught up, so they never delay finals
+            pending = segmenter.pending()
+            if len(pending) >= WHISPER_SAMPLE_RATE // 2:
+                last_partial = time.perf_counter()
+                text = await transcribe_samples(pending.copy())
+                if text.strip():
+                    await websocket.send_json({"type": "partial", "text": text.strip()})
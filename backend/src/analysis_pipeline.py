@@ -0,0 +1,83 @@
+"""Background transcribe-and-answer pipeline for the desktop UIs."""
+import threading
+
+from loguru import logger
+
+from backend.src import llm, local_transcription
+from backend.src.constants import OUTPUT_FILE_NAME
+from backend.src.local_whisper import load_samples
+
+
+class AnalysisPipeline:
+    """
+    Transcribes a recording and generates its answers on background threads, so the UI
+    stays responsive and can record again while an analysis is still running.
+
+    Progress is reported through `on_event(run, kind, data)`, called from worker threads
+    (hand it to window.write_event_value or app.after). `run` is the number returned by
+    `start`, and `kind` is one of:
+        "status"      data is a progress message
+        "transcript"  data is the transcript
+        "token"       data is (variant, text) as an answer streams in
+        "answer"      data is (variant, answer) once an answer is complete
+        "done"        data is None; also sent after a failed transcription
+    Starting a new analysis cancels the previous one, which then posts nothing more.
+    """
+
+    def __init__(self, on_event, variants=None):
+        self.on_event = on_event
+        self.variants = variants
+        self._run = 0
+        self._cancel = None
+        self._lock = threading.Lock()
+
+    def start(self, audio=OUTPUT_FILE_NAME):
+        """Starts analyzing `audio` (a path or 16 kHz samples) and returns its run number."""
+        # Read the recording now, before a new recording can replace the file
+        samples = load_samples(audio)
+        with self._lock:
+            self.cancel()
+            self._run += 1
+            run, cancel = self._run, threading.Event()
+            self._cancel = cancel
+        threading.Thread(target=self._analyze, args=(run, samples, cancel), daemon=True).start()
+        return run
+
+    def cancel(self):
+        """Cancels the running analysis, if any."""
+        if self._cancel is not None:
+            self._cancel.set()
+
+    def _post(self, run, cancel, kind, data=None):
+        if not cancel.is_set():
+            self.on_event(run, kind, data)
+
+    def _analyze(self, run, samples, cancel):
+        try:
+            self._post(run, cancel, "status", "Transcribing audio...")
+            transcript = local_transcription.transcribe_local(samples)
+            if cancel.is_set():
+                logger.debug(f"Analysis {run} cancelled after transcription")
+                return
+            self._post(run, cancel, "transcript", transcript)
+            # transcribe_local reports a failure in place of the transcript
+            if transcript.startswith("Transcription error:"):
+                self._post(run, cancel, "status", "Transcription failed")
+                self._post(run, cancel, "done")
+                return
+
+            self._post(run, cancel, "status", "Generating answers...")
+            futures = llm.generate_answers(
+                transcript, self.variants,
+                on_token=lambda name, token: self._post(run, cancel, "token", (name, token)),
+                on_answer=lambda name, answer: self._post(run, cancel, "answer", (name, answer)),
+                cancel=cancel,
+            )
+            for future in futures.values():
+                future.result()
+            self._post(run, cancel, "status", "Analysis complete")
+            self._post(run, cancel, "done")
+        except Exception as e:
+            logger.error(f"Error analyzing audio: {e}")
+            self._post(run, cancel, "status", f"Analysis error: {e}")
+            self._post(run, cancel, "done")
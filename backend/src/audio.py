@@ -1,13 +1,26 @@
 """Audio utilities."""
+import os
+
 import numpy as np
-import soundcard as sc  # Add this import at the top
+import soundfile as sf
 from loguru import logger
 
-from src.constants import RECORD_SEC, SAMPLE_RATE
+from src.capture import SpeakerCapture
+from src.constants import OUTPUT_FILE_NAME, RECORD_SEC, SAMPLE_RATE
 
 
 # ... existing functions ...
 
+def save_audio_file(audio_data: np.ndarray, output_file: str = OUTPUT_FILE_NAME) -> None:
+    """
+    Saves a whole in-memory recording to a file in one go.
+    """
+    logger.debug(f"Saving audio to {output_file}")
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    sf.write(output_file, audio_data, SAMPLE_RATE)
+    logger.debug("Audio saved successfully")
+
+
 def record_system_audio(record_sec: int = RECORD_SEC) -> np.ndarray:
     """
     Records system audio (speaker output) for a specified duration.
@@ -15,24 +28,13 @@ def record_system_audio(record_sec: int = RECORD_SEC) -> np.ndarray:
     logger.debug(f"Recording system audio for {record_sec} second(s)...")
 
     try:
-        # Get default speaker
-        default_speaker = sc.default_speaker()
-        logger.debug(f"Default output device: {default_speaker.name}")
-
-        # Record audio
-        with default_speaker.recorder(samplerate=SAMPLE_RATE) as recorder:
-            audio_data = recorder.record(numframes=int(SAMPLE_RATE * record_sec))
-
-            # Convert to mono if needed
-            if audio_data.shape[1] > 1:
-                audio_data = np.mean(audio_data, axis=1)
-
-            # Reshape to match expected format
-            audio_data = audio_data.reshape(-1, 1)
+        with SpeakerCapture() as capture:
+            logger.debug(f"Default output device: {capture.speaker.name}")
+            audio_data = capture.record(record_sec)
 
         logger.debug("System audio recording complete.")
         return audio_data
 
     except Exception as e:
         logger.error(f"Error recording system audio: {e}")
-        raise Exception(f"Failed to record system audio: {e}")
\ No newline at end of file
+        raise Exception(f"Failed to record system audio: {e}")
@@ -0,0 +1,62 @@
+"""Growable audio accumulator."""
+import numpy as np
+
+from backend.src.constants import BUFFER_BLOCK_SEC, CHANNELS, SAMPLE_RATE
+
+
+class AudioBuffer:
+    """
+    Accumulates float32 audio in a list of preallocated fixed-size blocks.
+
+    Appending only copies the new frames into the current block, so the cost of an
+    append does not grow with the length of the recording. A contiguous array is
+    only built when it is asked for (e.g. when the recording is saved).
+    """
+
+    def __init__(self, channels=CHANNELS, block_frames=int(SAMPLE_RATE * BUFFER_BLOCK_SEC)):
+        self.channels = channels
+        self.block_frames = block_frames
+        self._blocks = []
+        self._fill = 0  # frames used in the last block
+        self._frames = 0
+
+    def __len__(self):
+        return self._frames
+
+    def append(self, frames):
+        """Copies `frames` (shape (n,) or (n, channels)) onto the end of the buffer."""
+        frames = np.asarray(frames, dtype=np.float32).reshape(-1, self.channels)
+        offset = 0
+        while offset < len(frames):
+            if not self._blocks or self._fill == self.block_frames:
+                self._blocks.append(np.empty((self.block_frames, self.channels), dtype=np.float32))
+                self._fill = 0
+            n = min(len(frames) - offset, self.block_frames - self._fill)
+            self._blocks[-1][self._fill:self._fill + n] = frames[offset:offset + n]
+            self._fill += n
+            offset += n
+        self._frames += len(frames)
+
+    def iter_blocks(self):
+        """Yields read-only views of the filled part of each block, without copying."""
+        for i, block in enumerate(self._blocks):
+            view = block if i < len(self._blocks) - 1 else block[:self._fill]
+            view = view.view()
+            view.flags.writeable = False
+            yield view
+
+    def to_array(self):
+        """Returns the whole recording as one contiguous (frames, channels) array."""
+        if len(self._blocks) == 1:
+            return self._blocks[0][:self._fill]
+        out = np.empty((self._frames, self.channels), dtype=np.float32)
+        pos = 0
+        for block in self.iter_blocks():
+            out[pos:pos + len(block)] = block
+            pos += len(block)
+        return out
+
+    def clear(self):
+        self._blocks = []
+        self._fill = 0
+        self._frames = 0
@@ -0,0 +1,32 @@
+"""In-process audio loading for transcription (no ffmpeg)."""
+import io
+import os
+
+import numpy as np
+import soundfile as sf
+
+from backend.src.constants import WHISPER_SAMPLE_RATE
+from backend.src.resample import resample
+
+
+def load_audio(audio, sample_rate=WHISPER_SAMPLE_RATE, source_rate=None):
+    """
+    Loads audio as a mono float32 array at `sample_rate`, ready for Whisper.
+
+    `audio` can be a file path, the bytes of a WAV/FLAC/OGG file, or an array of
+    samples. Arrays are assumed to already be at `sample_rate` unless `source_rate` is given.
+    Raises sf.LibsndfileError for formats libsndfile can't read (e.g. MP3 on old libsndfile, M4A, WebM).
+    """
+    if isinstance(audio, np.ndarray):
+        samples, rate = audio.astype(np.float32, copy=False), source_rate or sample_rate
+    else:
+        if isinstance(audio, (bytes, bytearray, memoryview)):
+            audio = io.BytesIO(audio)
+        elif isinstance(audio, os.PathLike):
+            audio = os.fspath(audio)
+        samples, rate = sf.read(audio, dtype="float32", always_2d=True)
+
+    if samples.ndim > 1:
+        samples = samples.mean(axis=1) if samples.shape[1] > 1 else samples[:, 0]
+    samples = resample(samples, rate, sample_rate)
+    return np.ascontiguousarray(samples, dtype=np.float32)
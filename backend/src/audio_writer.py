@@ -0,0 +1,94 @@
+"""Incremental recording to disk."""
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+import soundfile as sf
+from loguru import logger
+
+from backend.src.constants import CHANNELS, OUTPUT_FILE_NAME, SAMPLE_RATE, WRITER_FLUSH_SEC, WRITER_QUEUE_BLOCKS
+
+
+class StreamingAudioWriter:
+    """
+    Appends captured audio to an open sound file from a background thread.
+
+    Frames go through a bounded queue, so memory stays constant however long the
+    session runs. The file is flushed every `flush_sec` seconds, which keeps its
+    header current and lets it be read while recording is still in progress.
+    """
+
+    def __init__(self, output_file=OUTPUT_FILE_NAME, sample_rate=SAMPLE_RATE, channels=CHANNELS,
+                 queue_blocks=WRITER_QUEUE_BLOCKS, flush_sec=WRITER_FLUSH_SEC):
+        self.output_file = output_file
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.flush_sec = flush_sec
+        self._queue = queue.Queue(maxsize=queue_blocks)
+        self._file = None
+        self._thread = None
+        self._frames = 0
+        self.error = None
+
+    def __len__(self):
+        return self._frames
+
+    def start(self):
+        dirname = os.path.dirname(self.output_file)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        self._file = sf.SoundFile(self.output_file, "w", samplerate=self.sample_rate, channels=self.channels)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        logger.debug(f"Streaming recording to {self.output_file}")
+        return self
+
+    def append(self, frames):
+        """Queues frames for writing. Blocks while the queue is full."""
+        if len(frames) == 0:
+            return
+        if self.error is not None:
+            raise Exception(f"Audio writer failed: {self.error}")
+        self._queue.put(np.asarray(frames, dtype=np.float32))
+        self._frames += len(frames)
+
+    def _run(self):
+        last_flush = time.monotonic()
+        while True:
+            frames = self._queue.get()
+            if frames is None:
+                break
+            if self.error is not None:
+                continue  # keep draining so append() never blocks forever
+            try:
+                self._file.write(frames)
+                if time.monotonic() - last_flush >= self.flush_sec:
+                    self._file.flush()
+                    last_flush = time.monotonic()
+            except Exception as e:
+                logger.error(f"Error writing audio: {e}")
+                self.error = e
+
+    def close(self):
+        """Flushes the remaining frames and closes the file. Returns True if everything was written."""
+        if self._thread is None:
+            return self.error is None
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        try:
+            self._file.close()
+        except Exception as e:
+            logger.error(f"Error closing audio file: {e}")
+            self.error = e
+        if self.error is None:
+            logger.debug(f"Wrote {self._frames} frames to {self.output_file}")
+        return self.error is None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,273 @@
+"""Streaming audio capture.
+
+Each source is read through one persistent input stream whose callback pushes
+fixed-size blocks into a ring buffer. Consumers drain the buffer at their own
+pace, so there are no gaps between batches and stopping takes at most one block.
+"""
+import threading
+import time
+
+import numpy as np
+import sounddevice as sd
+from loguru import logger
+
+from backend.src.constants import BLOCK_SIZE, CHANNELS, RING_BUFFER_SEC, SAMPLE_RATE
+from backend.src.resample import PolyphaseResampler
+
+# Try to import soundcard (used for speaker loopback capture)
+try:
+    import soundcard as sc
+    soundcard_available = True
+except ImportError:
+    soundcard_available = False
+
+LOOPBACK_KEYWORDS = ["loopback", "output", "monitor", "system"]
+
+
+def find_loopback_device():
+    """
+    Returns the index of the first input device that looks like a system audio loopback, or None.
+    """
+    devices = sd.query_devices()
+    logger.debug(f"Available audio devices: {len(devices)}")
+    for i, device in enumerate(devices):
+        device_name = device["name"].lower()
+        if any(word in device_name for word in LOOPBACK_KEYWORDS):
+            if device.get("max_input_channels", 0) > 0:
+                logger.debug(f"Found potential system audio device: {device['name']} (index {i})")
+                return i
+    return None
+
+
+def resolve_input_device(source="microphone"):
+    """
+    Resolves the sounddevice input for a source ("microphone" or "system").
+    None means the default input device.
+    """
+    if source != "system":
+        return None
+    device = find_loopback_device()
+    if device is None:
+        logger.warning("No loopback device found, falling back to default input")
+    return device
+
+
+class RingBuffer:
+    """
+    Fixed-capacity float32 ring buffer for one producer and one consumer.
+
+    The producer only advances the write counter and the consumer only advances
+    the read counter, so the audio callback never has to take a lock. When the
+    consumer falls behind, the newest frames are dropped and counted in `overflows`.
+    """
+
+    def __init__(self, capacity, channels=1):
+        self.capacity = capacity
+        self.channels = channels
+        self._data = np.zeros((capacity, channels), dtype=np.float32)
+        self._write_pos = 0  # total frames ever written
+        self._read_pos = 0  # total frames ever read
+        self.overflows = 0
+
+    def __len__(self):
+        return self._write_pos - self._read_pos
+
+    def write(self, frames):
+        frames = np.asarray(frames, dtype=np.float32).reshape(-1, self.channels)
+        free = self.capacity - (self._write_pos - self._read_pos)
+        if len(frames) > free:
+            self.overflows += 1
+            frames = frames[:free]
+        n = len(frames)
+        if n == 0:
+            return 0
+
+        start = self._write_pos % self.capacity
+        first = min(n, self.capacity - start)
+        self._data[start:start + first] = frames[:first]
+        self._data[:n - first] = frames[first:]
+        self._write_pos += n
+        return n
+
+    def read(self, max_frames=None):
+        """Returns (a copy of) up to `max_frames` buffered frames, oldest first."""
+        n = self._write_pos - self._read_pos
+        if max_frames is not None:
+            n = min(n, max_frames)
+
+        start = self._read_pos % self.capacity
+        first = min(n, self.capacity - start)
+        out = np.empty((n, self.channels), dtype=np.float32)
+        out[:first] = self._data[start:start + first]
+        out[first:] = self._data[:n - first]
+        self._read_pos += n
+        return out
+
+
+class _Capture:
+    """Shared ring-buffer and lifecycle handling for the capture backends."""
+
+    def __init__(self, sample_rate=SAMPLE_RATE, channels=CHANNELS, block_size=BLOCK_SIZE, buffer_sec=RING_BUFFER_SEC):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.block_size = block_size
+        self.ring = RingBuffer(int(sample_rate * buffer_sec), channels)
+        self.active = False
+        self.error = None  # why a capture that stopped on its own failed
+        # Poll at half a block so a waiting reader wakes up promptly
+        self._poll_interval = block_size / sample_rate / 2
+
+    def _check_error(self):
+        if self.error is not None:
+            raise Exception(f"Audio capture failed: {self.error}") from self.error
+
+    def read(self, timeout=None):
+        """
+        Returns all frames captured since the last read.
+        Waits up to `timeout` seconds (forever if None) while the capture is active and nothing is buffered.
+        Raises once everything buffered has been read if the capture failed.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            frames = self.ring.read()
+            if len(frames):
+                return frames
+            if not self.active:
+                self._check_error()
+                return frames
+            if deadline is not None and time.monotonic() >= deadline:
+                return frames
+            time.sleep(self._poll_interval)
+
+    def record(self, seconds):
+        """Captures exactly `seconds` of audio from the running stream. Raises if the capture fails."""
+        needed = int(seconds * self.sample_rate)
+        blocks = []
+        captured = 0
+        while captured < needed and self.active:
+            block = self.ring.read(needed - captured)
+            if len(block) == 0:
+                time.sleep(self._poll_interval)
+                continue
+            blocks.append(block)
+            captured += len(block)
+        self._check_error()
+        if not blocks:
+            return np.zeros((0, self.channels), dtype=np.float32)
+        return np.concatenate(blocks)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class AudioCapture(_Capture):
+    """
+    Captures a microphone or loopback device through one callback-driven sounddevice stream.
+    Devices that can't open at `sample_rate` run at their default rate and are resampled in the callback.
+    """
+
+    def __init__(self, source="microphone", **kwargs):
+        super().__init__(**kwargs)
+        self.source = source
+        # Resolve the device once for the whole session
+        self.device = resolve_input_device(source)
+        self._stream = None
+        self._resampler = None
+
+    def _callback(self, indata, frames, time_info, status):
+        if status:
+            self.ring.overflows += 1
+        if self._resampler is not None:
+            indata = self._resampler.process(indata)
+        self.ring.write(indata)
+
+    def _stream_rate(self):
+        """Returns the rate to open the device at, preferring the capture rate itself."""
+        try:
+            sd.check_input_settings(device=self.device, samplerate=self.sample_rate,
+                                    channels=self.channels, dtype="float32")
+            return self.sample_rate
+        except Exception:
+            return int(sd.query_devices(self.device, "input")["default_samplerate"])
+
+    def start(self):
+        stream_rate = self._stream_rate()
+        if stream_rate != self.sample_rate:
+            logger.debug(f"Device can't capture at {self.sample_rate} Hz, resampling from {stream_rate} Hz")
+            self._resampler = PolyphaseResampler(stream_rate, self.sample_rate)
+        else:
+            self._resampler = None
+
+        logger.debug(f"Starting {self.source} capture on device {self.device}")
+        self._stream = sd.InputStream(
+            samplerate=stream_rate,
+            # Keep the callback cadence the same whatever rate the device runs at
+            blocksize=self.block_size * stream_rate // self.sample_rate,
+            device=self.device,
+            channels=self.channels,
+            dtype="float32",
+            callback=self._callback,
+        )
+        self._stream.start()
+        self.active = True
+
+    def stop(self):
+        if self._stream is None:
+            return
+        # stop() lets the in-flight block finish, so this returns within one block
+        self._stream.stop()
+        self._stream.close()
+        self._stream = None
+        self.active = False
+        if self.ring.overflows:
+            logger.warning(f"{self.source} capture dropped frames {self.ring.overflows} time(s)")
+        logger.debug(f"Stopped {self.source} capture")
+
+
+class SpeakerCapture(_Capture):
+    """
+    Captures the default speaker output through soundcard's loopback recorder.
+    A reader thread pulls one block at a time and downmixes it to mono.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        if not soundcard_available:
+            raise Exception("soundcard is not installed. Install with: pip install SoundCard")
+        self.speaker = sc.default_speaker()
+        self._thread = None
+
+    def _reader(self, recorder):
+        while self.active:
+            data = recorder.record(numframes=self.block_size)
+            if data.ndim > 1 and data.shape[1] > self.channels:
+                data = np.mean(data, axis=1, keepdims=True)
+            self.ring.write(data)
+
+    def _run(self):
+        try:
+            with self.speaker.recorder(samplerate=self.sample_rate, blocksize=self.block_size) as recorder:
+                self._reader(recorder)
+        except Exception as e:
+            logger.error(f"Speaker capture failed: {e}")
+            self.error = e
+            self.active = False
+
+    def start(self):
+        logger.debug(f"Starting speaker capture on {self.speaker.name}")
+        self.error = None
+        self.active = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self.active = False
+        self._thread.join()
+        self._thread = None
+        logger.debug("Stopped speaker capture")
@@ -5,11 +5,92 @@ APPLICATION_WIDTH = 80
 
 # Audio settings
 RECORD_SEC = 5  # Duration of each recording batch in seconds
-SAMPLE_RATE = 44100  # Audio sample rate
+WHISPER_SAMPLE_RATE = 16000  # Whisper's native input rate
+SAMPLE_RATE = WHISPER_SAMPLE_RATE  # Capture and storage sample rate (set to 44100 for full-band recordings)
+CHANNELS = 1  # Capture and storage channel count
+BLOCK_SIZE = 1024  # Frames delivered per capture callback
+RING_BUFFER_SEC = 10  # Seconds of audio the capture ring buffer can hold
+BUFFER_BLOCK_SEC = 10  # Seconds of audio per preallocated recording buffer block
+STREAM_TO_DISK = True  # Write recordings to disk while capturing instead of keeping them in memory
+WRITER_QUEUE_BLOCKS = 256  # Capture reads the disk writer may lag behind before capture waits
+WRITER_FLUSH_SEC = 1  # How often the disk writer flushes, keeping the file readable mid-session
 
 # File paths
 OUTPUT_FILE_NAME = os.path.join("output", "recorded_audio.wav")
 
+# Whisper settings
+# Options are: 'tiny', 'base', 'small', 'medium', 'large'
+WHISPER_MODEL_SIZE = os.environ.get("WHISPER_MODEL_SIZE", "base")  # 'base' balances speed and accuracy
+TRANSCRIBE_BATCH_SIZE = 8  # Clips decoded together by batch transcription
+LONG_AUDIO_MIN_SEC = 120  # Recordings longer than this are transcribed in parallel chunks
+LONG_AUDIO_CHUNK_SEC = 60  # Target chunk length; chunks are cut at the quietest nearby point
+LONG_AUDIO_OVERLAP_SEC = 2  # Audio shared by neighbouring chunks on each side of a cut
+LONG_AUDIO_WORKERS = int(os.environ.get("LONG_AUDIO_WORKERS", max(1, min(4, (os.cpu_count() or 2) // 2))))
+TRANSCRIPT_CACHE_SIZE = 128  # Transcripts kept in memory, keyed by a hash of the audio
+TRANSCRIPT_CACHE_DB = os.environ.get("TRANSCRIPT_CACHE_DB")  # SQLite file for a shared disk tier (unset: memory only)
+TRANSCRIPT_CACHE_DISK_ENTRIES = 10000  # Transcripts kept on disk
+
+# Voice-activity detection (silence trimming before Whisper)
+VAD_ENABLED = True
+VAD_ENERGY_MARGIN_DB = 12  # Frame energy above the noise floor that counts as speech
+VAD_FLUX_MARGIN_DB = 6  # Spectral flux above typical that lets quieter frames count as speech
+VAD_MAX_NOISE_FLOOR_DB = -45  # Cap on the measured floor, so a clip that is all speech isn't its own floor
+VAD_MIN_SPEECH_SEC = 0.25  # Shorter bursts (key clicks, bumps) are dropped
+VAD_MIN_SILENCE_SEC = 0.5  # Shorter pauses are kept inside the surrounding speech
+VAD_PADDING_SEC = 0.2  # Audio kept either side of each speech region
+
+# Live captions while recording
+LIVE_CAPTIONS = True
+LIVE_INTERVAL_SEC = 1.5  # Minimum time between live decodes
+LIVE_WINDOW_SEC = 20  # Uncommitted audio after which the oldest text is committed regardless
+LIVE_STABLE_SEC = 1.0  # Segments ending this close to the end of the audio stay tentative
+LIVE_CPU_BUDGET = 0.5  # Fraction of wall-clock time live decoding may use
+
+# Server settings
+TRANSCRIBE_WORKERS = int(os.environ.get("TRANSCRIBE_WORKERS", 2))  # Whisper worker processes for the API
+WORKER_POLL_SEC = 1.0  # How often the Whisper pool checks that its worker processes are still alive
+STREAM_MAX_CONNECTIONS = int(os.environ.get("STREAM_MAX_CONNECTIONS", 4))  # Concurrent WebSocket transcription streams
+STREAM_QUEUE_CHUNKS = 64  # Received chunks a stream may buffer before the server stops reading from it
+STREAM_PAUSE_SEC = 0.6  # Non-speech that ends an utterance in a stream
+STREAM_FLOOR_SEC = 3  # Audio kept while nothing stands out as speech, so a stream that starts talking isn't lost
+STREAM_PARTIAL_SEC = 1.0  # Minimum time between partial transcripts of a stream
+STREAM_MAX_SEGMENT_SEC = 25  # Utterances are cut here even without a pause (Whisper's window is 30 s)
+JOB_QUEUE_MAX = int(os.environ.get("JOB_QUEUE_MAX", 32))  # Unfinished /jobs allowed at once; more get a 429
+JOB_RESULT_TTL_SEC = 600  # How long a finished job's result can still be fetched
+JOB_RETRY_AFTER_SEC = 5  # Retry-After sent with a 429 when the job queue is full
+# Pipelined /ask: the clip is transcribed utterance by utterance and answering starts on the first ones
+PIPELINE_PAUSE_SEC = 0.3  # Non-speech that ends an utterance
+PIPELINE_MAX_SEGMENT_SEC = 6  # Longer stretches of speech are cut here
+PIPELINE_MIN_WORDS = 4  # Words transcribed before an answer is started
+OLLAMA_BASE_URL = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")  # Also where the health checks go
+OLLAMA_URL = os.environ.get("OLLAMA_URL", f"{OLLAMA_BASE_URL}/api/generate")
+OLLAMA_MODEL = os.environ.get("OLLAMA_MODEL", "llama2")  # Any model pulled into Ollama
+OLLAMA_CONNECT_TIMEOUT_SEC = 5
+# Longest wait for the next bytes from Ollama; a non-streamed answer has to arrive whole within this
+OLLAMA_READ_TIMEOUT_SEC = float(os.environ.get("OLLAMA_READ_TIMEOUT_SEC", 120))
+OLLAMA_RETRIES = 2  # Extra attempts after a connection failure or a busy/unavailable response
+OLLAMA_RETRY_BACKOFF_SEC = 0.5  # Base of the jittered exponential backoff between attempts
+OLLAMA_KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")  # How long Ollama keeps the model loaded after a request
+OLLAMA_HEALTH_INTERVAL_SEC = 5  # How often the background monitor probes Ollama
+OLLAMA_HEALTH_TIMEOUT_SEC = 2  # A probe slower than this counts as a failure
+# Consecutive failed probes or requests after which Ollama calls fail at once until a probe succeeds
+OLLAMA_CIRCUIT_FAILURES = 3
+# Generation budgets in tokens, sent to Ollama as options.num_predict (about 70 and 300 words plus code)
+SHORT_ANSWER_MAX_TOKENS = 500
+FULL_ANSWER_MAX_TOKENS = int(os.environ.get("FULL_ANSWER_MAX_TOKENS", 1024))
+# Wall-clock limit per answer; when it passes generation stops and the text so far is returned
+ANSWER_DEADLINE_SEC = float(os.environ.get("ANSWER_DEADLINE_SEC", 60))
+DISCONNECT_POLL_SEC = 0.5  # How often the API checks whether a client waiting for an answer has gone
+
+# Answer cache
+RESPONSE_CACHE_SIZE = 512  # Answers kept in memory
+RESPONSE_CACHE_TTL_SEC = 7 * 24 * 3600  # Cached answers older than this are regenerated
+RESPONSE_CACHE_DB = os.environ.get("RESPONSE_CACHE_DB")  # SQLite file to keep answers across runs (unset: memory only)
+RESPONSE_CACHE_NEAR_DUPLICATES = False  # Also reuse answers to questions worded slightly differently
+RESPONSE_CACHE_SIMILARITY = 0.9  # Minimum estimated Jaccard similarity of the words for a near-duplicate hit
+# Requests sent to Ollama at once; Ollama itself only runs them in parallel up to its OLLAMA_NUM_PARALLEL
+OLLAMA_MAX_CONCURRENT = int(os.environ.get("OLLAMA_MAX_CONCURRENT", 2))
+
 # settings
 POSTION = "Full Stack Developer"  # Change this to the position you're interviewing for
 
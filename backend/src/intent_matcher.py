@@ -0,0 +1,102 @@
+"""Keyword-based intent matching with one compiled pattern."""
+import re
+
+# ASCII characters that can't be part of a word, mapped to spaces for the fast path
+_NON_WORD = bytes(c for c in range(128) if not re.match(r"\w", chr(c)))
+_TO_SPACES = bytes.maketrans(_NON_WORD, b" " * len(_NON_WORD))
+
+
+class IntentMatcher:
+    """
+    Matches keyword lists for many intents against a text in a single pass.
+
+    All keywords are compiled into one regex with word boundaries, structured as a trie so
+    keywords sharing a prefix are tried together, and matched against the lower-cased text:
+    "hi" doesn't match inside "this" and "ATM" matches "atm". Multi-word keywords match
+    across any whitespace. Keywords can be added at any time; the pattern is rebuilt on
+    the next match.
+
+    `suffixes` are endings a keyword of at least `min_stem` characters may carry and still
+    match, so plurals and other inflections count: with "s" and "ing", "loan" matches
+    "loans" and "bank" "banking", while "hi" doesn't become "his".
+
+    ASCII text, which is nearly all of it, is matched as bytes with every non-word
+    character turned into a space, so each keyword can start with a literal space that the
+    regex engine scans for quickly instead of testing a word boundary at every position.
+    """
+
+    def __init__(self, intents=None, suffixes=(), min_stem=3):
+        self._keywords = {}  # normalized keyword -> intents it belongs to
+        self.suffixes = sorted({suffix.lower() for suffix in suffixes if suffix}, key=len, reverse=True)
+        self.min_stem = min_stem
+        self._pattern = None
+        self._ascii_pattern = None
+        self._intents_by_match = {}
+        for intent, keywords in (intents or {}).items():
+            self.add(intent, keywords)
+
+    @staticmethod
+    def _normalize(keyword):
+        return " ".join(keyword.lower().split())
+
+    def add(self, intent, keywords):
+        for keyword in keywords:
+            keyword = self._normalize(keyword)
+            if keyword:
+                self._keywords.setdefault(keyword, set()).add(intent)
+        self._pattern = self._ascii_pattern = None
+
+    @staticmethod
+    def _trie_pattern(node):
+        """Regex for the keywords below a trie node; greedy, so the longest keyword is tried first."""
+        branches = [(r"\s+" if char == " " else re.escape(char)) + IntentMatcher._trie_pattern(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{pattern})?" if "" in node else pattern
+
+    def _compile(self):
+        keywords = list(self._keywords)
+        # Only the longest keyword at each position is reported, so a keyword that contains
+        # another one as whole words also counts for that one's intents, and an inflected
+        # form counts for every keyword it can be read as
+        intents_by_match = {}
+        for keyword in keywords:
+            intents = set(self._keywords[keyword])
+            for other in keywords:
+                if len(other) < len(keyword) and re.search(rf"(?<!\w){re.escape(other)}(?!\w)", keyword):
+                    intents |= self._keywords[other]
+            forms = [keyword]
+            if len(keyword) >= self.min_stem:
+                forms += [keyword + suffix for suffix in self.suffixes]
+            for form in forms:
+                intents_by_match[form] = intents_by_match.get(form, frozenset()) | intents
+        trie = {}
+        for form in intents_by_match:
+            node = trie
+            for char in form:
+                node = node.setdefault(char, {})
+            node[""] = {}
+        if keywords:
+            pattern = rf"({self._trie_pattern(trie)})(?!\w)"
+            self._pattern = re.compile(r"(?<!\w)" + pattern)
+            self._ascii_pattern = re.compile((" " + pattern).encode())
+        self._intents_by_match = intents_by_match
+
+    def match(self, text):
+        """Returns the set of intents with at least one keyword in `text`."""
+        if self._pattern is None:
+            self._compile()
+            if self._pattern is None:
+                return set()
+        text = text.lower()
+        if text.isascii():
+            matches = [match.decode() for match in
+                       self._ascii_pattern.findall(b" " + text.encode().translate(_TO_SPACES))]
+        else:
+            matches = self._pattern.findall(text)
+        found = set()
+        for match in matches:
+            found |= self._intents_by_match[self._normalize(match)]
+        return found
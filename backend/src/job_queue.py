@@ -0,0 +1,158 @@
+"""In-process priority job queue with pipelined stages, for the asynchronous API."""
+import asyncio
+import itertools
+import time
+import uuid
+
+from loguru import logger
+
+from backend.src.constants import JOB_QUEUE_MAX, JOB_RESULT_TTL_SEC
+
+
+FINISHED = ("done", "failed")
+
+
+class QueueFull(Exception):
+    """The queue already holds its maximum number of unfinished jobs."""
+
+
+class Job:
+    """
+    One submitted request. `data` holds the stage inputs and `result` what the stages
+    produce. `status` is "queued" (waiting for `stage`), "running" (in `stage`), "done"
+    or "failed".
+    """
+
+    def __init__(self, data, priority=0):
+        self.id = uuid.uuid4().hex
+        self.data = data
+        self.priority = priority
+        self.status = "queued"
+        self.stage = None
+        self.result = {}
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.history = []  # every transition, replayed to late subscribers
+        self._subscribers = []
+
+    @property
+    def finished(self):
+        return self.status in FINISHED
+
+    def _transition(self, status, stage):
+        self.status, self.stage = status, stage
+        if self.finished:
+            self.finished_at = time.time()
+        event = {"status": status, "stage": stage, "at": time.time()}
+        self.history.append(event)
+        for subscriber in self._subscribers:
+            subscriber.put_nowait(event)
+
+    async def events(self):
+        """Yields every transition of the job, earlier ones first, until it finishes."""
+        # Transitions after this point reach the subscriber queue, earlier ones are in the snapshot
+        subscriber = asyncio.Queue()
+        self._subscribers.append(subscriber)
+        past = list(self.history)
+        try:
+            for event in past:
+                yield event
+            finished = bool(past) and past[-1]["status"] in FINISHED
+            while not finished:
+                event = await subscriber.get()
+                yield event
+                finished = event["status"] in FINISHED
+        finally:
+            self._subscribers.remove(subscriber)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "priority": self.priority,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """
+    Runs jobs through `stages`, a list of (name, async function(job), workers). Each stage
+    has its own priority queue and worker tasks, so stages overlap across jobs: one job can
+    be transcribed while another is being answered. Higher `priority` jobs go first at every
+    stage, equal priorities in submission order.
+
+    At most `max_jobs` jobs may be unfinished at once; `submit` raises QueueFull beyond
+    that, so overload is refused up front instead of piling up. Finished jobs can be
+    looked up for `result_ttl` seconds.
+    """
+
+    def __init__(self, stages, max_jobs=JOB_QUEUE_MAX, result_ttl=JOB_RESULT_TTL_SEC):
+        self.stages = stages
+        self.max_jobs = max_jobs
+        self.result_ttl = result_ttl
+        self.jobs = {}
+        self._queues = None
+        self._order = itertools.count()
+        self._workers = []
+
+    def start(self):
+        """Starts the stage workers; call from the event loop that serves the jobs."""
+        self._queues = [asyncio.PriorityQueue() for _ in self.stages]
+        for index, (name, _, workers) in enumerate(self.stages):
+            for _ in range(max(1, workers)):
+                self._workers.append(asyncio.create_task(self._work(index), name=f"job-{name}"))
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def pending(self):
+        """Number of unfinished jobs."""
+        return sum(not job.finished for job in self.jobs.values())
+
+    def _purge(self):
+        expired = time.time() - self.result_ttl
+        for job_id in [job.id for job in self.jobs.values() if job.finished and job.finished_at < expired]:
+            del self.jobs[job_id]
+
+    def submit(self, data, priority=0):
+        """Queues a job for the first stage and returns it."""
+        self._purge()
+        if self.pending() >= self.max_jobs:
+            raise QueueFull(f"{self.max_jobs} jobs already queued or running")
+        job = Job(data, priority)
+        self.jobs[job.id] = job
+        self._enqueue(job, 0)
+        return job
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def _enqueue(self, job, index):
+        job._transition("queued", self.stages[index][0])
+        self._queues[index].put_nowait((-job.priority, next(self._order), job))
+
+    async def _work(self, index):
+        name, run, _ = self.stages[index]
+        queue = self._queues[index]
+        while True:
+            _, _, job = await queue.get()
+            job._transition("running", name)
+            try:
+                await run(job)
+            except Exception as e:
+                logger.error(f"Job {job.id} failed in {name}: {e}")
+                job.error = f"{name} failed: {e}"
+                job._transition("failed", name)
+                continue
+            if index + 1 < len(self.stages):
+                self._enqueue(job, index + 1)
+            else:
+                job._transition("done", None)
@@ -0,0 +1,131 @@
+"""Rolling transcription of audio while it is still being recorded."""
+import threading
+import time
+
+import numpy as np
+from loguru import logger
+
+from backend.src.constants import (LIVE_CPU_BUDGET, LIVE_INTERVAL_SEC, LIVE_STABLE_SEC, LIVE_WINDOW_SEC,
+                                   SAMPLE_RATE, WHISPER_SAMPLE_RATE)
+from backend.src.local_whisper import get_model, model_lock
+from backend.src.resample import PolyphaseResampler
+from backend.src.vad import detect_speech
+
+
+class LiveTranscriber:
+    """
+    Re-transcribes the uncommitted tail of a recording every `interval_sec` on a background thread.
+
+    A segment is committed once it ends at least `stable_sec` before the end of the audio and
+    came out the same in two consecutive passes; committed audio is dropped, so each pass only
+    decodes the unstable tail (at most `window_sec`). Decoding is throttled so it uses no more
+    than `cpu_budget` of the wall clock, which leaves headroom for capture.
+
+    `on_update(committed, tentative)` is called from the worker thread after every pass.
+    """
+
+    def __init__(self, on_update, sample_rate=SAMPLE_RATE, interval_sec=LIVE_INTERVAL_SEC,
+                 window_sec=LIVE_WINDOW_SEC, stable_sec=LIVE_STABLE_SEC, cpu_budget=LIVE_CPU_BUDGET):
+        self.on_update = on_update
+        self.interval_sec = interval_sec
+        self.window_sec = window_sec
+        self.stable_sec = stable_sec
+        self.cpu_budget = cpu_budget
+        self._resampler = None
+        if sample_rate != WHISPER_SAMPLE_RATE:
+            self._resampler = PolyphaseResampler(sample_rate, WHISPER_SAMPLE_RATE)
+
+        self.committed = ""
+        self._pending = []
+        self._lock = threading.Lock()
+        self._audio = np.zeros(0, dtype=np.float32)  # uncommitted tail at 16 kHz
+        self._previous = []  # segment texts of the last pass
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def feed(self, frames):
+        """Queues newly captured frames. Cheap enough to call from the recording loop."""
+        if len(frames):
+            with self._lock:
+                self._pending.append(np.asarray(frames, dtype=np.float32).reshape(-1))
+
+    def stop(self):
+        """Stops further passes without waiting for one that is in progress to finish."""
+        self._stop.set()
+
+    def _drain(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if pending:
+            frames = np.concatenate(pending)
+            if self._resampler is not None:
+                frames = self._resampler.process(frames)
+            self._audio = np.concatenate([self._audio, frames])
+
+    def _commit(self, texts, cut):
+        if texts:
+            self.committed = " ".join([self.committed] + texts).strip()
+        self._audio = self._audio[cut:]
+
+    def _step(self, model):
+        duration = len(self._audio) / WHISPER_SAMPLE_RATE
+        if not detect_speech(self._audio):
+            # Nothing to transcribe; keep only a little context in case speech is starting
+            self._commit([], max(0, len(self._audio) - int(self.stable_sec * WHISPER_SAMPLE_RATE)))
+            self._previous = []
+            return ""
+
+        result = model.transcribe(
+            self._audio,
+            temperature=0,
+            condition_on_previous_text=False,
+            initial_prompt=self.committed[-200:] or None,
+            fp16=model.device.type == "cuda",
+        )
+        segments = [(s["end"], s["text"].strip()) for s in result["segments"] if s["text"].strip()]
+
+        stable = 0
+        for i, (end, text) in enumerate(segments):
+            if end > duration - self.stable_sec or i >= len(self._previous) or self._previous[i] != text:
+                break
+            stable = i + 1
+        if stable == 0 and duration > self.window_sec:
+            # The window is full and still nothing agrees: commit all but the last segment (or the only one)
+            if not segments:
+                self._commit([], len(self._audio) - int(self.stable_sec * WHISPER_SAMPLE_RATE))
+            stable = max(len(segments) - 1, min(len(segments), 1))
+
+        if stable:
+            self._commit([text for _, text in segments[:stable]], int(segments[stable - 1][0] * WHISPER_SAMPLE_RATE))
+        segments = segments[stable:]
+        self._previous = [text for _, text in segments]
+        return " ".join(self._previous)
+
+    def _run(self):
+        model = get_model()
+        delay = self.interval_sec
+        while not self._stop.wait(delay):
+            self._drain()
+            if len(self._audio) < WHISPER_SAMPLE_RATE // 2:
+                continue
+            # An analysis is decoding: skip this pass instead of waiting for the model
+            if not model_lock.acquire(blocking=False):
+                continue
+            start = time.perf_counter()
+            try:
+                tentative = self._step(model)
+            except Exception as e:
+                logger.error(f"Live transcription failed: {e}")
+                continue
+            finally:
+                model_lock.release()
+            elapsed = time.perf_counter() - start
+            # Stay within the CPU budget: decode time / (decode time + wait) <= cpu_budget
+            delay = max(self.interval_sec, elapsed / self.cpu_budget - elapsed)
+            if not self._stop.is_set():
+                self.on_update(self.committed, tentative)
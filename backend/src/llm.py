@@ -1,8 +1,14 @@
 import os
-import requests
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from loguru import logger
 
-from backend.src.constants import OUTPUT_FILE_NAME, POSTION
+from backend.src.constants import (ANSWER_DEADLINE_SEC, FULL_ANSWER_MAX_TOKENS, OLLAMA_MAX_CONCURRENT, OUTPUT_FILE_NAME,
+                                   POSTION, SHORT_ANSWER_MAX_TOKENS)
+from backend.src.intent_matcher import IntentMatcher
+from backend.src.llm_client import DeadlineExceeded, OllamaError, deadline_in, ollama_client
+from backend.src.response_cache import prompt_variant, response_cache
 
 # Try to import SpeechRecognition and check availability
 try:
@@ -16,12 +22,25 @@ BANKING_KEYWORDS = [
     "bank", "customer", "finance", "loan", "credit", "debit", "statement", "interest rate",
     "regulation", "risk", "compliance", "investment", "mortgage", "branch",
     "retail banking", "commercial banking", "fintech", "ATM", "deposit",
-    "withdrawal", "transaction", "fraud", "AML", "KYC", "payment", "treasury"
+    "withdrawal", "transaction", "fraud", "fraudulent", "AML", "KYC", "payment", "treasury"
 ]
+# Endings a banking keyword may carry, so "loans", "banking" and "regulations" count too
+BANKING_SUFFIXES = ["s", "es", "ing", "ed", "er", "ers", "al"]
+
+# Prompt variants generated for each question, by name
+ANSWER_VARIANTS = {
+    "short": {"short_answer": True, "temperature": 0},
+    "full": {"short_answer": False, "temperature": 0.2},
+}
+
+# Shared by all fan-outs, so at most OLLAMA_MAX_CONCURRENT requests reach Ollama at once
+_answer_executor = ThreadPoolExecutor(max_workers=max(1, OLLAMA_MAX_CONCURRENT), thread_name_prefix="ollama")
+
+# Whole-word, case-insensitive matching, so "ATM" matches and "bank" doesn't fire on "embankment"
+banking_matcher = IntentMatcher({"banking": BANKING_KEYWORDS}, suffixes=BANKING_SUFFIXES)
 
 def is_banking_question(transcript: str) -> bool:
-    lower_transcript = transcript.lower()
-    return any(keyword in lower_transcript for keyword in BANKING_KEYWORDS)
+    return "banking" in banking_matcher.match(transcript)
 
 def transcribe_audio(path_to_file=OUTPUT_FILE_NAME):
     """
@@ -53,67 +72,161 @@ def transcribe_audio(path_to_file=OUTPUT_FILE_NAME):
         logger.error(f"Error in transcription: {e}")
         return f"Transcription error: {e}"
 
-def generate_answer(transcript, short_answer=True, temperature=0.3):
+def build_answer_payload(transcript, short_answer=True, temperature=0.3):
     """
-    Generates an answer based on the given transcript using Ollama.
+    Builds the Ollama request payload for an answer to the given transcript.
     For banking-related questions, use STAR model; otherwise, give end-to-end technical answer.
     """
-    try:
-        # Detect type of question
-        if is_banking_question(transcript):
-            # STAR model for banking
-            model_instruction = (
-                "Answer using the STAR (Situation, Task, Action, Result) framework. "
-                "Give examples based on UK law & Regulations. "
-                "Strongly emphasize the Action and Result sections: "
-                "describe in detail **what YOU did to resolve the issue**, and provide specific, concrete examples of your actions and the positive outcome. "
-                "Use first-person language and focus on your personal contribution."
-            )
-        else:
-            # Technical: comprehensive end-to-end explanation
-            model_instruction = (
-                "Provide a comprehensive, step-by-step technical answer suitable for an interview. "
-                "Explain your reasoning and solution clearly."
-                "Also give coding examples for an interviewer to understand the solution."
-            )
-
-        # Prompt style
-        if short_answer:
-            instruction = "Limit your answer to about 70 words."
-            max_tokens = 500
-        else:
-            instruction = "Keep your answer under 150 words."
-            max_tokens = 5000
-
-        # System and final prompts
-        system_prompt = f"You are interviewing for a {POSTION} position. Respond professionally."
-        prompt = (
-            f"{system_prompt}\n\n"
-            f"Question (transcribed audio): {transcript}\n\n"
-            f"{model_instruction}\n"
-            f"{instruction}\n\n"
-            "Your answer:\n"
+    # Detect type of question
+    if is_banking_question(transcript):
+        # STAR model for banking
+        model_instruction = (
+            "Answer using the STAR (Situation, Task, Action, Result) framework. "
+            "Give examples based on UK law & Regulations. "
+            "Strongly emphasize the Action and Result sections: "
+            "describe in detail **what YOU did to resolve the issue**, and provide specific, concrete examples of your actions and the positive outcome. "
+            "Use first-person language and focus on your personal contribution."
+        )
+    else:
+        # Technical: comprehensive end-to-end explanation
+        model_instruction = (
+            "Provide a comprehensive, step-by-step technical answer suitable for an interview. "
+            "Explain your reasoning and solution clearly."
+            "Also give coding examples for an interviewer to understand the solution."
         )
 
-        payload = {
-            "model": "llama2",  # Set this as needed
-            "prompt": prompt,
-            "temperature": temperature,
-            "max_tokens": max_tokens,
-            "stream": False
-        }
-
-        logger.debug("Sending request to Ollama...")
-        response = requests.post("http://localhost:11434/api/generate", json=payload, timeout=30)
-
-        if response.status_code == 200:
-            answer = response.json().get("response", "")
-            logger.debug(f"Received response: {answer[:50]}...")
-            return answer
-        else:
-            error_msg = f"Error from Ollama API: {response.status_code} - {response.text}"
-            logger.error(error_msg)
-            return f"Error generating answer: {error_msg}"
+    # Prompt style
+    if short_answer:
+        instruction = "Limit your answer to about 70 words."
+        max_tokens = SHORT_ANSWER_MAX_TOKENS
+    else:
+        instruction = "Keep your answer under 150 words."
+        max_tokens = FULL_ANSWER_MAX_TOKENS
+
+    # The system prompt and instructions come first and never change between questions, so
+    # Ollama can reuse the prefill of that shared prefix while it keeps the model loaded
+    system_prompt = f"You are interviewing for a {POSTION} position. Respond professionally."
+    preamble = (
+        f"{system_prompt}\n\n"
+        f"{model_instruction}\n"
+        f"{instruction}\n\n"
+    )
+    prompt = (
+        f"Question (transcribed audio): {transcript}\n\n"
+        "Your answer:\n"
+    )
+
+    # The client adds the configured model and the stream flag. Sampling settings and the
+    # token budget only take effect inside "options"
+    return {
+        "prompt": preamble + prompt,
+        "options": {"temperature": temperature, "num_predict": max_tokens},
+    }
+
+def _cache_key(transcript, payload, short_answer, temperature):
+    """Response cache arguments for an answer to `transcript` from this payload."""
+    variant = prompt_variant("llm.short" if short_answer else "llm.full", payload, transcript)
+    return transcript, variant, ollama_client.model, temperature
+
+def generate_answer(transcript, short_answer=True, temperature=0.3, timeout=ANSWER_DEADLINE_SEC):
+    """
+    Generates an answer based on the given transcript using Ollama.
+    Answers to questions seen before come from the response cache. If the answer takes
+    longer than `timeout` seconds, the part generated so far is returned.
+    """
+    parts = []
+    try:
+        for token in generate_answer_stream(transcript, short_answer, temperature, timeout):
+            parts.append(token)
+        answer = "".join(parts)
+        logger.debug(f"Received response: {answer[:50]}...")
+        return answer
+    except DeadlineExceeded:
+        return "".join(parts)
+    except OllamaError as e:
+        logger.error(str(e))
+        return f"Error generating answer: {e}"
     except Exception as e:
         logger.error(f"Error generating answer: {e}")
-        return "Sorry, I couldn't generate an answer. Make sure Ollama is running correctly."
\ No newline at end of file
+        return "Sorry, I couldn't generate an answer. Make sure Ollama is running correctly."
+
+def generate_answer_stream(transcript, short_answer=True, temperature=0.3, timeout=ANSWER_DEADLINE_SEC):
+    """
+    Streaming version of generate_answer: yields the answer piece by piece as Ollama
+    produces it. Raises on errors, and DeadlineExceeded after `timeout` seconds, once the
+    text generated in time has been yielded; a cut-off answer isn't cached.
+    """
+    payload = build_answer_payload(transcript, short_answer, temperature)
+    cache_key = _cache_key(transcript, payload, short_answer, temperature)
+    cached = response_cache.get(*cache_key)
+    if cached is not None:
+        yield cached
+        return
+
+    logger.debug("Sending streaming request to Ollama...")
+    start = time.perf_counter()
+    parts = []
+    try:
+        for token in ollama_client.stream(payload, deadline_in(timeout)):
+            parts.append(token)
+            yield token
+    except DeadlineExceeded:
+        logger.warning(f"Answer cut off by its {timeout:g} s deadline")
+        raise
+    response_cache.put(*cache_key, "".join(parts), time.perf_counter() - start)
+
+def _generate_variant(name, transcript, options, on_token, on_answer, cancel):
+    parts = []
+    if cancel is not None and cancel.is_set():
+        return ""
+    stream = generate_answer_stream(transcript, **options)
+    try:
+        for token in stream:
+            if cancel is not None and cancel.is_set():
+                # Closing the stream drops the connection, which stops Ollama generating
+                logger.debug(f"{name} answer cancelled")
+                return "".join(parts)
+            parts.append(token)
+            if on_token:
+                on_token(name, token)
+    except DeadlineExceeded:
+        # Keep the partial answer, marked so it isn't mistaken for a complete one
+        timeout = options.get("timeout", ANSWER_DEADLINE_SEC)
+        marker = f"\n[Answer cut off after {timeout:g} s]"
+        parts.append(marker)
+        if on_token:
+            on_token(name, marker)
+    except Exception as e:
+        logger.error(f"Error generating {name} answer: {e}")
+        if isinstance(e, OllamaError):
+            error = f"Error generating answer: {e}"
+        else:
+            error = "Sorry, I couldn't generate an answer. Make sure Ollama is running correctly."
+        error = f"\n{error}" if parts else error
+        parts.append(error)
+        if on_token:
+            on_token(name, error)
+    finally:
+        stream.close()
+    answer = "".join(parts)
+    if on_answer:
+        on_answer(name, answer)
+    return answer
+
+def generate_answers(transcript, variants=None, on_token=None, on_answer=None, cancel=None):
+    """
+    Generates an answer for each prompt variant at the same time, so the analysis takes about
+    as long as the slowest variant instead of the sum of all of them.
+
+    `variants` maps a name to generate_answer keyword arguments (default ANSWER_VARIANTS).
+    `on_token(name, text)` is called as each variant streams in and `on_answer(name, answer)`
+    once it is complete, both from worker threads. An answer cut off by the answer deadline
+    ends with a note saying so, sent through on_token like the rest.
+    Setting the `cancel` event stops the generations early, without a final on_answer.
+    Returns immediately with a dict of name -> Future of the (possibly partial) answer.
+    """
+    variants = ANSWER_VARIANTS if variants is None else variants
+    return {
+        name: _answer_executor.submit(_generate_variant, name, transcript, options, on_token, on_answer, cancel)
+        for name, options in variants.items()
+    }
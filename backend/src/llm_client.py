@@ -0,0 +1,332 @@
+"""Pooled keep-alive clients for the Ollama generate API."""
+import asyncio
+import json
+import random
+import time
+
+import aiohttp
+import requests
+from loguru import logger
+from requests.adapters import HTTPAdapter
+
+from backend.src.constants import (OLLAMA_CONNECT_TIMEOUT_SEC, OLLAMA_KEEP_ALIVE, OLLAMA_MAX_CONCURRENT, OLLAMA_MODEL,
+                                   OLLAMA_READ_TIMEOUT_SEC, OLLAMA_RETRIES, OLLAMA_RETRY_BACKOFF_SEC, OLLAMA_URL)
+from backend.src.ollama_health import ollama_health
+
+# Responses worth retrying: Ollama busy (queue full) or a proxy in front of it not ready yet
+RETRY_STATUSES = {429, 502, 503, 504}
+
+
+class OllamaError(Exception):
+    """Ollama answered with an error status or an error message."""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class OllamaUnavailable(OllamaError):
+    """The health circuit is open: Ollama has been failing, so the request wasn't sent."""
+
+
+class DeadlineExceeded(Exception):
+    """A generation ran out of time; a stream has already yielded all the text it will get."""
+
+
+def deadline_in(seconds):
+    """The time.monotonic() deadline `seconds` from now, or None for no deadline."""
+    return None if seconds is None else time.monotonic() + seconds
+
+
+def _time_left(deadline):
+    """Seconds until `deadline` (None for no deadline); raises DeadlineExceeded once it has passed."""
+    if deadline is None:
+        return None
+    left = deadline - time.monotonic()
+    if left <= 0:
+        raise DeadlineExceeded("Ollama did not finish before the deadline")
+    return left
+
+
+def _check_timeout(deadline):
+    """Raises DeadlineExceeded if a timeout was the deadline's doing (timers can fire a little early)."""
+    if deadline is not None:
+        _time_left(deadline - 0.05)
+
+
+def _check_circuit(health):
+    if health is not None and health.is_open():
+        raise OllamaUnavailable(f"Ollama is unavailable: {health.last_error}", 503)
+
+
+def _record_failure(health, error):
+    """Counts failures that say Ollama is down or broken; a rejected request (4xx) says nothing about that."""
+    if health is not None and not (isinstance(error, OllamaError) and error.status is not None and error.status < 500):
+        health.record_failure(error)
+
+
+def _backoff(attempt, base):
+    """Exponential backoff with full jitter, so clients that failed together don't retry together."""
+    return random.uniform(0, base * 2 ** attempt)
+
+
+def _parse_line(line):
+    """Parses one NDJSON line of a streamed response."""
+    chunk = json.loads(line)
+    if "error" in chunk:
+        raise OllamaError(f"Error from Ollama API: {chunk['error']}")
+    return chunk
+
+
+class _TokenTimer:
+    """Logs time to first token and total time of a streamed generation."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.first_token = None
+
+    def token(self):
+        if self.first_token is None:
+            self.first_token = time.perf_counter() - self.start
+            logger.info(f"Ollama time to first token: {1000 * self.first_token:.0f} ms")
+
+    def done(self):
+        logger.debug(f"Ollama stream finished after {time.perf_counter() - self.start:.1f} s")
+
+
+class OllamaClient:
+    """
+    Blocking Ollama client. Connections are kept alive in a pool of up to `pool_size`,
+    so calls after the first skip the TCP handshake. Requests that fail to connect or
+    get a busy response are retried `retries` times with jittered exponential backoff;
+    a stream is never retried once it has started. Every request asks Ollama to keep the
+    model loaded for OLLAMA_KEEP_ALIVE, so it can reuse the prefill of a prompt prefix
+    shared with the previous request. Safe to share between threads.
+
+    Generation budgets go in the payload's "options" (e.g. "num_predict"); Ollama ignores
+    unknown top-level fields. A stream can also be given a wall-clock deadline.
+
+    Request outcomes are reported to `health` (an OllamaHealth), and while its circuit is
+    open requests raise OllamaUnavailable without being sent.
+    """
+
+    def __init__(self, url=OLLAMA_URL, model=OLLAMA_MODEL, connect_timeout=OLLAMA_CONNECT_TIMEOUT_SEC,
+                 read_timeout=OLLAMA_READ_TIMEOUT_SEC, retries=OLLAMA_RETRIES, backoff=OLLAMA_RETRY_BACKOFF_SEC,
+                 pool_size=OLLAMA_MAX_CONCURRENT, health=None):
+        self.url = url
+        self.model = model
+        self.health = health
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _post(self, payload, deadline=None):
+        _check_circuit(self.health)
+        try:
+            response = self._send(payload, deadline)
+        except (requests.RequestException, OllamaError) as e:
+            _record_failure(self.health, e)
+            raise
+        if self.health is not None:
+            self.health.record_success()
+        return response
+
+    def _send(self, payload, deadline):
+        payload = {"model": self.model, "keep_alive": OLLAMA_KEEP_ALIVE, **payload}
+        for attempt in range(self.retries + 1):
+            timeout = self.timeout
+            left = _time_left(deadline)
+            if left is not None:
+                # Waiting for Ollama past the deadline is pointless
+                timeout = (min(timeout[0], left), min(timeout[1], left))
+            try:
+                response = self.session.post(self.url, json=payload, stream=payload.get("stream", False),
+                                             timeout=timeout)
+            except requests.ConnectionError as e:
+                error = e
+            except requests.Timeout:
+                _check_timeout(deadline)
+                raise
+            else:
+                if response.status_code == 200:
+                    return response
+                error = OllamaError(f"Error from Ollama API: {response.status_code} - {response.text}",
+                                    response.status_code)
+                response.close()
+                if response.status_code not in RETRY_STATUSES:
+                    raise error
+            if attempt < self.retries:
+                delay = _backoff(attempt, self.backoff)
+                logger.warning(f"Ollama request failed ({error}), retrying in {delay:.2f} s")
+                time.sleep(delay)
+        raise error
+
+    def generate(self, payload, deadline=None):
+        """Sends a non-streamed generate request and returns the parsed response."""
+        result = self._post({**payload, "stream": False}, deadline).json()
+        if "error" in result:
+            raise OllamaError(f"Error from Ollama API: {result['error']}")
+        return result
+
+    def stream(self, payload, deadline=None):
+        """
+        Sends a streamed generate request and yields the answer text as it arrives.
+        Raises DeadlineExceeded once `deadline` (a time.monotonic() time) passes, after
+        yielding the text that arrived in time. Closing the generator early drops the
+        connection, which stops Ollama generating.
+        """
+        timer = _TokenTimer()
+        try:
+            with self._post({**payload, "stream": True}, deadline) as response:
+                for line in response.iter_lines():
+                    if line:
+                        chunk = _parse_line(line)
+                        if chunk.get("response"):
+                            timer.token()
+                            yield chunk["response"]
+                        if chunk.get("done"):
+                            break
+                    _time_left(deadline)
+        except requests.RequestException:
+            _check_timeout(deadline)  # a read cut short by the deadline
+            raise
+        timer.done()
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncOllamaClient:
+    """
+    asyncio version of OllamaClient. The aiohttp session is created on first use and
+    belongs to the event loop that created it; a new one is made if the loop changes.
+    Whoever owns the loop calls close() before the loop ends (the API does so in its
+    lifespan shutdown); a session a running loop still holds is closed on that loop.
+    """
+
+    def __init__(self, url=OLLAMA_URL, model=OLLAMA_MODEL, connect_timeout=OLLAMA_CONNECT_TIMEOUT_SEC,
+                 read_timeout=OLLAMA_READ_TIMEOUT_SEC, retries=OLLAMA_RETRIES, backoff=OLLAMA_RETRY_BACKOFF_SEC,
+                 pool_size=OLLAMA_MAX_CONCURRENT, health=None):
+        self.url = url
+        self.model = model
+        self.health = health
+        self.timeout = aiohttp.ClientTimeout(connect=connect_timeout, sock_read=read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.pool_size = max(1, pool_size)
+        self._session = None
+        self._loop = None
+
+    async def _get_session(self):
+        loop = asyncio.get_running_loop()
+        if self._session is not None and self._loop is not loop:
+            self._drop_stale_session()
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size), timeout=self.timeout
+            )
+            self._loop = loop
+        return self._session
+
+    def _drop_stale_session(self):
+        """Forgets the previous loop's session, closing it on that loop if it is still running."""
+        session, loop = self._session, self._loop
+        self._session = None
+        if session.closed:
+            return
+        if loop.is_running():
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+        else:
+            logger.warning("Ollama session left open by an event loop that ended without calling close()")
+
+    async def _post(self, payload, deadline=None):
+        _check_circuit(self.health)
+        try:
+            response = await self._send(payload, deadline)
+        except (aiohttp.ClientError, asyncio.TimeoutError, OllamaError) as e:
+            _record_failure(self.health, e)
+            raise
+        if self.health is not None:
+            self.health.record_success()
+        return response
+
+    async def _send(self, payload, deadline):
+        payload = {"model": self.model, "keep_alive": OLLAMA_KEEP_ALIVE, **payload}
+        session = await self._get_session()
+        for attempt in range(self.retries + 1):
+            try:
+                response = await asyncio.wait_for(session.post(self.url, json=payload), _time_left(deadline))
+            except aiohttp.ClientConnectionError as e:
+                error = e
+            except asyncio.TimeoutError:
+                _check_timeout(deadline)
+                raise
+            else:
+                if response.status == 200:
+                    return response
+                error = OllamaError(f"Error from Ollama API: {response.status} - {await response.text()}",
+                                    response.status)
+                response.release()
+                if response.status not in RETRY_STATUSES:
+                    raise error
+            if attempt < self.retries:
+                delay = _backoff(attempt, self.backoff)
+                logger.warning(f"Ollama request failed ({error}), retrying in {delay:.2f} s")
+                await asyncio.sleep(delay)
+        raise error
+
+    async def generate(self, payload, deadline=None):
+        """Sends a non-streamed generate request and returns the parsed response."""
+        response = await self._post({**payload, "stream": False}, deadline)
+        try:
+            result = await response.json()
+        finally:
+            response.release()
+        if "error" in result:
+            raise OllamaError(f"Error from Ollama API: {result['error']}")
+        return result
+
+    async def stream(self, payload, deadline=None):
+        """
+        Sends a streamed generate request and yields the answer text as it arrives.
+        Raises DeadlineExceeded once `deadline` (a time.monotonic() time) passes, after
+        yielding the text that arrived in time. Cancelling the consuming task drops the
+        connection, which stops Ollama generating.
+        """
+        timer = _TokenTimer()
+        response = await self._post({**payload, "stream": True}, deadline)
+        try:
+            while True:
+                try:
+                    line = await asyncio.wait_for(response.content.readline(), _time_left(deadline))
+                except asyncio.TimeoutError:
+                    _check_timeout(deadline)
+                    raise
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                chunk = _parse_line(line)
+                if chunk.get("response"):
+                    timer.token()
+                    yield chunk["response"]
+                if chunk.get("done"):
+                    break
+        finally:
+            response.release()
+        timer.done()
+
+    async def close(self):
+        """Closes the session; call it on the loop that used the client, before the loop ends."""
+        session, self._session = self._session, None
+        if session is not None and not session.closed:
+            await session.close()
+
+
+# Shared clients, so every caller reuses the same connection pools and health circuit
+ollama_client = OllamaClient(health=ollama_health)
+async_ollama_client = AsyncOllamaClient(health=ollama_health)
@@ -1,27 +1,119 @@
+import asyncio
 import os
+import tempfile
+import time
+import soundfile as sf
 from loguru import logger
-import requests
-from backend.src.constants import OUTPUT_FILE_NAME, POSTION
-from backend.src.local_whisper import (transcribe_audio_locally)  # Import Whisper-based function
+from backend.src.audio_io import load_audio
+from backend.src.constants import (ANSWER_DEADLINE_SEC, FULL_ANSWER_MAX_TOKENS, LONG_AUDIO_MIN_SEC, OUTPUT_FILE_NAME,
+                                   POSTION, SHORT_ANSWER_MAX_TOKENS, VAD_ENABLED, WHISPER_MODEL_SIZE,
+                                   WHISPER_SAMPLE_RATE)
+from backend.src.llm_client import DeadlineExceeded, OllamaError, async_ollama_client, deadline_in, ollama_client
+from backend.src.response_cache import prompt_variant, response_cache
+from backend.src.transcript_cache import audio_key, transcript_cache
+from backend.src.local_whisper import (load_samples, transcribe_audio_locally, transcribe_batch_locally,
+                                       transcribe_long_audio)  # Import Whisper-based functions
 
-def transcribe_local(path_to_file=OUTPUT_FILE_NAME):
+def transcript_key(samples, parallel=True):
+    """Transcript cache key for transcribing `samples` the way transcribe_local would."""
+    long_audio = parallel and len(samples) > LONG_AUDIO_MIN_SEC * WHISPER_SAMPLE_RATE
+    return audio_key(samples, model=WHISPER_MODEL_SIZE, vad=VAD_ENABLED, chunked=long_audio)
+
+def transcribe_local(audio=OUTPUT_FILE_NAME, parallel=True, use_cache=True):
     """
     Transcribes audio using the locally-installed Whisper model.
+    `audio` is a file path, the bytes of an audio file, or a mono float32 array at 16 kHz.
+    With `parallel`, recordings longer than LONG_AUDIO_MIN_SEC are split into chunks
+    transcribed in separate processes (pass False when already inside a worker process).
+    Audio transcribed before is answered from the transcript cache unless `use_cache` is False.
     """
-    if not os.path.exists(path_to_file):
-        raise Exception(f"Audio file not found at {path_to_file}. Please record audio first.")
+    if isinstance(audio, str) and not os.path.exists(audio):
+        raise Exception(f"Audio file not found at {audio}. Please record audio first.")
     try:
+        samples = load_samples(audio)
+        key = transcript_key(samples, parallel) if use_cache else None
+        if key is not None:
+            cached = transcript_cache.get(key)
+            if cached is not None:
+                return cached
+
         logger.info("Transcribing audio with Whisper...")
-        text = transcribe_audio_locally(path_to_file)
+        if parallel and len(samples) > LONG_AUDIO_MIN_SEC * WHISPER_SAMPLE_RATE:
+            text = transcribe_long_audio(samples)["text"]
+        else:
+            text = transcribe_audio_locally(samples)
         logger.info(f"Whisper transcription successful: {text[:50]}...")
+        if key is not None:
+            transcript_cache.put(key, text)
         return text
     except Exception as e:
         logger.error(f"Error in transcription: {e}")
         return f"Transcription error: {e}"
 
-def generate_answer_with_ollama(transcript, short_answer=True, temperature=0.2):
+def transcribe_upload(data, filename=""):
     """
-    Generates an answer based on the given transcript using Ollama.
+    Transcribes uploaded audio bytes without touching the shared output file.
+    WAV/FLAC/OGG are decoded in memory; other formats go through a temp file owned by this call.
+    """
+    try:
+        samples = load_audio(data)
+    except sf.LibsndfileError:
+        logger.debug(f"Cannot decode {filename or 'upload'} in memory, using a temp file")
+    else:
+        return transcribe_local(samples, parallel=False)
+
+    suffix = os.path.splitext(filename or "")[1]
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+        tmp.write(data)
+    try:
+        return transcribe_local(tmp.name, parallel=False)
+    finally:
+        os.remove(tmp.name)
+
+def transcribe_uploads_batch(uploads):
+    """
+    Batch version of transcribe_upload. `uploads` is a list of (bytes, filename) pairs.
+    Clips transcribed before are answered from the transcript cache; only the rest are batched.
+    Returns one {"text", "error"} dict per upload, in input order.
+    """
+    results = [None] * len(uploads)
+    pending = []  # (index, samples, cache key) of the clips Whisper has to transcribe
+    for i, (data, filename) in enumerate(uploads):
+        try:
+            samples = load_audio(data)
+        except sf.LibsndfileError:
+            suffix = os.path.splitext(filename or "")[1]
+            with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+                tmp.write(data)
+            try:
+                samples = load_samples(tmp.name)
+            except Exception as e:
+                results[i] = {"text": None, "error": f"Failed to load audio: {e}"}
+                continue
+            finally:
+                os.remove(tmp.name)
+        except Exception as e:
+            results[i] = {"text": None, "error": f"Failed to load audio: {e}"}
+            continue
+        key = transcript_key(samples, parallel=False)
+        cached = transcript_cache.get(key)
+        if cached is not None:
+            results[i] = {"text": cached, "error": None}
+        else:
+            pending.append((i, samples, key))
+
+    if pending:
+        logger.info(f"Batch transcribing {len(pending)} of {len(uploads)} clip(s) with Whisper...")
+        transcribed = transcribe_batch_locally([samples for _, samples, _ in pending])
+        for (i, _, key), result in zip(pending, transcribed):
+            if result["error"] is None:
+                transcript_cache.put(key, result["text"])
+            results[i] = result
+    return results
+
+def build_ollama_payload(transcript, short_answer=True, temperature=0.2):
+    """
+    Builds the Ollama request payload for an interview answer.
     """
     # Define system prompts
     if short_answer:
@@ -29,7 +121,7 @@ def generate_answer_with_ollama(transcript, short_answer=True, temperature=0.2):
             "Concisely respond, limiting your answer to 70 words. "
             "If the question asks for an example or can be demonstrated with code, provide a code example along with your concise explanation."
         )
-        max_tokens = 500
+        max_tokens = SHORT_ANSWER_MAX_TOKENS
     else:
         instruction = (
             "Before answering, take a deep breath and think one step at a time. "
@@ -37,45 +129,115 @@ def generate_answer_with_ollama(transcript, short_answer=True, temperature=0.2):
             "If possible, always write your answer with code and briefly explain the code."
             "If question is related to architecture make sure you always explain the proper architecture"
         )
-        max_tokens = 10000
+        max_tokens = FULL_ANSWER_MAX_TOKENS
 
     system_prompt = f"You are interviewing for a {POSTION} position. Respond professionally."
 
-    try:
-        # Craft the prompt
-        prompt = f"""
+    # Craft the prompt: a static preamble first, so Ollama can reuse its prefill across questions, then the question
+    preamble = f"""
 {system_prompt}
 
-Question from interview (transcribed audio): {transcript}
-
 {instruction}
 
+"""
+    prompt = f"""Question from interview (transcribed audio): {transcript}
+
 Your answer:
 """
 
-        # Prepare the request payload
-        payload = {
-            "model": "llama2",  # or any other model you have on Ollama
-            "prompt": prompt,
-            "temperature": temperature,
-            "max_tokens": max_tokens,
-            "stream": False
-        }
+    # Prepare the request payload (the client adds the configured model and the stream flag).
+    # Sampling settings and the token budget only take effect inside "options"
+    return {
+        "prompt": preamble + prompt,
+        "options": {"temperature": temperature, "num_predict": max_tokens},
+    }
+
+def _cache_key(transcript, payload, short_answer, temperature):
+    """Response cache arguments for an answer to `transcript` from this payload."""
+    variant = prompt_variant("api.short" if short_answer else "api.full", payload, transcript)
+    return transcript, variant, ollama_client.model, temperature
+
+def generate_answer_with_ollama(transcript, short_answer=True, temperature=0.2, timeout=ANSWER_DEADLINE_SEC):
+    """
+    Generates an answer based on the given transcript using Ollama.
+    Answers to questions seen before come from the response cache. If the answer takes
+    longer than `timeout` seconds, the part generated so far is returned (and not cached).
+    """
+    parts = []
+    try:
+        payload = build_ollama_payload(transcript, short_answer, temperature)
+        cache_key = _cache_key(transcript, payload, short_answer, temperature)
+        cached = response_cache.get(*cache_key)
+        if cached is not None:
+            return cached
 
         # Make the request to Ollama
         logger.debug(f"Sending request to Ollama...")
-        response = requests.post("http://localhost:11434/api/generate", json=payload)
+        start = time.perf_counter()
+        for token in ollama_client.stream(payload, deadline_in(timeout)):
+            parts.append(token)
+        answer = "".join(parts)
+        logger.debug(f"Received response from Ollama: {answer[:50]}...")
+        response_cache.put(*cache_key, answer, time.perf_counter() - start)
+        return answer
 
-        # Check if the request was successful
-        if response.status_code == 200:
-            answer = response.json().get("response", "")
-            logger.debug(f"Received response from Ollama: {answer[:50]}...")
-            return answer
-        else:
-            error = f"Error from Ollama API: {response.status_code} - {response.text}"
-            logger.error(error)
-            return f"Error generating answer: {error}"
+    except DeadlineExceeded:
+        logger.warning(f"Answer cut off by its {timeout:g} s deadline")
+        return "".join(parts)
+    except OllamaError as e:
+        logger.error(str(e))
+        return f"Error generating answer: {e}"
+    except Exception as e:
+        logger.error(f"Error generating answer: {e}")
+        return "Sorry, I couldn't generate an answer. Make sure Ollama is running correctly."
 
+async def generate_answer_with_ollama_async(transcript, short_answer=True, temperature=0.2,
+                                            timeout=ANSWER_DEADLINE_SEC):
+    """
+    Async version of generate_answer_with_ollama, for use inside the FastAPI event loop.
+    Returns (answer, truncated), where `truncated` says whether the answer was cut off by
+    the deadline. Cancelling the calling task stops the generation in Ollama.
+    """
+    parts = []
+    try:
+        async for token in stream_answer_with_ollama_async(transcript, short_answer, temperature, timeout):
+            parts.append(token)
+        answer = "".join(parts)
+        logger.debug(f"Received response from Ollama: {answer[:50]}...")
+        return answer, False
+
+    except DeadlineExceeded:
+        return "".join(parts), True
+    except OllamaError as e:
+        logger.error(str(e))
+        return f"Error generating answer: {e}", False
     except Exception as e:
         logger.error(f"Error generating answer: {e}")
-        return "Sorry, I couldn't generate an answer. Make sure Ollama is running correctly."
\ No newline at end of file
+        return "Sorry, I couldn't generate an answer. Make sure Ollama is running correctly.", False
+
+async def stream_answer_with_ollama_async(transcript, short_answer=True, temperature=0.2,
+                                          timeout=ANSWER_DEADLINE_SEC):
+    """
+    Async generator yielding the answer piece by piece as Ollama produces it. Raises on errors,
+    and DeadlineExceeded after `timeout` seconds, once the text generated in time has been
+    yielded; a cut-off answer isn't cached.
+    """
+    payload = build_ollama_payload(transcript, short_answer, temperature)
+    cache_key = _cache_key(transcript, payload, short_answer, temperature)
+    # The cache may read or write its SQLite file, which mustn't block the event loop
+    cached = await asyncio.to_thread(response_cache.get, *cache_key)
+    if cached is not None:
+        yield cached
+        return
+
+    logger.debug(f"Sending async streaming request to Ollama...")
+    start = time.perf_counter()
+    parts = []
+    try:
+        async for token in async_ollama_client.stream(payload, deadline_in(timeout)):
+            parts.append(token)
+            yield token
+    except DeadlineExceeded:
+        logger.warning(f"Answer cut off by its {timeout:g} s deadline")
+        raise
+    await asyncio.to_thread(response_cache.put, *cache_key, "".join(parts), time.perf_counter() - start)
@@ -1,39 +1,238 @@
+import multiprocessing as mp
 import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import soundfile as sf
+import torch
 import whisper
 from loguru import logger
 
-from backend.src.constants import (OUTPUT_FILE_NAME)
+from backend.src.audio_io import load_audio
+from backend.src.constants import (LONG_AUDIO_CHUNK_SEC, LONG_AUDIO_OVERLAP_SEC, LONG_AUDIO_WORKERS,
+                                   OUTPUT_FILE_NAME, TRANSCRIBE_BATCH_SIZE, VAD_ENABLED, WHISPER_MODEL_SIZE,
+                                   WHISPER_SAMPLE_RATE)
+from backend.src.vad import trim_silence, untrimmed_time
 
 # Load the model (only once)
 # Options are: 'tiny', 'base', 'small', 'medium', 'large'
-MODEL_SIZE = 'base'  # Use 'base' for a balance of speed and accuracy
+MODEL_SIZE = WHISPER_MODEL_SIZE
 model = None
+# Whisper installs per-call hooks on the model, so decodes in one process must take turns
+model_lock = threading.Lock()
 
-def get_model():
+def get_model(model_size=None):
     global model
     if model is None:
-        logger.info(f"Loading Whisper {MODEL_SIZE} model...")
-        model = whisper.load_model(MODEL_SIZE)
+        model_size = model_size or MODEL_SIZE
+        logger.info(f"Loading Whisper {model_size} model...")
+        model = whisper.load_model(model_size)
         logger.info("Model loaded successfully")
     return model
 
-def transcribe_audio_locally(path_to_file=OUTPUT_FILE_NAME):
+def load_samples(audio):
+    """
+    Returns `audio` as a 16 kHz float32 array. WAV/FLAC/OGG are decoded in-process;
+    other files fall back to Whisper's ffmpeg loader.
+    """
+    try:
+        return load_audio(audio)
+    except sf.LibsndfileError:
+        if not isinstance(audio, (str, os.PathLike)):
+            raise
+        logger.debug(f"Cannot decode {audio} in-process, falling back to ffmpeg")
+        return whisper.load_audio(os.fspath(audio))
+
+def transcribe_audio_locally(audio=OUTPUT_FILE_NAME, vad=VAD_ENABLED):
     """
     Transcribes audio using the locally-installed Whisper model.
     No OpenAI API key required.
+    `audio` is a file path, the bytes of an audio file, or a mono float32 array at 16 kHz.
+    With `vad`, silence and short noises are trimmed out before Whisper sees the audio.
     """
-    if not os.path.exists(path_to_file):
-        raise Exception(f"Audio file not found at {path_to_file}. Please record audio first.")
+    is_path = isinstance(audio, (str, os.PathLike))
+    if is_path and not os.path.exists(audio):
+        raise Exception(f"Audio file not found at {audio}. Please record audio first.")
 
     try:
         # Get the model
         model = get_model()
 
+        # Decode in-process where possible so Whisper doesn't spawn ffmpeg
+        samples = load_samples(audio)
+
+        if vad:
+            speech, regions = trim_silence(samples)
+            logger.debug(f"VAD kept {len(speech) / WHISPER_SAMPLE_RATE:.1f}s of "
+                         f"{len(samples) / WHISPER_SAMPLE_RATE:.1f}s in {len(regions)} region(s)")
+            if not regions:
+                return ""
+            samples = speech
+
         # Transcribe the audio
-        logger.debug(f"Transcribing audio from {path_to_file}...")
-        result = model.transcribe(path_to_file)
+        logger.debug(f"Transcribing audio from {audio if is_path else 'memory'}...")
+        with model_lock:
+            result = model.transcribe(samples)
 
         return result["text"]
     except Exception as e:
         logger.error(f"Error transcribing audio locally: {e}")
-        raise Exception(f"Failed to transcribe audio: {e}")
\ No newline at end of file
+        raise Exception(f"Failed to transcribe audio: {e}")
+
+def transcribe_batch_locally(clips, batch_size=TRANSCRIBE_BATCH_SIZE, vad=VAD_ENABLED):
+    """
+    Transcribes many clips, running the Whisper encoder and decoder on batches of
+    stacked log-mel spectrograms instead of clip by clip.
+    `clips` holds file paths, audio file bytes or 16 kHz float32 arrays.
+    With `vad`, each clip's silence is trimmed before it is batched, and a clip with no
+    speech gets an empty transcript.
+    Returns one {"text", "error"} dict per clip, in input order.
+    """
+    model = get_model()
+    results = [None] * len(clips)
+    short_clips = []  # (index, samples) that fit in one 30-second window
+
+    for i, clip in enumerate(clips):
+        try:
+            samples = load_samples(clip)
+        except Exception as e:
+            results[i] = {"text": None, "error": f"Failed to load audio: {e}"}
+            continue
+        if vad:
+            samples, regions = trim_silence(samples)
+            if not regions:
+                results[i] = {"text": "", "error": None}
+                continue
+        if len(samples) > whisper.audio.N_SAMPLES:
+            # Longer clips need Whisper's sliding-window loop
+            try:
+                with model_lock:
+                    results[i] = {"text": model.transcribe(samples)["text"], "error": None}
+            except Exception as e:
+                results[i] = {"text": None, "error": f"Failed to transcribe audio: {e}"}
+        else:
+            short_clips.append((i, samples))
+
+    options = whisper.DecodingOptions(fp16=model.device.type == "cuda")
+    for start in range(0, len(short_clips), batch_size):
+        batch = short_clips[start:start + batch_size]
+        try:
+            mel = torch.stack([
+                whisper.log_mel_spectrogram(whisper.pad_or_trim(samples), model.dims.n_mels)
+                for _, samples in batch
+            ]).to(model.device)
+            logger.debug(f"Decoding batch of {len(batch)} clip(s)...")
+            with model_lock:
+                decoded = whisper.decode(model, mel, options)
+            for (i, _), result in zip(batch, decoded):
+                results[i] = {"text": result.text, "error": None}
+        except Exception as e:
+            logger.error(f"Error transcribing batch: {e}")
+            for i, _ in batch:
+                results[i] = {"text": None, "error": f"Failed to transcribe audio: {e}"}
+
+    return results
+
+def find_split_points(samples, chunk_sec=LONG_AUDIO_CHUNK_SEC, search_sec=None, frame_sec=0.03):
+    """
+    Returns sample indices at which to cut `samples` into chunks of roughly `chunk_sec`,
+    each placed at the quietest 30 ms frame within `search_sec` of the target.
+    """
+    frame = int(frame_sec * WHISPER_SAMPLE_RATE)
+    n_frames = len(samples) // frame
+    if n_frames == 0:
+        return []
+    energy = np.square(samples[:n_frames * frame].reshape(n_frames, frame)).mean(axis=1)
+
+    search = int((search_sec or chunk_sec / 6) / frame_sec)
+    step = int(chunk_sec / frame_sec)
+    points = []
+    target = step
+    while target < n_frames - search:
+        lo = max(target - search, 0)
+        quietest = lo + int(np.argmin(energy[lo:target + search]))
+        points.append(quietest * frame)
+        target = quietest + step
+    return points
+
+def _init_chunk_worker(model_size, threads):
+    torch.set_num_threads(threads)
+    get_model(model_size)
+
+def _transcribe_chunk(samples, offset_sec, own_start, own_end, vad=VAD_ENABLED):
+    """
+    Transcribes one chunk and keeps the segments whose midpoint falls in its own (non-overlap) span.
+    With `vad`, the chunk's silence is trimmed first and segment times are mapped back onto the chunk.
+    """
+    regions = None
+    if vad:
+        samples, regions = trim_silence(samples)
+        if not regions:
+            return []
+    result = get_model().transcribe(samples)
+    segments = []
+    for segment in result["segments"]:
+        start, end = segment["start"], segment["end"]
+        if regions is not None:
+            start, end = untrimmed_time(start, regions), untrimmed_time(end, regions)
+        start, end = start + offset_sec, end + offset_sec
+        if own_start <= (start + end) / 2 < own_end:
+            segments.append({"start": start, "end": end, "text": segment["text"].strip()})
+    return segments
+
+def _drop_repeated_words(previous, text, max_words=8):
+    """Drops words at the start of `text` that repeat the end of `previous` (overlap bleed)."""
+    prev_words, words = previous.lower().split(), text.split()
+    for n in range(min(max_words, len(prev_words), len(words)), 0, -1):
+        if prev_words[-n:] == [w.lower() for w in words[:n]]:
+            return " ".join(words[n:])
+    return text
+
+def make_chunk_executor(workers=LONG_AUDIO_WORKERS):
+    """Process pool for long-audio chunks, each process with its own model and share of the cores."""
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=mp.get_context("spawn"),
+        initializer=_init_chunk_worker,
+        initargs=(MODEL_SIZE, threads),
+    )
+
+_chunk_executor = None
+
+def get_chunk_executor():
+    global _chunk_executor
+    if _chunk_executor is None:
+        _chunk_executor = make_chunk_executor()
+    return _chunk_executor
+
+def transcribe_long_audio(audio, executor=None, vad=VAD_ENABLED):
+    """
+    Transcribes a long recording by cutting it at quiet points into overlapping chunks
+    and transcribing the chunks in parallel processes. With `vad`, each chunk's silence
+    is trimmed before Whisper sees it, as for a short recording.
+    Returns {"text", "segments"} with timestamps relative to the whole recording.
+    """
+    samples = load_samples(audio)
+    executor = executor or get_chunk_executor()
+    overlap = int(LONG_AUDIO_OVERLAP_SEC * WHISPER_SAMPLE_RATE)
+    bounds = [0] + find_split_points(samples) + [len(samples)]
+    logger.debug(f"Transcribing {len(samples) / WHISPER_SAMPLE_RATE:.0f}s of audio in {len(bounds) - 1} chunk(s)...")
+
+    futures = []
+    for own_start, own_end in zip(bounds[:-1], bounds[1:]):
+        start, end = max(own_start - overlap, 0), min(own_end + overlap, len(samples))
+        futures.append(executor.submit(
+            _transcribe_chunk, samples[start:end], start / WHISPER_SAMPLE_RATE,
+            own_start / WHISPER_SAMPLE_RATE, own_end / WHISPER_SAMPLE_RATE if own_end < len(samples) else float("inf"),
+            vad,
+        ))
+
+    segments = []
+    for future in futures:
+        for segment in future.result():
+            if segments:
+                segment["text"] = _drop_repeated_words(segments[-1]["text"], segment["text"])
+            if segment["text"]:
+                segments.append(segment)
+    return {"text": " ".join(segment["text"] for segment in segments), "segments": segments}
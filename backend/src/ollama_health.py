@@ -0,0 +1,137 @@
+"""Background health monitor and circuit breaker for the Ollama server."""
+import threading
+import time
+
+import requests
+from loguru import logger
+
+from backend.src.constants import (OLLAMA_BASE_URL, OLLAMA_CIRCUIT_FAILURES, OLLAMA_HEALTH_INTERVAL_SEC,
+                                   OLLAMA_HEALTH_TIMEOUT_SEC, OLLAMA_MODEL)
+
+
+def _model_names(response):
+    """Model names listed by /api/tags or /api/ps, with the implicit ":latest" tag spelled out."""
+    names = set()
+    for model in response.json().get("models", []):
+        name = model.get("name") or model.get("model", "")
+        names.add(name if ":" in name else f"{name}:latest")
+    return names
+
+
+class OllamaHealth:
+    """
+    Tracks whether Ollama can answer. A daemon thread probes the server every `interval`
+    seconds: it is healthy when it responds and has `model` pulled. The clients report
+    the outcome of their requests too.
+
+    After `failure_threshold` consecutive failures the circuit opens and the clients fail
+    requests at once instead of waiting on a server that is down. Probing carries on while
+    the circuit is open, and the first success closes it again. The probe thread only runs
+    once start() is called; without it, an open circuit lets a request through every
+    `interval` seconds to find out whether Ollama is back. Thread-safe.
+    """
+
+    def __init__(self, base_url=OLLAMA_BASE_URL, model=OLLAMA_MODEL, interval=OLLAMA_HEALTH_INTERVAL_SEC,
+                 timeout=OLLAMA_HEALTH_TIMEOUT_SEC, failure_threshold=OLLAMA_CIRCUIT_FAILURES):
+        self.base_url = base_url.rstrip("/")
+        self.model = model if ":" in model else f"{model}:latest"
+        self.interval = interval
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.failures = 0
+        self.last_error = None
+        self._failed_at = None  # time.monotonic() of the last failure
+        self.model_available = None
+        self.loaded_models = []
+        self.checked_at = None
+
+    def start(self):
+        """Starts the probe thread, if it isn't running yet."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return self
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.probe()
+            self._stop.wait(self.interval)
+
+    def probe(self):
+        """Checks that Ollama responds and has the model pulled, and lists the models it has loaded."""
+        try:
+            tags = requests.get(f"{self.base_url}/api/tags", timeout=self.timeout)
+            tags.raise_for_status()
+            # /api/ps only exists in newer Ollama versions
+            ps = requests.get(f"{self.base_url}/api/ps", timeout=self.timeout)
+            loaded = sorted(_model_names(ps)) if ps.ok else []
+            available = self.model in _model_names(tags)
+        except (requests.RequestException, ValueError) as e:
+            self.record_failure(f"Ollama not reachable at {self.base_url}: {e}")
+            return False
+        with self._lock:
+            self.model_available = available
+            self.loaded_models = loaded
+            self.checked_at = time.time()
+        if not available:
+            self.record_failure(f"Model {self.model} is not pulled into Ollama (run: ollama pull {self.model})")
+            return False
+        self.record_success()
+        return True
+
+    def record_success(self):
+        with self._lock:
+            was_open = self._circuit_open()
+            self.failures = 0
+            self.last_error = None
+        if was_open:
+            logger.info("Ollama is available again, circuit closed")
+
+    def record_failure(self, error):
+        with self._lock:
+            was_open = self._circuit_open()
+            self.failures += 1
+            self.last_error = str(error)
+            self._failed_at = time.monotonic()
+            opened = not was_open and self._circuit_open()
+        if opened:
+            logger.warning(f"Ollama failed {self.failures} times in a row, circuit opened: {error}")
+
+    def _circuit_open(self):
+        return self.failures >= self.failure_threshold
+
+    def _monitoring(self):
+        return self._thread is not None and self._thread.is_alive() and not self._stop.is_set()
+
+    def is_open(self):
+        """True while Ollama is considered down, so requests should fail fast."""
+        with self._lock:
+            if not self._circuit_open():
+                return False
+            return self._monitoring() or time.monotonic() - self._failed_at < self.interval
+
+    def status(self):
+        with self._lock:
+            return {
+                "circuit": "open" if self._circuit_open() else "closed",
+                "consecutive_failures": self.failures,
+                "last_error": self.last_error,
+                "model": self.model,
+                "model_available": self.model_available,
+                "model_loaded": self.model in self.loaded_models,
+                "loaded_models": self.loaded_models,
+                "checked_at": self.checked_at,
+            }
+
+
+# Shared by both Ollama clients, so everything in the process sees the same circuit
+ollama_health = OllamaHealth()
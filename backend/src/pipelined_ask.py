@@ -0,0 +1,106 @@
+"""Answering a question while the rest of it is still being transcribed."""
+import asyncio
+
+from backend.src.constants import (PIPELINE_MAX_SEGMENT_SEC, PIPELINE_MIN_WORDS, PIPELINE_PAUSE_SEC,
+                                   RESPONSE_CACHE_SIMILARITY, WHISPER_SAMPLE_RATE)
+from backend.src.llm_client import DeadlineExceeded
+from backend.src.local_whisper import find_split_points
+from backend.src.response_cache import minhash, normalize
+from backend.src.vad import detect_speech
+
+
+def split_segments(samples, pause_sec=PIPELINE_PAUSE_SEC, max_segment_sec=PIPELINE_MAX_SEGMENT_SEC):
+    """
+    Cuts a 16 kHz clip into utterances: the speech regions VAD finds over the whole clip
+    (split at pauses of `pause_sec`), with regions longer than `max_segment_sec` cut again
+    at their quietest points. The utterances hold the same speech whole-clip transcription
+    keeps.
+    """
+    segments = []
+    for start, end in detect_speech(samples, WHISPER_SAMPLE_RATE, min_silence_sec=pause_sec):
+        region = samples[start:end]
+        bounds = [0] + find_split_points(region, max_segment_sec) + [len(region)]
+        segments += [region[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:])]
+    return segments
+
+
+def changes_question(before, after, similarity=RESPONSE_CACHE_SIMILARITY):
+    """
+    Whether `after` is materially a different question from `before`: less alike than two
+    transcripts the answer cache would treat as the same question.
+    """
+    return (minhash(normalize(before)) == minhash(normalize(after))).mean() < similarity
+
+
+async def pipelined_answer(segments, answer_stream, min_words=PIPELINE_MIN_WORDS):
+    """
+    Answers a question whose transcript arrives segment by segment, starting to generate
+    (and so prefill the prompt) as soon as `min_words` have been transcribed instead of
+    after the last segment. Later segments only restart the answer if they change the
+    question materially (see changes_question); a trailing "thanks" doesn't.
+
+    `segments` is an async iterator of segment transcripts in order, and
+    `answer_stream(question)` an async generator of answer text. Yields events:
+        ("segment", text)       a segment was transcribed
+        ("restart", question)   tokens sent so far are void, the answer starts over
+        ("token", text)         answer text
+        ("transcript", text)    the whole transcript, after the last segment
+        ("done", truncated)     the answer is complete (truncated by the answer deadline)
+    Errors from either side are raised.
+    """
+    events = asyncio.Queue()
+    answering = None  # (question, task) of the generation in progress
+
+    async def generate(question):
+        try:
+            async for token in answer_stream(question):
+                events.put_nowait(("token", token))
+            events.put_nowait(("answered", (question, False)))
+        except DeadlineExceeded:
+            events.put_nowait(("answered", (question, True)))
+        except Exception as e:
+            events.put_nowait(("error", e))
+
+    def answer(question):
+        nonlocal answering
+        if answering is not None:
+            answering[1].cancel()
+            events.put_nowait(("restart", question))
+        answering = (question, asyncio.create_task(generate(question)))
+
+    async def transcribe():
+        texts = []
+        try:
+            async for text in segments:
+                events.put_nowait(("segment", text))
+                texts.append(text.strip())
+                question = " ".join(filter(None, texts))
+                if len(question.split()) < min_words:
+                    continue
+                if answering is None or changes_question(answering[0], question):
+                    answer(question)
+            question = " ".join(filter(None, texts))
+            if answering is None or changes_question(answering[0], question):
+                answer(question)
+            events.put_nowait(("transcript", question))
+        except Exception as e:
+            events.put_nowait(("error", e))
+
+    transcriber = asyncio.create_task(transcribe())
+    transcribed = False
+    answered = None
+    try:
+        while not (transcribed and answered is not None and answered[0] == answering[0]):
+            kind, data = await events.get()
+            if kind == "error":
+                raise data
+            if kind == "answered":
+                answered = data
+                continue
+            transcribed = transcribed or kind == "transcript"
+            yield kind, data
+        yield "done", answered[1]
+    finally:
+        transcriber.cancel()
+        if answering is not None:
+            answering[1].cancel()
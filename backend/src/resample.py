@@ -0,0 +1,97 @@
+"""Sample-rate conversion."""
+from math import gcd
+
+import numpy as np
+
+# Try to import SciPy (preferred for one-shot resampling)
+try:
+    from scipy.signal import resample_poly
+    scipy_available = True
+except ImportError:
+    scipy_available = False
+
+
+def resample(samples, from_rate, to_rate):
+    """
+    Resamples a whole clip (first axis is time) from `from_rate` to `to_rate`.
+    Uses scipy.signal.resample_poly when available, otherwise PolyphaseResampler.
+    """
+    samples = np.asarray(samples, dtype=np.float32)
+    if from_rate == to_rate:
+        return samples
+    if scipy_available:
+        g = gcd(int(from_rate), int(to_rate))
+        return resample_poly(samples, int(to_rate) // g, int(from_rate) // g, axis=0).astype(np.float32)
+
+    resampler = PolyphaseResampler(from_rate, to_rate)
+    # Push zeros through so the filter delay doesn't cut off the end, then trim it from the start
+    delay = round((resampler.taps_per_phase * resampler.up - 1) / 2 / resampler.down)
+    padding = np.zeros((resampler.taps_per_phase,) + samples.shape[1:], dtype=np.float32)
+    out = np.concatenate([resampler.process(samples), resampler.process(padding)])
+    expected = -(-len(samples) * resampler.up // resampler.down)
+    return out[delay:delay + expected]
+
+
+class PolyphaseResampler:
+    """
+    Streaming rational resampler (e.g. 44100 Hz -> 16000 Hz).
+
+    Uses a Kaiser-windowed sinc low-pass split into `up` polyphase branches, so only the
+    taps that land on real input samples are evaluated. Each block is processed with a
+    single gather + einsum, and the tail of the previous block is carried over so
+    consecutive blocks resample seamlessly.
+    """
+
+    def __init__(self, from_rate, to_rate, taps_per_phase=64, beta=8.6):
+        g = gcd(int(from_rate), int(to_rate))
+        self.from_rate = from_rate
+        self.to_rate = to_rate
+        self.up = int(to_rate) // g
+        self.down = int(from_rate) // g
+        self.taps_per_phase = taps_per_phase
+
+        # Low-pass just below the lower of the two Nyquist frequencies, in the upsampled domain,
+        # so the transition band is over before anything can alias back into the output
+        num_taps = taps_per_phase * self.up
+        cutoff = 0.9 / max(self.up, self.down)
+        t = np.arange(num_taps) - (num_taps - 1) / 2
+        h = cutoff * np.sinc(cutoff * t) * np.kaiser(num_taps, beta)
+        h *= self.up / h.sum()
+        # phases[p, k] = h[p + k * up]
+        self.phases = h.reshape(taps_per_phase, self.up).T.astype(np.float32)
+
+        self.reset()
+
+    def reset(self):
+        self._history = None
+        self._in_count = 0  # input frames consumed so far
+        self._out_count = 0  # output frames produced so far
+
+    def process(self, frames):
+        """Resamples the next block of a stream. `frames` is (n,) or (n, channels)."""
+        frames = np.asarray(frames, dtype=np.float32)
+        squeeze = frames.ndim == 1
+        if squeeze:
+            frames = frames[:, None]
+        if self.up == self.down:
+            return frames[:, 0] if squeeze else frames
+
+        k = self.taps_per_phase
+        if self._history is None:
+            self._history = np.zeros((k - 1, frames.shape[1]), dtype=np.float32)
+        buffer = np.concatenate([self._history, frames])
+        buffer_start = self._in_count - (k - 1)  # absolute index of buffer[0]
+        self._in_count += len(frames)
+
+        # Every output whose newest input sample has now arrived
+        out_end = (self._in_count * self.up + self.down - 1) // self.down
+        n = np.arange(self._out_count, out_end, dtype=np.int64)
+        self._out_count = out_end
+
+        base = n * self.down // self.up
+        phase = n * self.down % self.up
+        idx = (base - buffer_start)[:, None] - np.arange(k)[None, :]
+        out = np.einsum("nk,nkc->nc", self.phases[phase], buffer[idx])
+
+        self._history = buffer[len(buffer) - (k - 1):]
+        return out[:, 0] if squeeze else out
@@ -0,0 +1,182 @@
+"""Cache of generated answers for repeated or near-identical questions."""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+from loguru import logger
+
+from backend.src.constants import (RESPONSE_CACHE_DB, RESPONSE_CACHE_NEAR_DUPLICATES, RESPONSE_CACHE_SIMILARITY,
+                                   RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL_SEC)
+
+MINHASH_PERMUTATIONS = 128
+# Permutations are (a * x + b) mod p over 32-bit word hashes; with p < 2**31 nothing overflows 64 bits
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(1)
+_HASH_A = _rng.integers(1, _PRIME, MINHASH_PERMUTATIONS, dtype=np.uint64)
+_HASH_B = _rng.integers(0, _PRIME, MINHASH_PERMUTATIONS, dtype=np.uint64)
+
+
+def normalize(transcript):
+    """Lower-cases, drops punctuation and collapses whitespace, so trivial differences still match."""
+    return " ".join(re.sub(r"[^\w\s]", " ", transcript.lower()).split())
+
+
+def minhash(text):
+    """
+    MinHash signature of the words of `text`; equal positions estimate Jaccard similarity.
+    Whole words rather than character shingles, so questions that differ in one key term
+    ("... in Java" / "... in C++") stay apart.
+    """
+    words = set(text.split()) or {""}
+    hashes = np.array([zlib.crc32(word.encode()) for word in words], dtype=np.uint64)
+    return ((np.outer(hashes, _HASH_A) + _HASH_B) % _PRIME).min(axis=0)
+
+
+def prompt_variant(name, payload, transcript):
+    """
+    Prompt variant for caching the answer to `payload`: `name` plus a hash of everything in
+    the payload except the transcript (preamble, position, token budget, sampling options),
+    so changing how the prompt is built doesn't serve answers to the old prompt.
+    """
+    template = {**payload, "prompt": payload["prompt"].replace(transcript, "{transcript}")}
+    digest = hashlib.sha1(json.dumps(template, sort_keys=True).encode()).hexdigest()[:12]
+    return f"{name}:{digest}"
+
+
+class ResponseCache:
+    """
+    LRU cache of answers with a time-to-live, keyed on the normalized transcript, the prompt
+    variant, the model and the temperature. Optionally mirrored to a SQLite file so answers
+    survive restarts, and optionally matching near-duplicate transcripts by MinHash
+    similarity (at least `similarity`) within the same variant, model and temperature.
+    Thread-safe.
+    """
+
+    def __init__(self, max_entries=RESPONSE_CACHE_SIZE, ttl_sec=RESPONSE_CACHE_TTL_SEC, db_path=RESPONSE_CACHE_DB,
+                 near_duplicates=RESPONSE_CACHE_NEAR_DUPLICATES, similarity=RESPONSE_CACHE_SIMILARITY):
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self.near_duplicates = near_duplicates
+        self.similarity = similarity
+        self._entries = OrderedDict()  # key -> (scope, answer, created, latency, signature)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.latency_saved = 0.0
+
+        self._db = None
+        if db_path:
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, scope TEXT, normalized TEXT, "
+                "answer TEXT, created REAL, latency REAL)"
+            )
+            self._load()
+
+    @staticmethod
+    def _scope(variant, model, temperature):
+        return f"{variant}|{model}|{temperature}"
+
+    @staticmethod
+    def _key(normalized, scope):
+        return hashlib.sha1(f"{scope}|{normalized}".encode()).hexdigest()
+
+    def _load(self):
+        """Fills the memory tier with the newest unexpired answers from disk."""
+        cutoff = time.time() - self.ttl_sec
+        self._db.execute("DELETE FROM responses WHERE created < ?", (cutoff,))
+        self._db.commit()
+        rows = self._db.execute(
+            "SELECT key, scope, normalized, answer, created, latency FROM responses ORDER BY created DESC LIMIT ?",
+            (self.max_entries,),
+        ).fetchall()
+        for key, scope, normalized, answer, created, latency in reversed(rows):
+            signature = minhash(normalized) if self.near_duplicates else None
+            self._entries[key] = (scope, answer, created, latency, signature)
+        logger.debug(f"Loaded {len(rows)} cached answer(s) from disk")
+
+    def _find_similar(self, normalized, scope):
+        candidates = [(key, entry[4]) for key, entry in self._entries.items() if entry[0] == scope]
+        if not candidates:
+            return None
+        signatures = np.stack([signature for _, signature in candidates])
+        scores = (signatures == minhash(normalized)).mean(axis=1)
+        best = int(scores.argmax())
+        return candidates[best][0] if scores[best] >= self.similarity else None
+
+    def get(self, transcript, variant, model, temperature):
+        """Returns the cached answer, or None on a miss."""
+        normalized = normalize(transcript)
+        scope = self._scope(variant, model, temperature)
+        key = self._key(normalized, scope)
+        with self._lock:
+            entry = self._entries.get(key)
+            near = False
+            if entry is None and self.near_duplicates and normalized:
+                similar = self._find_similar(normalized, scope)
+                if similar is not None:
+                    key, entry, near = similar, self._entries[similar], True
+            if entry is not None and time.time() - entry[2] > self.ttl_sec:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.near_hits += near
+            self.latency_saved += entry[3]
+        logger.info(f"Answer cache {'near ' if near else ''}hit for {variant}, saved {entry[3]:.1f} s")
+        return entry[1]
+
+    def put(self, transcript, variant, model, temperature, answer, latency):
+        """Stores an answer together with how long it took to generate."""
+        normalized = normalize(transcript)
+        scope = self._scope(variant, model, temperature)
+        key = self._key(normalized, scope)
+        created = time.time()
+        signature = minhash(normalized) if self.near_duplicates else None
+        with self._lock:
+            self._entries[key] = (scope, answer, created, latency, signature)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, scope, normalized, answer, created, latency),
+                )
+                self._db.commit()
+
+    def clear(self):
+        """Forgets every answer, on disk too."""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "latency_saved_sec": round(self.latency_saved, 3),
+            }
+
+
+# Shared by the GUI and API answer functions
+response_cache = ResponseCache()
@@ -1,5 +1,7 @@
 import random
 
+from backend.src.intent_matcher import IntentMatcher
+
 class ResponseGenerator:
     """
     Class responsible for generating responses to user queries.
@@ -48,6 +50,16 @@ class ResponseGenerator:
                 "That's beyond my current capabilities, but I'm learning!"
             ]
         }
+
+        # Keywords for each category, checked in this order of priority
+        self.keywords = {
+            "greeting": ["hello", "hi", "hey", "greetings"],
+            "farewell": ["bye", "goodbye", "see you", "farewell"],
+            "thanks": ["thanks", "thank you", "appreciate"],
+            "weather": ["weather", "temperature", "forecast", "rain", "sunny"],
+            "time": ["time", "hour", "clock"]
+        }
+        self.matcher = IntentMatcher(self.keywords, suffixes=["s"])
     
     def generate_response(self, query):
         """
@@ -59,39 +71,20 @@ class ResponseGenerator:
         Returns:
             str: The generated response
         """
-        query_lower = query.lower()
-        
-        # Check for greetings
-        if any(word in query_lower for word in ["hello", "hi", "hey", "greetings"]):
-            return random.choice(self.responses["greeting"])
-        
-        # Check for farewells
-        elif any(word in query_lower for word in ["bye", "goodbye", "see you", "farewell"]):
-            return random.choice(self.responses["farewell"])
-        
-        # Check for thanks
-        elif any(word in query_lower for word in ["thanks", "thank you", "appreciate"]):
-            return random.choice(self.responses["thanks"])
-        
-        # Check for weather queries
-        elif any(word in query_lower for word in ["weather", "temperature", "forecast", "rain", "sunny"]):
-            return random.choice(self.responses["weather"])
-        
-        # Check for time queries
-        elif any(word in query_lower for word in ["time", "hour", "clock"]):
-            return random.choice(self.responses["time"])
-        
-        # Default response for unrecognized queries
-        else:
-            return random.choice(self.responses["default"])
+        # One pass finds every matching category; the first by priority wins
+        intents = self.matcher.match(query)
+        category = next((category for category in self.keywords if category in intents), "default")
+        return random.choice(self.responses[category])
     
-    def add_custom_response(self, category, response):
+    def add_custom_response(self, category, response, keywords=None):
         """
         Add a custom response to a category.
         
         Args:
             category (str): The category to add the response to
             response (str): The response to add
+            keywords (list, optional): Words or phrases that select this category.
+                New categories come after the built-in ones in priority.
             
         Returns:
             bool: True if the response was added successfully, False otherwise
@@ -100,4 +93,7 @@ class ResponseGenerator:
             self.responses[category].append(response)
         else:
             self.responses[category] = [response]
+        if keywords:
+            self.keywords.setdefault(category, []).extend(keywords)
+            self.matcher.add(category, keywords)
         return True
\ No newline at end of file
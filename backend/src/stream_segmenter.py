@@ -0,0 +1,70 @@
+"""Pause-based segmentation of streamed audio."""
+import numpy as np
+
+from backend.src.constants import STREAM_FLOOR_SEC, STREAM_MAX_SEGMENT_SEC, STREAM_PAUSE_SEC, WHISPER_SAMPLE_RATE
+from backend.src.vad import detect_speech
+
+
+class StreamSegmenter:
+    """
+    Collects streamed 16 kHz audio and cuts it into utterances at pauses.
+
+    An utterance is final once `pause_sec` of non-speech follows it, or once it reaches
+    `max_segment_sec`. Positions are absolute sample indices since the start of the stream.
+
+    While nothing stands out as speech, the last `floor_sec` of audio is kept: a stream that
+    starts mid-sentence has no quiet part to measure the noise floor against, and its speech
+    is only found once a pause arrives.
+    """
+
+    def __init__(self, pause_sec=STREAM_PAUSE_SEC, max_segment_sec=STREAM_MAX_SEGMENT_SEC,
+                 floor_sec=STREAM_FLOOR_SEC, sample_rate=WHISPER_SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.pause = int(pause_sec * sample_rate)
+        self.max_segment = int(max_segment_sec * sample_rate)
+        self.floor = max(int(floor_sec * sample_rate), self.pause)
+        self._audio = np.zeros(0, dtype=np.float32)
+        self._offset = 0  # absolute index of self._audio[0]
+        self._speech_start = None  # where the pending utterance starts in self._audio, if one has
+
+    @property
+    def received(self):
+        """Total samples fed so far."""
+        return self._offset + len(self._audio)
+
+    def feed(self, samples):
+        self._audio = np.concatenate([self._audio, np.asarray(samples, dtype=np.float32)])
+
+    def pending(self):
+        """The speech not yet part of a final utterance, as of the last pop_final."""
+        if self._speech_start is None:
+            return self._audio[:0]
+        return self._audio[self._speech_start:]
+
+    def _drop(self, count):
+        self._audio = self._audio[count:]
+        self._offset += count
+        self._speech_start = None
+
+    def pop_final(self, flush=False):
+        """
+        Returns (start, end, samples) for the next finished utterance, or None.
+        With `flush`, whatever speech is pending is returned as final.
+        """
+        regions = detect_speech(self._audio, self.sample_rate)
+        if not regions:
+            self._drop(max(len(self._audio) - self.floor, 0))
+            return None
+
+        start, end = regions[0][0], regions[-1][1]
+        if not flush and len(self._audio) - end < self.pause:
+            if end - start < self.max_segment:
+                self._speech_start = start
+                return None
+            # Over-long utterance: cut at the end of the last finished region, or right here
+            end = regions[-2][1] if len(regions) > 1 else len(self._audio)
+
+        samples = self._audio[start:end].copy()
+        absolute = (self._offset + start, self._offset + end)
+        self._drop(end)
+        return absolute[0], absolute[1], samples
@@ -1,10 +1,13 @@
 import os
-import numpy as np
 from loguru import logger
 import customtkinter as ctk
 import threading
-from src import audio, llm, local_transcription
-from src.constants import APPLICATION_WIDTH, OUTPUT_FILE_NAME
+from src import audio, capture
+from src.analysis_pipeline import AnalysisPipeline
+from src.audio_buffer import AudioBuffer
+from src.audio_writer import StreamingAudioWriter
+from src.constants import APPLICATION_WIDTH, OUTPUT_FILE_NAME, STREAM_TO_DISK
+from src.local_transcription import ollama_client
 
 
 class VoiceApp:
@@ -12,6 +15,13 @@ class VoiceApp:
         self.is_recording = False
         self.audio_data = None
         self.recording_thread = None
+        self.analysis = AnalysisPipeline(self.on_analysis_event, variants={
+            "short": {"short_answer": True, "temperature": 0},
+            "full": {"short_answer": False, "temperature": 0.7},
+        })
+        self.analysis_run = 0
+        # Watch Ollama from the start, so answers fail fast if it is down
+        ollama_client.health.start()
 
         # Print debug info
         logger.debug(f"Audio output file will be: {OUTPUT_FILE_NAME}")
@@ -94,36 +104,44 @@ class VoiceApp:
         self.system_radio.grid(row=0, column=2, padx=10, pady=5)
 
     def background_recording_loop(self):
-        self.audio_data = None
-        while self.is_recording:
-            try:
-                # Choose recording method based on selected audio source
-                if self.audio_source_var.get() == "system":
-                    audio_sample = audio.record_system_audio()
-                else:  # Default to microphone
-                    audio_sample = audio.record_batch()
-
-                if self.audio_data is None:
-                    self.audio_data = audio_sample
-                else:
-                    self.audio_data = np.vstack((self.audio_data, audio_sample))
-            except Exception as e:
-                logger.error(f"Recording error: {e}")
-                self.is_recording = False
-                self.app.after(0, lambda: ctk.CTkMessagebox.show_error(
-                    "Recording Error",
-                    f"An error occurred during recording: {e}"
-                ))
-
-        # After recording is complete
-        if self.audio_data is not None:
-            audio.save_audio_file(self.audio_data)
+        self.audio_data = StreamingAudioWriter() if STREAM_TO_DISK else AudioBuffer()
+        stream = None
+        try:
+            if STREAM_TO_DISK:
+                self.audio_data.start()
+            # Choose capture source based on selected audio source
+            if self.audio_source_var.get() == "system":
+                stream = capture.SpeakerCapture()
+            else:  # Default to microphone
+                stream = capture.AudioCapture("microphone")
+            stream.start()
+            while self.is_recording:
+                self.audio_data.append(stream.read(timeout=0.5))
+            stream.stop()
+            self.audio_data.append(stream.read(timeout=0))
+        except Exception as e:
+            logger.error(f"Recording error: {e}")
+            self.is_recording = False
+            self.app.after(0, lambda: ctk.CTkMessagebox.show_error(
+                "Recording Error",
+                f"An error occurred during recording: {e}"
+            ))
+        finally:
+            if stream is not None:
+                stream.stop()
+
+        # After recording is complete (a streamed recording only needs closing)
+        if STREAM_TO_DISK:
+            self.audio_data.close()
+        elif len(self.audio_data) > 0:
+            audio.save_audio_file(self.audio_data.to_array())
 
     def toggle_recording(self):
         self.is_recording = not self.is_recording
         if self.is_recording:
             source_type = "system audio" if self.audio_source_var.get() == "system" else "microphone"
             logger.debug(f"Starting recording from {source_type}...")
+            self.analysis.cancel()  # a new question makes the previous answers moot
             self.record_button.configure(text=f"Stop Recording ({source_type})")
             self.recording_thread = threading.Thread(target=self.background_recording_loop)
             self.recording_thread.start()
@@ -137,31 +155,32 @@ class VoiceApp:
         logger.debug("Analyzing audio...")
         self.analyzed_text.delete("0.0", "end")
         self.analyzed_text.insert("0.0", "Start analyzing...")
+        for box in (self.quick_answer, self.full_answer):
+            box.delete("0.0", "end")
 
-        # Transcribe audio
+        # Transcribe and answer in the background; a new analysis replaces the running one
         try:
-            audio_transcript = local_transcription.transcribe_local()
-            self.analyzed_text.delete("0.0", "end")
-            self.analyzed_text.insert("0.0", audio_transcript)
-
-            # Generate quick answer
-            self.quick_answer.delete("0.0", "end")
-            self.quick_answer.insert("0.0", "Chatgpt is working...")
-            quick_answer_text = llm.generate_answer(audio_transcript, short_answer=True, temperature=0)
-            self.quick_answer.delete("0.0", "end")
-            self.quick_answer.insert("0.0", quick_answer_text)
-
-            # Generate full answer
-            self.full_answer.delete("0.0", "end")
-            self.full_answer.insert("0.0", "Chatgpt is working...")
-            full_answer_text = llm.generate_answer(audio_transcript, short_answer=False, temperature=0.7)
-            self.full_answer.delete("0.0", "end")
-            self.full_answer.insert("0.0", full_answer_text)
+            self.analysis_run = self.analysis.start()
         except Exception as e:
             logger.error(f"Error during analysis: {e}")
             self.analyzed_text.delete("0.0", "end")
             self.analyzed_text.insert("0.0", f"Error: {e}")
 
+    def on_analysis_event(self, run, kind, data):
+        # Called from the analysis threads; widgets are only touched from the Tk loop
+        self.app.after(0, self.show_analysis_event, run, kind, data)
+
+    def show_analysis_event(self, run, kind, data):
+        if run != self.analysis_run:
+            return
+        if kind == "transcript":
+            self.analyzed_text.delete("0.0", "end")
+            self.analyzed_text.insert("0.0", data)
+        elif kind == "token":
+            name, token = data
+            boxes = {"short": self.quick_answer, "full": self.full_answer}
+            boxes[name].insert("end", token)
+
     def run(self):
         self.app.mainloop()
 
@@ -0,0 +1,107 @@
+"""Content-addressed cache of Whisper transcripts."""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from loguru import logger
+
+from backend.src.constants import TRANSCRIPT_CACHE_DB, TRANSCRIPT_CACHE_DISK_ENTRIES, TRANSCRIPT_CACHE_SIZE
+
+
+def audio_key(samples, **options):
+    """
+    Cache key for transcribing `samples` with the given decode options (model size, VAD, ...).
+    The audio is identified by a BLAKE2 hash of its PCM, so the same sound matches however it
+    was uploaded or stored.
+    """
+    digest = hashlib.blake2b(np.ascontiguousarray(samples, dtype=np.float32).data, digest_size=16).hexdigest()
+    return digest + "".join(f"|{name}={value}" for name, value in sorted(options.items()))
+
+
+class TranscriptCache:
+    """
+    LRU cache of transcripts holding up to `max_entries` in memory. If `db_path` is set,
+    transcripts are also kept in a SQLite file of up to `max_disk_entries`, which survives
+    restarts and is shared by every process using the same file. Thread-safe.
+    """
+
+    def __init__(self, max_entries=TRANSCRIPT_CACHE_SIZE, db_path=TRANSCRIPT_CACHE_DB,
+                 max_disk_entries=TRANSCRIPT_CACHE_DISK_ENTRIES):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self._db = None
+        if db_path:
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=10)
+            self._db.execute("CREATE TABLE IF NOT EXISTS transcripts (key TEXT PRIMARY KEY, text TEXT, used REAL)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS transcripts_used ON transcripts (used)")
+
+    def _remember(self, key, text):
+        self._entries[key] = text
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key):
+        """Returns the cached transcript, or None on a miss."""
+        with self._lock:
+            text = self._entries.get(key)
+            if text is not None:
+                self._entries.move_to_end(key)
+            elif self._db is not None:
+                row = self._db.execute("SELECT text FROM transcripts WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    text = row[0]
+                    self._db.execute("UPDATE transcripts SET used = ? WHERE key = ?", (time.time(), key))
+                    self._db.commit()
+                    self._remember(key, text)
+            if text is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        logger.info("Transcript cache hit")
+        return text
+
+    def put(self, key, text):
+        with self._lock:
+            self._remember(key, text)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?)", (key, text, time.time()))
+                # Drop the least recently used transcripts beyond the disk budget
+                self._db.execute(
+                    "DELETE FROM transcripts WHERE key IN "
+                    "(SELECT key FROM transcripts ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_disk_entries,),
+                )
+                self._db.commit()
+
+    def clear(self):
+        """Forgets every transcript, on disk too."""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM transcripts")
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Shared by everything that transcribes in this process
+transcript_cache = TranscriptCache()
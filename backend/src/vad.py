@@ -0,0 +1,125 @@
+"""Voice-activity detection."""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from backend.src.constants import (VAD_ENERGY_MARGIN_DB, VAD_FLUX_MARGIN_DB, VAD_MAX_NOISE_FLOOR_DB,
+                                   VAD_MIN_SILENCE_SEC, VAD_MIN_SPEECH_SEC, VAD_PADDING_SEC, WHISPER_SAMPLE_RATE)
+
+FRAME_SEC = 0.03
+HOP_SEC = 0.01
+JOIN_PAUSE_SEC = 0.1  # Silence trim_silence puts between the speech regions it keeps
+
+
+def frame_features(samples, sample_rate=WHISPER_SAMPLE_RATE, frames_per_pass=6000):
+    """
+    Returns per-frame log energy (dB) and spectral flux (dB) for 30 ms frames with a 10 ms hop.
+    Frames are processed `frames_per_pass` at a time to keep memory flat on long recordings.
+    """
+    frame, hop = int(FRAME_SEC * sample_rate), int(HOP_SEC * sample_rate)
+    if len(samples) < frame:
+        return np.zeros(0), np.zeros(0)
+    all_frames = sliding_window_view(samples, frame)[::hop]  # a view, nothing is copied yet
+    window = np.hanning(frame).astype(np.float32)
+
+    energy_db = np.empty(len(all_frames))
+    flux_db = np.empty(len(all_frames))
+    previous = None
+    for start in range(0, len(all_frames), frames_per_pass):
+        frames = all_frames[start:start + frames_per_pass] * window
+        magnitude = np.abs(np.fft.rfft(frames, axis=1))
+        prepend = magnitude[:1] if previous is None else previous
+        flux = np.maximum(np.diff(magnitude, axis=0, prepend=prepend), 0).sum(axis=1)
+
+        energy_db[start:start + len(frames)] = 10 * np.log10(np.mean(np.square(frames), axis=1) + 1e-10)
+        flux_db[start:start + len(frames)] = 10 * np.log10(flux + 1e-10)
+        previous = magnitude[-1:]
+    return energy_db, flux_db
+
+
+def _runs(mask):
+    """Returns (start, end) frame index pairs of the True runs in `mask`."""
+    edges = np.diff(np.concatenate([[0], mask.astype(np.int8), [0]]))
+    return list(zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
+
+
+def detect_speech(samples, sample_rate=WHISPER_SAMPLE_RATE, energy_margin_db=VAD_ENERGY_MARGIN_DB,
+                  flux_margin_db=VAD_FLUX_MARGIN_DB, min_speech_sec=VAD_MIN_SPEECH_SEC,
+                  min_silence_sec=VAD_MIN_SILENCE_SEC, padding_sec=VAD_PADDING_SEC,
+                  max_noise_floor_db=VAD_MAX_NOISE_FLOOR_DB):
+    """
+    Finds speech regions in a mono recording and returns them as (start, end) sample indices.
+
+    A frame counts as speech when its energy is `energy_margin_db` above the noise floor, or
+    half that above the floor while its spectral flux is `flux_margin_db` above the typical flux
+    (quiet but changing sounds, as speech is). Gaps shorter than `min_silence_sec` are bridged,
+    regions shorter than `min_speech_sec` (e.g. key clicks) are dropped, and each region is
+    padded by `padding_sec` on both sides.
+
+    The noise floor is measured from the quietest frames, but never put above
+    `max_noise_floor_db` dBFS: a clip with no pause in it has no quiet frames, and its floor
+    would otherwise be the speech itself.
+    """
+    energy_db, flux_db = frame_features(samples, sample_rate)
+    if len(energy_db) == 0:
+        return []
+
+    noise_floor = min(np.percentile(energy_db, 10), max_noise_floor_db)
+    typical_flux = np.median(flux_db)
+    speech = (energy_db > noise_floor + energy_margin_db) | (
+        (energy_db > noise_floor + energy_margin_db / 2) & (flux_db > typical_flux + flux_margin_db)
+    )
+
+    hop = int(HOP_SEC * sample_rate)
+    frame = int(FRAME_SEC * sample_rate)
+    min_gap = int(min_silence_sec / HOP_SEC)
+    min_len = int(min_speech_sec / HOP_SEC)
+
+    # Bridge short pauses, then drop short bursts
+    regions = []
+    for start, end in _runs(speech):
+        if regions and start - regions[-1][1] < min_gap:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+    regions = [(start, end) for start, end in regions if end - start >= min_len]
+
+    padding = int(padding_sec * sample_rate)
+    bounds = []
+    for start, end in regions:
+        lo, hi = max(start * hop - padding, 0), min((end - 1) * hop + frame + padding, len(samples))
+        if bounds and lo <= bounds[-1][1]:
+            bounds[-1] = (bounds[-1][0], hi)
+        else:
+            bounds.append((lo, hi))
+    return bounds
+
+
+def trim_silence(samples, sample_rate=WHISPER_SAMPLE_RATE, **kwargs):
+    """
+    Returns only the speech parts of `samples`, joined with short pauses, plus the regions kept.
+    """
+    regions = detect_speech(samples, sample_rate, **kwargs)
+    if not regions:
+        return np.zeros(0, dtype=np.float32), regions
+    pause = np.zeros(int(JOIN_PAUSE_SEC * sample_rate), dtype=np.float32)
+    parts = []
+    for start, end in regions:
+        parts += [samples[start:end], pause]
+    return np.concatenate(parts[:-1]).astype(np.float32, copy=False), regions
+
+
+def untrimmed_time(seconds, regions, sample_rate=WHISPER_SAMPLE_RATE):
+    """
+    Maps a time in trim_silence's output back to the recording it was trimmed from, given
+    the regions it kept. A time inside a joining pause maps to the end of the region before it.
+    """
+    position = seconds * sample_rate
+    pause = int(JOIN_PAUSE_SEC * sample_rate)
+    trimmed = 0
+    for start, end in regions:
+        if position < trimmed + end - start:
+            return (start + position - trimmed) / sample_rate
+        trimmed += end - start + pause
+        if position < trimmed:
+            return end / sample_rate
+    return regions[-1][1] / sample_rate
@@ -0,0 +1,226 @@
+"""Multi-process Whisper worker pool."""
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+from loguru import logger
+
+from backend.src.constants import TRANSCRIBE_WORKERS, WHISPER_MODEL_SIZE, WHISPER_SAMPLE_RATE, WORKER_POLL_SEC
+
+
+def _available_cores():
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+class WorkerDied(Exception):
+    """The worker process a job was sent to exited before returning its result."""
+
+
+def _worker_main(index, model_size, cores, jobs, results):
+    """
+    Worker process: pins itself to its share of cores, loads and warms up the model, then runs jobs.
+    Messages on `results` are (worker index, job id, ok, value); job id None is the ready signal.
+    """
+    try:
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, cores)
+        import torch
+        torch.set_num_threads(len(cores))
+
+        from backend.src import local_whisper
+        model = local_whisper.get_model(model_size)
+        # Warm-up decode so the first real request doesn't pay for lazy initialisation
+        model.transcribe(np.zeros(WHISPER_SAMPLE_RATE, dtype=np.float32))
+    except Exception as e:
+        results.put((index, None, False, str(e)))
+        return
+    results.put((index, None, True, None))
+
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+        job_id, fn, args = job
+        try:
+            results.put((index, job_id, True, fn(*args)))
+        except Exception as e:
+            results.put((index, job_id, False, str(e)))
+
+
+class WhisperPool:
+    """
+    Runs transcription jobs in `size` processes, each holding its own preloaded Whisper model.
+
+    CPU cores are split evenly between the workers, and each job goes to the worker with
+    the fewest jobs in flight. `submit` mirrors concurrent.futures.Executor.submit; the
+    function and its arguments must be picklable. Cancelling a future doesn't stop its job,
+    the result is just discarded when it arrives.
+
+    Workers are checked every `poll_sec`. If one exits, its queued and running jobs fail
+    with WorkerDied and a new process takes its place; a worker that can't be brought back
+    up is left out, and submit raises WorkerDied once none are left.
+    """
+
+    def __init__(self, size=TRANSCRIBE_WORKERS, model_size=WHISPER_MODEL_SIZE, poll_sec=WORKER_POLL_SEC):
+        self.size = max(1, size)
+        self.model_size = model_size
+        self.poll_sec = poll_sec
+        self._ctx = mp.get_context("spawn")
+        self._core_sets = []
+        self._processes = []
+        self._jobs = []
+        self._pending = []
+        self._futures = {}  # job id -> (worker index, future)
+        self._starting = set()  # workers respawned and still loading their model
+        self._excluded = set()  # workers that failed to come back up
+        self._closing = False
+        self._job_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._results = None
+        self._collector = None
+
+    def _spawn(self, index):
+        """Starts the process for worker `index` on its share of the cores, with a fresh job queue."""
+        jobs = self._ctx.Queue()
+        process = self._ctx.Process(target=_worker_main, daemon=True,
+                                    args=(index, self.model_size, self._core_sets[index], jobs, self._results))
+        process.start()
+        return process, jobs
+
+    def start(self):
+        """Starts the workers and blocks until every model is loaded and warmed up."""
+        self._core_sets = [[int(core) for core in cores] or [0]
+                           for cores in np.array_split(_available_cores(), self.size)]
+        self._results = self._ctx.Queue()
+        logger.info(f"Starting {self.size} Whisper {self.model_size} worker(s)...")
+        for index in range(self.size):
+            process, jobs = self._spawn(index)
+            self._processes.append(process)
+            self._jobs.append(jobs)
+            self._pending.append(0)
+
+        ready = set()
+        while len(ready) < self.size:
+            try:
+                index, _, ok, error = self._results.get(timeout=self.poll_sec)
+            except queue.Empty:
+                dead = [i for i, process in enumerate(self._processes) if i not in ready and not process.is_alive()]
+                if dead:
+                    code = self._processes[dead[0]].exitcode
+                    self.shutdown()
+                    raise Exception(f"Whisper worker {dead[0]} exited with code {code} while loading")
+                continue
+            if not ok:
+                self.shutdown()
+                raise Exception(f"Whisper worker {index} failed to start: {error}")
+            ready.add(index)
+        logger.info("Whisper workers ready")
+
+        self._collector = threading.Thread(target=self._collect, daemon=True)
+        self._collector.start()
+
+    def submit(self, fn, *args):
+        future = Future()
+        with self._lock:
+            workers = [i for i in range(self.size) if i not in self._excluded]
+            if not workers:
+                raise WorkerDied("No Whisper workers are left running")
+            index = min(workers, key=self._pending.__getitem__)
+            self._pending[index] += 1
+            job_id = next(self._job_ids)
+            self._futures[job_id] = (index, future)
+            jobs = self._jobs[index]
+        jobs.put((job_id, fn, args))
+        return future
+
+    def _replace_worker(self, index, error, restart):
+        """
+        Fails every job sent to worker `index` that hasn't returned, then starts a new process
+        in its place or, without `restart`, leaves it out of the pool. Both happen under the
+        lock, so no job can be sent to the old process after its jobs were failed.
+        """
+        with self._lock:
+            lost = [job_id for job_id, (worker, _) in self._futures.items() if worker == index]
+            futures = [self._futures.pop(job_id)[1] for job_id in lost]
+            self._pending[index] = 0
+            if restart:
+                self._processes[index], self._jobs[index] = self._spawn(index)
+                self._starting.add(index)
+            else:
+                self._starting.discard(index)
+                self._excluded.add(index)
+        for future in futures:
+            if future.set_running_or_notify_cancel():
+                future.set_exception(WorkerDied(error))
+
+    def _check_workers(self):
+        """Fails the jobs of workers that have exited and starts replacements for them."""
+        if self._closing:
+            return  # workers exiting on shutdown aren't replaced
+        for index, process in enumerate(self._processes):
+            if index in self._excluded or process.is_alive():
+                continue
+            error = f"Whisper worker {index} exited with code {process.exitcode}"
+            if index in self._starting:
+                logger.error(f"{error} while restarting, leaving it out of the pool")
+                self._replace_worker(index, error, restart=False)
+            else:
+                logger.error(f"{error}, restarting it")
+                self._replace_worker(index, error, restart=True)
+
+    def _collect(self):
+        last_check = time.monotonic()
+        while True:
+            try:
+                message = self._results.get(timeout=self.poll_sec)
+            except queue.Empty:
+                message = ()
+            if message is None:
+                break
+            if time.monotonic() - last_check >= self.poll_sec:
+                self._check_workers()
+                last_check = time.monotonic()
+            if not message:
+                continue
+            index, job_id, ok, value = message
+            if job_id is None:
+                # A restarted worker finished loading, or failed to
+                if ok:
+                    self._starting.discard(index)
+                    logger.info(f"Whisper worker {index} restarted")
+                else:
+                    logger.error(f"Whisper worker {index} failed to restart, leaving it out of the pool: {value}")
+                    self._replace_worker(index, f"Whisper worker {index} failed to restart: {value}", restart=False)
+                continue
+            with self._lock:
+                entry = self._futures.pop(job_id, None)
+                if entry is not None:
+                    self._pending[index] -= 1
+            # The caller may have cancelled while the job was queued or running; drop its result.
+            # A job of a worker that has since died has already been failed
+            if entry is None or not entry[1].set_running_or_notify_cancel():
+                continue
+            if ok:
+                entry[1].set_result(value)
+            else:
+                entry[1].set_exception(Exception(value))
+
+    def shutdown(self):
+        self._closing = True
+        for jobs in self._jobs:
+            jobs.put(None)
+        for process in self._processes:
+            process.join()
+        if self._collector is not None:
+            self._results.put(None)
+            self._collector.join()
+        self._processes, self._jobs, self._pending = [], [], []
+        self._collector = None
+        self._closing = False
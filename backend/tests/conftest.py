@@ -0,0 +1,63 @@
+import os
+import queue
+import sys
+import threading
+import time
+
+import pytest
+
+# The backend imports itself both as `backend.src` (from the repository root) and `src` (from backend/, as main does)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.src.constants import WHISPER_SAMPLE_RATE  # noqa: E402
+from backend.src.whisper_pool import WhisperPool  # noqa: E402
+
+
+def fake_transcribe(samples, *args):
+    """Stands in for transcribe_local: takes a moment and reports how much audio it was given."""
+    time.sleep(0.2)
+    return f" {len(samples) / WHISPER_SAMPLE_RATE:.2f} seconds of speech"
+
+
+@pytest.fixture
+def thread_pool():
+    """A WhisperPool whose worker is a thread running the jobs in-process, instead of a Whisper process."""
+    pool = WhisperPool(size=1, poll_sec=0.05)
+    pool._results = queue.Queue()
+    pool._jobs = [queue.Queue()]
+    pool._pending = [0]
+
+    def worker():
+        while (job := pool._jobs[0].get()) is not None:
+            job_id, fn, args = job
+            try:
+                pool._results.put((0, job_id, True, fn(*args)))
+            except Exception as e:
+                pool._results.put((0, job_id, False, str(e)))
+
+    worker_thread = threading.Thread(target=worker, daemon=True)
+    worker_thread.start()
+    pool._collector = threading.Thread(target=pool._collect, daemon=True)
+    pool._collector.start()
+    yield pool
+    pool._jobs[0].put(None)
+    worker_thread.join()
+    pool._results.put(None)
+    pool._collector.join()
+
+
+@pytest.fixture
+def api(thread_pool, monkeypatch):
+    """The API with Whisper replaced by a thread pool running fake_transcribe, and no Ollama monitor."""
+    import main
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(main, "whisper_pool", thread_pool)
+    monkeypatch.setattr(main, "transcribe_local", fake_transcribe)
+    monkeypatch.setattr(thread_pool, "start", lambda: None)
+    monkeypatch.setattr(thread_pool, "shutdown", lambda: None)
+    monkeypatch.setattr(main.async_ollama_client.health, "start", lambda: None)
+    main.transcript_cache.clear()
+    with TestClient(main.app) as client:
+        yield client
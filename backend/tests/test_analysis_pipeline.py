@@ -0,0 +1,47 @@
+import queue
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+
+from backend.src import analysis_pipeline
+from backend.src.analysis_pipeline import AnalysisPipeline
+
+
+@pytest.fixture
+def answered(monkeypatch):
+    """Replaces the LLM with one answering at once; returns the transcripts it was asked about."""
+    transcripts = []
+
+    def generate_answers(transcript, variants=None, on_token=None, on_answer=None, cancel=None):
+        transcripts.append(transcript)
+        on_answer("short", "answer")
+        future = Future()
+        future.set_result("answer")
+        return {"short": future}
+
+    monkeypatch.setattr(analysis_pipeline.llm, "generate_answers", generate_answers)
+    return transcripts
+
+
+def run(monkeypatch, transcript):
+    monkeypatch.setattr(analysis_pipeline.local_transcription, "transcribe_local", lambda samples: transcript)
+    events = queue.Queue()
+    AnalysisPipeline(lambda run, kind, data: events.put((kind, data))).start(np.zeros(16000, dtype=np.float32))
+    kinds = []
+    while not kinds or kinds[-1] != "done":
+        kinds.append(events.get(timeout=5)[0])
+    return kinds
+
+
+def test_questions_mentioning_errors_are_answered(monkeypatch, answered):
+    transcript = "How do you handle an error in a REST API, and what if the client could not connect?"
+    kinds = run(monkeypatch, transcript)
+    assert answered == [transcript]
+    assert "answer" in kinds
+
+
+def test_failed_transcription_is_not_answered(monkeypatch, answered):
+    kinds = run(monkeypatch, "Transcription error: no such file")
+    assert answered == []
+    assert kinds == ["status", "transcript", "status", "done"]
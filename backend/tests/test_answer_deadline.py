@@ -0,0 +1,65 @@
+import io
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+import main
+from backend.src import llm
+from backend.src.constants import WHISPER_SAMPLE_RATE
+from backend.src.llm_client import DeadlineExceeded
+
+
+def wav_bytes(seconds=1):
+    samples = (0.1 * np.random.default_rng(0).standard_normal(int(seconds * WHISPER_SAMPLE_RATE))).astype(np.float32)
+    buffer = io.BytesIO()
+    sf.write(buffer, samples, WHISPER_SAMPLE_RATE, format="WAV")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def cut_off_ollama(monkeypatch):
+    """Stands in for Ollama running past the answer deadline after generating "partial"."""
+    async def stream(payload, deadline=None):
+        yield "partial"
+        raise DeadlineExceeded("Ollama did not finish before the deadline")
+
+    monkeypatch.setattr(main.async_ollama_client, "stream", stream)
+    main.response_cache.clear()
+
+
+def test_generate_response_reports_a_cut_off_answer(api, cut_off_ollama):
+    response = api.post("/generate-response/", data={"transcript": "What is REST?"}).json()
+    assert response["answer"] == "partial"
+    assert response["truncated"] is True
+
+
+def test_ask_reports_a_cut_off_answer(api, cut_off_ollama):
+    response = api.post("/ask/", files={"audio": ("clip.wav", wav_bytes())}).json()
+    assert response["answer"] == "partial"
+    assert response["truncated"] is True
+
+
+def test_rule_based_answers_are_complete(api):
+    response = api.post("/ask/", files={"audio": ("clip.wav", wav_bytes())}, data={"use_llm": "false"}).json()
+    assert response["truncated"] is False
+
+
+def test_cut_off_variant_is_marked(monkeypatch):
+    def stream(payload, deadline=None):
+        yield "partial"
+        raise DeadlineExceeded("Ollama did not finish before the deadline")
+
+    monkeypatch.setattr(llm.ollama_client, "stream", stream)
+    llm.response_cache.clear()
+    tokens, answers = [], {}
+    futures = llm.generate_answers(
+        "What is REST?", {"short": {"short_answer": True, "timeout": 5}},
+        on_token=lambda name, token: tokens.append(token),
+        on_answer=lambda name, answer: answers.setdefault(name, answer),
+    )
+    answer = futures["short"].result()
+    assert answer == answers["short"] == "".join(tokens)
+    assert answer == "partial\n[Answer cut off after 5 s]"
+    assert llm.response_cache.get(*llm._cache_key(
+        "What is REST?", llm.build_answer_payload("What is REST?", True), True, 0.3)) is None
@@ -0,0 +1,75 @@
+import asyncio
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+import main
+from backend.src.constants import WHISPER_SAMPLE_RATE
+
+LATENCY = 1.0  # seconds the stub Ollama takes per answer
+REQUESTS = 6
+
+
+@pytest.fixture
+def slow_ollama(monkeypatch):
+    """Stands in for Ollama: every answer takes LATENCY seconds, without blocking the event loop."""
+    async def stream(payload, deadline=None):
+        await asyncio.sleep(LATENCY)
+        yield "stub answer"
+
+    monkeypatch.setattr(main.async_ollama_client, "stream", stream)
+    main.response_cache.clear()
+    yield
+    main.response_cache.clear()
+
+
+def wav_bytes(seconds=1):
+    samples = (0.1 * np.random.default_rng(0).standard_normal(int(seconds * WHISPER_SAMPLE_RATE))).astype(np.float32)
+    buffer = io.BytesIO()
+    sf.write(buffer, samples, WHISPER_SAMPLE_RATE, format="WAV")
+    return buffer.getvalue()
+
+
+def fire(api, requests):
+    """Sends `requests` (functions of the client) all at once. Returns the responses, the wall
+    time they took, and how long / took to answer while they were in flight."""
+    with ThreadPoolExecutor(len(requests)) as executor:
+        start = time.perf_counter()
+        futures = [executor.submit(request, api) for request in requests]
+        time.sleep(LATENCY / 4)
+        health_start = time.perf_counter()
+        health = api.get("/")
+        health_time = time.perf_counter() - health_start
+        assert health.status_code == 200
+        responses = [future.result() for future in futures]
+        elapsed = time.perf_counter() - start
+    return responses, elapsed, health_time
+
+
+def test_answers_are_generated_concurrently(api, slow_ollama):
+    requests = [
+        lambda client, i=i: client.post("/generate-response/", data={"transcript": f"What is question {i}?"})
+        for i in range(REQUESTS)
+    ]
+    responses, elapsed, health_time = fire(api, requests)
+
+    assert [response.json()["answer"] for response in responses] == ["stub answer"] * REQUESTS
+    assert elapsed < 2 * LATENCY  # not REQUESTS * LATENCY
+    assert health_time < LATENCY / 2
+
+
+def test_ask_overlaps_answers_with_transcription(api, slow_ollama):
+    # The thread pool has one worker taking 0.2 s per clip, so transcription is serial but
+    # each answer is generated while the next clips are transcribed
+    requests = [
+        lambda client: client.post("/ask/", files={"audio": ("clip.wav", wav_bytes())}) for _ in range(REQUESTS)
+    ]
+    responses, elapsed, health_time = fire(api, requests)
+
+    assert all(response.json()["answer"] == "stub answer" for response in responses)
+    assert elapsed < REQUESTS * 0.2 + 2 * LATENCY  # not REQUESTS * (0.2 + LATENCY)
+    assert health_time < LATENCY / 2
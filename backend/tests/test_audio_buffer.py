@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from backend.src.audio_buffer import AudioBuffer
+
+
+def frames(start, n, channels=2):
+    """`n` frames whose samples count up from `start`, so order and gaps are easy to check."""
+    return np.arange(start * channels, (start + n) * channels, dtype=np.float32).reshape(n, channels)
+
+
+def test_appends_spanning_blocks_keep_their_order():
+    buffer = AudioBuffer(channels=2, block_frames=4)
+    position = 0
+    for n in [3, 1, 6, 0, 9, 2]:
+        buffer.append(frames(position, n))
+        position += n
+
+    assert len(buffer) == position
+    assert len(buffer._blocks) == 6  # ceil(21 / 4)
+    np.testing.assert_array_equal(buffer.to_array(), frames(0, position))
+
+
+def test_single_block_is_returned_without_copying():
+    buffer = AudioBuffer(channels=2, block_frames=8)
+    buffer.append(frames(0, 5))
+    array = buffer.to_array()
+    assert array.shape == (5, 2)
+    assert np.shares_memory(array, buffer._blocks[0])
+
+
+def test_mono_frames_are_accepted_flat():
+    buffer = AudioBuffer(channels=1, block_frames=4)
+    buffer.append(np.arange(6))
+    buffer.append(np.arange(6, 10).reshape(4, 1))
+    np.testing.assert_array_equal(buffer.to_array()[:, 0], np.arange(10, dtype=np.float32))
+
+
+def test_blocks_are_read_only_views():
+    buffer = AudioBuffer(channels=2, block_frames=4)
+    buffer.append(frames(0, 6))
+    blocks = list(buffer.iter_blocks())
+    assert [len(block) for block in blocks] == [4, 2]
+    with pytest.raises(ValueError):
+        blocks[0][0, 0] = 1.0
+    buffer.append(frames(6, 1))  # the buffer itself is still writable
+    np.testing.assert_array_equal(buffer.to_array(), frames(0, 7))
+
+
+def test_clear_empties_the_buffer():
+    buffer = AudioBuffer(channels=2, block_frames=4)
+    buffer.append(frames(0, 6))
+    buffer.clear()
+    assert len(buffer) == 0
+    buffer.append(frames(0, 2))
+    np.testing.assert_array_equal(buffer.to_array(), frames(0, 2))
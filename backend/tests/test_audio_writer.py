@@ -0,0 +1,69 @@
+import time
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from backend.src.audio_writer import StreamingAudioWriter
+
+SAMPLE_RATE = 16000
+
+
+def frames(seconds, channels=2, seed=0):
+    rng = np.random.default_rng(seed)
+    return (0.1 * rng.standard_normal((int(seconds * SAMPLE_RATE), channels))).astype(np.float32)
+
+
+def wait_for_frames(path, n, timeout=5):
+    deadline = time.monotonic() + timeout
+    while sf.info(path).frames < n:
+        assert time.monotonic() < deadline, f"{path} never reached {n} frames"
+        time.sleep(0.02)
+
+
+def test_file_is_readable_while_recording(tmp_path):
+    path = str(tmp_path / "session.wav")
+    writer = StreamingAudioWriter(path, sample_rate=SAMPLE_RATE, channels=2, flush_sec=0).start()
+    try:
+        first = frames(0.5)
+        writer.append(first)
+        writer.append(frames(0.01, seed=1))  # flushed on the write after the interval
+        wait_for_frames(path, len(first))
+        data, sample_rate = sf.read(path, dtype="float32")
+        assert sample_rate == SAMPLE_RATE
+        np.testing.assert_allclose(data[:len(first)], first, atol=1e-4)
+    finally:
+        writer.close()
+
+
+def test_header_is_complete_after_close(tmp_path):
+    path = str(tmp_path / "recordings" / "session.wav")
+    chunks = [frames(0.25, seed=seed) for seed in range(8)]
+    with StreamingAudioWriter(path, sample_rate=SAMPLE_RATE, channels=2, queue_blocks=2) as writer:
+        for chunk in chunks:
+            writer.append(chunk)
+            writer.append(chunk[:0])  # empty reads are skipped
+    assert writer.close()  # closing twice is harmless
+
+    info = sf.info(path)
+    assert (info.samplerate, info.channels, info.frames) == (SAMPLE_RATE, 2, len(writer))
+    assert len(writer) == sum(len(chunk) for chunk in chunks)
+    data, _ = sf.read(path, dtype="float32")
+    np.testing.assert_allclose(data, np.concatenate(chunks), atol=1e-4)
+
+
+def test_write_failure_is_reported(tmp_path, monkeypatch):
+    writer = StreamingAudioWriter(str(tmp_path / "session.wav"), sample_rate=SAMPLE_RATE, channels=2).start()
+
+    def fail(data):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(writer._file, "write", fail)
+    writer.append(frames(0.1))
+    deadline = time.monotonic() + 5
+    while writer.error is None:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    with pytest.raises(Exception, match="disk full"):
+        writer.append(frames(0.1))
+    assert not writer.close()
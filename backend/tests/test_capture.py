@@ -0,0 +1,33 @@
+import pytest
+
+try:
+    from backend.src import capture
+except OSError as e:  # sounddevice is installed but PortAudio isn't
+    pytest.skip(f"sounddevice unavailable: {e}", allow_module_level=True)
+
+
+class BrokenSpeaker:
+    name = "broken speaker"
+
+    def recorder(self, **kwargs):
+        raise RuntimeError("loopback device disappeared")
+
+
+@pytest.fixture
+def speaker_capture(monkeypatch):
+    monkeypatch.setattr(capture, "soundcard_available", True)
+    monkeypatch.setattr(capture, "sc", type("FakeSoundcard", (), {"default_speaker": BrokenSpeaker}), raising=False)
+    return capture.SpeakerCapture()
+
+
+def test_failed_loopback_raises_from_read(speaker_capture):
+    speaker_capture.start()
+    with pytest.raises(Exception, match="loopback device disappeared"):
+        speaker_capture.read(timeout=2)
+    speaker_capture.stop()
+
+
+def test_failed_loopback_raises_from_record(speaker_capture):
+    with speaker_capture:
+        with pytest.raises(Exception, match="loopback device disappeared"):
+            speaker_capture.record(1)
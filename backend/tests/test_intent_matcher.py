@@ -0,0 +1,75 @@
+import pytest
+
+from backend.src.intent_matcher import IntentMatcher
+from backend.src.llm import is_banking_question
+from backend.src.response_generator import ResponseGenerator
+
+
+@pytest.mark.parametrize("transcript", [
+    "Tell me about your experience with bank reconciliation",
+    "How do banks assess loans and mortgages?",
+    "Describe banking regulations you have worked with",
+    "How would you detect fraudulent transactions?",
+    "How do you handle customers complaints about payments?",
+    "What do you know about KYC and AML checks?",
+    "Which interest rates affect deposits?",
+])
+def test_banking_question(transcript):
+    assert is_banking_question(transcript)
+
+
+@pytest.mark.parametrize("transcript", [
+    "What is polymorphism in Java?",
+    "The river embankment flooded last spring",
+    "How would you design a URL shortener?",
+])
+def test_not_banking_question(transcript):
+    assert not is_banking_question(transcript)
+
+
+def test_suffixes_only_extend_whole_keywords():
+    matcher = IntentMatcher({"loan": ["loan"], "bank": ["retail bank"]}, suffixes=["s", "ing"])
+    assert matcher.match("two loans") == {"loan"}
+    assert matcher.match("retail banking") == {"bank"}
+    assert matcher.match("loaned") == set()
+    assert matcher.match("loansharks") == set()
+
+
+def test_multi_word_keyword_reports_contained_keywords():
+    matcher = IntentMatcher({"banking": ["bank"], "retail": ["retail bank"]})
+    assert matcher.match("Retail   Bank") == {"banking", "retail"}
+
+
+def test_response_categories_match_whole_words():
+    generator = ResponseGenerator()
+    assert generator.generate_response("hi there") in generator.responses["greeting"]
+    assert generator.generate_response("this is his") in generator.responses["default"]
+
+
+def test_response_categories_match_plurals():
+    generator = ResponseGenerator()
+    assert generator.generate_response("What are your opening hours?") in generator.responses["time"]
+    assert generator.generate_response("How many times did it rain?") in generator.responses["weather"]
+
+
+def test_response_category_priority_order():
+    generator = ResponseGenerator()
+    # Greeting comes before time, and thanks before weather
+    assert generator.generate_response("Hello, what time is it?") in generator.responses["greeting"]
+    assert generator.generate_response("Thanks for the forecast") in generator.responses["thanks"]
+
+
+def test_custom_response_keywords():
+    generator = ResponseGenerator()
+    generator.add_custom_response("joke", "Why did the developer go broke? Too much cache.", ["joke", "make me laugh"])
+    assert generator.generate_response("Tell me a JOKE") == "Why did the developer go broke? Too much cache."
+    assert generator.generate_response("Please make  me laugh") == "Why did the developer go broke? Too much cache."
+    # Custom categories come after the built-in ones
+    assert generator.generate_response("Hi, tell me a joke") in generator.responses["greeting"]
+
+
+def test_non_ascii_text_matches_like_ascii():
+    matcher = IntentMatcher({"loan": ["loan"], "bank": ["retail bank"]}, suffixes=["s"])
+    assert matcher.match("Café owners ask for loans") == {"loan"}
+    assert matcher.match("“Retail bank” – loan’s terms") == {"bank", "loan"}
+    assert matcher.match("Crédit loansharks") == set()
@@ -0,0 +1,100 @@
+import asyncio
+import io
+import time
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+import main
+from backend.src.constants import WHISPER_SAMPLE_RATE
+from backend.src.job_queue import JobQueue, QueueFull
+
+
+def wav_bytes(seconds=1):
+    samples = (0.1 * np.random.default_rng(0).standard_normal(int(seconds * WHISPER_SAMPLE_RATE))).astype(np.float32)
+    buffer = io.BytesIO()
+    sf.write(buffer, samples, WHISPER_SAMPLE_RATE, format="WAV")
+    return buffer.getvalue()
+
+
+def test_higher_priority_jobs_run_first():
+    order = []
+
+    async def run():
+        release = asyncio.Event()
+
+        async def stage(job):
+            if job.data == "first":
+                await release.wait()
+            order.append(job.data)
+
+        queue = JobQueue([("only", stage, 1)])
+        queue.start()
+        queue.submit("first")
+        await asyncio.sleep(0.01)  # the worker picks up "first" and blocks on it
+        for name, priority in [("low", 0), ("high", 5), ("mid", 1), ("low again", 0)]:
+            queue.submit(name, priority)
+        release.set()
+        while queue.pending():
+            await asyncio.sleep(0.01)
+        await queue.stop()
+
+    asyncio.run(run())
+    assert order == ["first", "high", "mid", "low", "low again"]
+
+
+def test_submit_refuses_jobs_beyond_capacity():
+    async def run():
+        async def stage(job):
+            await asyncio.sleep(10)
+
+        queue = JobQueue([("only", stage, 1)], max_jobs=2)
+        queue.start()
+        queue.submit("a")
+        queue.submit("b")
+        with pytest.raises(QueueFull):
+            queue.submit("c")
+        await queue.stop()
+
+    asyncio.run(run())
+
+
+def test_finished_jobs_are_purged_after_their_ttl():
+    async def run():
+        async def stage(job):
+            pass
+
+        queue = JobQueue([("only", stage, 1)], result_ttl=60)
+        queue.start()
+        old, recent = queue.submit("old"), queue.submit("recent")
+        while not (old.finished and recent.finished):
+            await asyncio.sleep(0.01)
+        old.finished_at = time.time() - 61
+        queue.submit("new")  # purges on submit
+        await queue.stop()
+        return queue.get(old.id), queue.get(recent.id)
+
+    old, recent = asyncio.run(run())
+    assert old is None
+    assert recent is not None
+
+
+def test_full_queue_answers_429(api, monkeypatch):
+    monkeypatch.setattr(main.job_queue, "max_jobs", 0)
+    response = api.post("/jobs", files={"audio": ("clip.wav", wav_bytes())}, data={"use_llm": "false"})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "5"
+
+
+def test_events_are_replayed_to_late_subscribers(api):
+    job = api.post("/jobs", files={"audio": ("clip.wav", wav_bytes())}, data={"use_llm": "false"}).json()
+    deadline = time.monotonic() + 10
+    while api.get(f"/jobs/{job['id']}").json()["status"] not in ("done", "failed"):
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+    response = api.get(f"/jobs/{job['id']}/events")
+    events = [line[len("event: "):] for line in response.text.splitlines() if line.startswith("event: ")]
+    assert events == ["stage"] * 4 + ["done"]
+    assert "1.00 seconds of speech" in response.text
@@ -0,0 +1,79 @@
+import asyncio
+import threading
+
+import pytest
+from aiohttp import web
+
+from backend.src.llm_client import AsyncOllamaClient
+
+STUB_PORT = 11510
+
+
+async def stub_generate(request):
+    await request.json()
+    return web.json_response({"response": "stub answer", "done": True})
+
+
+@pytest.fixture(scope="module")
+def ollama_url():
+    """A stub Ollama generate endpoint served from its own thread and event loop."""
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+
+    async def serve():
+        app = web.Application()
+        app.router.add_post("/api/generate", stub_generate)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", STUB_PORT).start()
+        ready.set()
+
+    threading.Thread(target=lambda: (loop.run_until_complete(serve()), loop.run_forever()), daemon=True).start()
+    ready.wait(5)
+    yield f"http://127.0.0.1:{STUB_PORT}/api/generate"
+    loop.call_soon_threadsafe(loop.stop)
+
+
+def test_each_event_loop_gets_its_own_session(ollama_url):
+    client = AsyncOllamaClient(url=ollama_url)
+    sessions = []
+
+    async def ask_and_close():
+        result = await client.generate({"prompt": "question"})
+        sessions.append(client._session)
+        await client.close()
+        return result["response"]
+
+    assert asyncio.run(ask_and_close()) == "stub answer"
+    assert asyncio.run(ask_and_close()) == "stub answer"
+    assert sessions[1] is not sessions[0]
+    assert sessions[0].closed and sessions[1].closed
+
+
+def test_session_of_a_running_loop_is_closed_when_another_loop_takes_over(ollama_url):
+    client = AsyncOllamaClient(url=ollama_url)
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    asyncio.run_coroutine_threadsafe(client.generate({"prompt": "question"}), loop).result(5)
+    first = client._session
+
+    async def ask_and_close():
+        await client.generate({"prompt": "question"})
+        await asyncio.sleep(0.05)  # lets the other loop run the close
+        await client.close()
+
+    asyncio.run(ask_and_close())
+    assert first.closed
+    loop.call_soon_threadsafe(loop.stop)
+
+
+def test_close_closes_the_session(ollama_url):
+    client = AsyncOllamaClient(url=ollama_url)
+
+    async def ask_and_close():
+        await client.generate({"prompt": "question"})
+        session = client._session
+        await client.close()
+        return session
+
+    assert asyncio.run(ask_and_close()).closed
@@ -0,0 +1,33 @@
+import io
+
+import numpy as np
+import soundfile as sf
+
+from backend.src import local_transcription
+from backend.src.constants import WHISPER_SAMPLE_RATE
+from backend.src.transcript_cache import TranscriptCache
+
+
+def wav(seed):
+    samples = (0.1 * np.random.default_rng(seed).standard_normal(WHISPER_SAMPLE_RATE)).astype(np.float32)
+    buffer = io.BytesIO()
+    sf.write(buffer, samples, WHISPER_SAMPLE_RATE, format="WAV", subtype="FLOAT")
+    return buffer.getvalue()
+
+
+def test_batch_uses_the_transcript_cache(monkeypatch):
+    batched = []
+
+    def fake_batch(clips):
+        batched.append(len(clips))
+        return [{"text": f"clip {len(clip)}", "error": None} for clip in clips]
+
+    monkeypatch.setattr(local_transcription, "transcript_cache", TranscriptCache(db_path=None))
+    monkeypatch.setattr(local_transcription, "transcribe_batch_locally", fake_batch)
+    uploads = [(wav(0), "a.wav"), (wav(1), "b.wav"), (b"not audio", "c.wav")]
+
+    first = local_transcription.transcribe_uploads_batch(uploads)
+    second = local_transcription.transcribe_uploads_batch(uploads)
+    assert batched == [2]
+    assert [r["text"] for r in first[:2]] == [r["text"] for r in second[:2]] == ["clip 16000"] * 2
+    assert first[2]["error"].startswith("Failed to load audio")
@@ -0,0 +1,46 @@
+import numpy as np
+import torch
+
+from backend.src import local_whisper
+from backend.src.constants import WHISPER_SAMPLE_RATE
+
+
+def noise(seconds, level, seed=0):
+    return (level * np.random.default_rng(seed).standard_normal(int(seconds * WHISPER_SAMPLE_RATE))).astype(np.float32)
+
+
+class FakeModel:
+    """Stands in for Whisper: one segment per second of audio it is given."""
+
+    def __init__(self):
+        self.seen = []
+
+    def transcribe(self, samples):
+        self.seen.append(len(samples))
+        seconds = len(samples) // WHISPER_SAMPLE_RATE
+        return {"text": "", "segments": [{"start": i, "end": i + 1, "text": f" s{i}"} for i in range(seconds)]}
+
+
+def test_chunk_is_trimmed_and_its_times_mapped_back(monkeypatch):
+    model = FakeModel()
+    monkeypatch.setattr(local_whisper, "get_model", lambda: model)
+    samples = np.concatenate([noise(3, 1e-3), noise(2, 0.1), noise(3, 1e-3)])
+
+    segments = local_whisper._transcribe_chunk(samples, 10.0, 0.0, float("inf"), vad=True)
+    assert model.seen[0] < 3 * WHISPER_SAMPLE_RATE
+    assert segments[0]["start"] > 12.5
+    assert segments[-1]["end"] < 15.5
+
+
+def test_silent_chunk_is_not_transcribed(monkeypatch):
+    model = FakeModel()
+    monkeypatch.setattr(local_whisper, "get_model", lambda: model)
+    assert local_whisper._transcribe_chunk(noise(5, 1e-3), 0.0, 0.0, float("inf"), vad=True) == []
+    assert model.seen == []
+
+
+def test_batch_gives_silent_clips_an_empty_transcript(monkeypatch):
+    model = FakeModel()
+    model.device = torch.device("cpu")
+    monkeypatch.setattr(local_whisper, "get_model", lambda: model)
+    assert local_whisper.transcribe_batch_locally([noise(2, 1e-3)], vad=True) == [{"text": "", "error": None}]
@@ -0,0 +1,53 @@
+import time
+
+from backend.src.constants import OLLAMA_BASE_URL
+from backend.src.ollama_health import OllamaHealth
+
+
+def make_health(**kwargs):
+    # Nothing listens on port 9, so a probe would fail
+    return OllamaHealth(base_url="http://127.0.0.1:9", timeout=0.1, failure_threshold=2, **kwargs)
+
+
+def test_probes_the_configured_server_by_default():
+    assert OllamaHealth().base_url == OLLAMA_BASE_URL.rstrip("/")
+
+
+def test_is_open_does_not_start_the_monitor():
+    health = make_health()
+    assert not health.is_open()
+    assert health._thread is None
+
+
+def test_circuit_opens_after_consecutive_failures_and_closes_on_success():
+    health = make_health()
+    health.record_failure("down")
+    assert not health.is_open()
+    health.record_failure("down")
+    assert health.is_open()
+    assert health.status()["circuit"] == "open"
+    health.record_success()
+    assert not health.is_open()
+
+
+def test_unmonitored_open_circuit_lets_a_request_through_after_interval():
+    health = make_health(interval=0.1)
+    health.record_failure("down")
+    health.record_failure("down")
+    assert health.is_open()
+    time.sleep(0.15)
+    assert not health.is_open()
+    health.record_failure("still down")
+    assert health.is_open()
+
+
+def test_monitored_open_circuit_stays_open():
+    health = make_health(interval=0.05)
+    health.start()
+    try:
+        health.record_failure("down")
+        health.record_failure("down")
+        time.sleep(0.2)
+        assert health.is_open()
+    finally:
+        health.stop()
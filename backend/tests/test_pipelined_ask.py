@@ -0,0 +1,90 @@
+import asyncio
+import io
+import os
+
+import numpy as np
+import soundfile as sf
+
+import main
+from backend.src.audio_io import load_audio
+from backend.src.constants import WHISPER_SAMPLE_RATE
+from backend.src.llm_client import OllamaError
+from backend.src.pipelined_ask import split_segments
+from backend.src.vad import detect_speech
+
+RECORDING = os.path.join(os.path.dirname(__file__), "..", "..", "out.wav")
+
+
+def silence(seconds, seed=1):
+    return (1e-4 * np.random.default_rng(seed).standard_normal(int(seconds * WHISPER_SAMPLE_RATE))).astype(np.float32)
+
+
+def wav_bytes(samples):
+    buffer = io.BytesIO()
+    sf.write(buffer, samples, WHISPER_SAMPLE_RATE, format="WAV")
+    return buffer.getvalue()
+
+
+def test_segments_keep_all_the_speech():
+    speech = load_audio(RECORDING)
+    for samples in (speech, np.concatenate([speech, silence(1)])):
+        kept = sum(end - start for start, end in detect_speech(samples))
+        assert sum(map(len, split_segments(samples))) == kept
+        assert kept >= len(speech) - WHISPER_SAMPLE_RATE // 10
+
+
+def test_segments_split_at_pauses_and_length():
+    speech = load_audio(RECORDING)
+    assert len(split_segments(np.concatenate([speech, silence(1), speech]))) == 2
+    long_speech = np.concatenate([speech] * 5)
+    segments = split_segments(long_speech, max_segment_sec=4)
+    assert len(segments) > 2
+    assert sum(map(len, segments)) == len(long_speech)
+
+
+def test_pipelined_events(api):
+    speech = load_audio(RECORDING)
+    clip = wav_bytes(np.concatenate([speech, silence(1), speech]))
+    response = api.post("/ask/stream", files={"audio": ("clip.wav", clip)},
+                        data={"pipelined": "true", "use_llm": "false"})
+    events = [line[len("event: "):] for line in response.text.splitlines() if line.startswith("event: ")]
+    assert events[0] == "segment"
+    assert events.count("segment") == 2
+    assert "token" in events and "transcript" in events
+    assert events[-1] == "done"
+
+
+def test_abandoned_pipeline_leaves_transcription_working(api):
+    speech = load_audio(RECORDING)
+    clip = wav_bytes(np.concatenate([speech, silence(1), speech, silence(1), speech]))
+
+    async def abandon():
+        # What the server does to the event stream when the client disconnects
+        events = main.pipelined_events(clip, "clip.wav", use_llm=False)
+        assert (await events.__anext__()).startswith("event: segment")
+        await events.aclose()
+
+    asyncio.run(abandon())
+    response = api.post("/transcribe/", files={"audio": ("other.wav", wav_bytes(speech[:WHISPER_SAMPLE_RATE]))})
+    assert response.status_code == 200
+    assert response.json()["transcript"].endswith("seconds of speech")
+
+
+def test_pipelined_ask_answers_ollama_errors_like_ask(api, monkeypatch):
+    async def stream(payload, deadline=None):
+        raise OllamaError("Error from Ollama API: model not found")
+        yield
+
+    monkeypatch.setattr(main.async_ollama_client, "stream", stream)
+    main.response_cache.clear()
+    speech = load_audio(RECORDING)
+    clip = wav_bytes(np.concatenate([speech, silence(1), speech]))
+    # Pipelined first, so it transcribes segment by segment rather than from the transcript cache
+    responses = [api.post("/ask/", files={"audio": ("clip.wav", clip)}, data={"pipelined": pipelined})
+                 for pipelined in ("true", "false")]
+
+    assert [response.status_code for response in responses] == [200, 200]
+    pipelined, plain = (response.json() for response in responses)
+    assert pipelined.keys() == plain.keys()
+    assert pipelined["answer"] == plain["answer"] == "Error generating answer: Error from Ollama API: model not found"
+    assert pipelined["transcript"].endswith("seconds of speech")
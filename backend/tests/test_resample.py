@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from backend.src.resample import PolyphaseResampler
+
+
+def gain_db(from_rate, to_rate, frequency):
+    """Level of a full-scale sine after resampling, in dB, skipping the filter's start-up."""
+    t = np.arange(2 * from_rate) / from_rate
+    out = PolyphaseResampler(from_rate, to_rate).process(np.sin(2 * np.pi * frequency * t))
+    return 20 * np.log10(np.sqrt(2 * np.mean(out[to_rate // 2:] ** 2)) + 1e-12)
+
+
+@pytest.mark.parametrize("from_rate", [48000, 44100])
+def test_stopband_is_attenuated(from_rate):
+    # Above 8 kHz these fold back into the 16 kHz output's band
+    assert gain_db(from_rate, 16000, 9000) < -40
+    assert gain_db(from_rate, 16000, 10000) < -60
+
+
+@pytest.mark.parametrize("from_rate", [48000, 44100])
+def test_passband_is_flat(from_rate):
+    for frequency in (300, 1000, 3000, 6000):
+        assert gain_db(from_rate, 16000, frequency) > -1
+
+
+def test_blocks_match_one_pass():
+    samples = np.random.default_rng(0).standard_normal(48000).astype(np.float32)
+    whole = PolyphaseResampler(48000, 16000).process(samples)
+    resampler = PolyphaseResampler(48000, 16000)
+    blocks = np.concatenate([resampler.process(samples[i:i + 1234]) for i in range(0, len(samples), 1234)])
+    np.testing.assert_allclose(blocks, whole, atol=1e-5)
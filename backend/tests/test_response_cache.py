@@ -0,0 +1,61 @@
+import pytest
+
+from backend.src.response_cache import ResponseCache, prompt_variant
+
+SCOPE = ("short", "llama3", 0.7)
+
+
+@pytest.fixture
+def cache():
+    return ResponseCache(db_path=None, near_duplicates=True)
+
+
+def test_repeated_question_hits(cache):
+    cache.put("What is polymorphism in Java?", *SCOPE, "answer", 1.0)
+    assert cache.get("what is polymorphism in java", *SCOPE) == "answer"
+    assert cache.get("What is polymorphism in Java?", "full", "llama3", 0.7) is None
+
+
+@pytest.mark.parametrize("cached, asked", [
+    ("What is polymorphism in Java", "What is polymorphism in C++"),
+    ("What is the difference between process vs thread", "What is the difference between process vs program"),
+    ("How do you handle a customer complaint", "How do you handle a customer escalation"),
+    ("Tell me about a time you worked on loans", "Tell me about a time you worked on payments"),
+])
+def test_question_differing_in_a_key_term_misses(cache, cached, asked):
+    cache.put(cached, *SCOPE, "answer", 1.0)
+    assert cache.get(asked, *SCOPE) is None
+
+
+def test_near_duplicate_hits(cache):
+    question = "Can you explain the difference between a process and a thread in an operating system"
+    cache.put(question, *SCOPE, "answer", 1.0)
+    assert cache.get(question + " please", *SCOPE) == "answer"
+    assert cache.stats()["near_hits"] == 1
+
+
+def test_near_duplicates_are_off_by_default():
+    cache = ResponseCache(db_path=None)
+    question = "Can you explain the difference between a process and a thread in an operating system"
+    cache.put(question, *SCOPE, "answer", 1.0)
+    assert cache.get(question + " please", *SCOPE) is None
+
+
+def test_clear_forgets_answers(cache):
+    cache.put("What is polymorphism", *SCOPE, "answer", 1.0)
+    cache.clear()
+    assert cache.get("What is polymorphism", *SCOPE) is None
+
+
+def test_prompt_variant_follows_the_prompt_but_not_the_transcript(monkeypatch):
+    from backend.src import local_transcription
+
+    def variant(transcript, short_answer=True):
+        payload = local_transcription.build_ollama_payload(transcript, short_answer)
+        return prompt_variant("api", payload, transcript)
+
+    assert variant("What is REST?") == variant("Explain polymorphism")
+    assert variant("What is REST?") != variant("What is REST?", short_answer=False)
+    before = variant("What is REST?")
+    monkeypatch.setattr(local_transcription, "POSTION", "Data Engineer")
+    assert variant("What is REST?") != before
@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+
+from backend.src.audio_io import load_audio
+from backend.src.constants import WHISPER_SAMPLE_RATE
+from backend.src.stream_segmenter import StreamSegmenter
+
+RECORDING = os.path.join(os.path.dirname(__file__), "..", "..", "out.wav")
+
+
+def segments(samples, block_sec=0.5, **kwargs):
+    """Feeds `samples` in blocks as a stream would and returns every utterance, flushed at the end."""
+    segmenter = StreamSegmenter(**kwargs)
+    block = int(block_sec * WHISPER_SAMPLE_RATE)
+    found = []
+    for start in range(0, len(samples), block):
+        segmenter.feed(samples[start:start + block])
+        while (final := segmenter.pop_final()) is not None:
+            found.append(final)
+    final = segmenter.pop_final(flush=True)
+    if final is not None:
+        found.append(final)
+    return found
+
+
+def babble(seconds, level, depth=0.4, seed=0):
+    """Noise with a syllable-rate envelope `depth` deep, standing in for a voice."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * WHISPER_SAMPLE_RATE)) / WHISPER_SAMPLE_RATE
+    envelope = 1 - depth + depth * np.sin(2 * np.pi * 4 * t)
+    return (level * envelope * rng.standard_normal(len(t))).astype(np.float32)
+
+
+def silence(seconds, level=1e-4, seed=1):
+    return (level * np.random.default_rng(seed).standard_normal(int(seconds * WHISPER_SAMPLE_RATE))).astype(np.float32)
+
+
+def test_stream_starting_with_speech_keeps_it():
+    speech = load_audio(RECORDING)
+    for samples in (speech, np.concatenate([speech, silence(1)])):
+        found = segments(samples)
+        assert len(found) == 1
+        start, end, audio = found[0]
+        assert start == 0
+        assert end >= len(speech) - WHISPER_SAMPLE_RATE // 10
+        np.testing.assert_array_equal(audio, samples[start:end])
+
+
+def test_quiet_speech_is_found_once_a_pause_follows():
+    # Too quiet and steady to stand out on its own: only the pause shows it is speech
+    samples = np.concatenate([babble(2, level=0.005, depth=0), silence(1.5)])
+    found = segments(samples)
+    assert len(found) == 1
+    start, end, _ = found[0]
+    assert start == 0
+    assert end >= 2 * WHISPER_SAMPLE_RATE
+
+
+def test_utterances_are_split_at_pauses():
+    samples = np.concatenate([silence(1), babble(1, 0.2), silence(1), babble(1, 0.2, seed=2), silence(1)])
+    found = segments(samples)
+    assert len(found) == 2
+    assert found[0][1] < 2.5 * WHISPER_SAMPLE_RATE < found[1][0]
+
+
+def test_long_silence_is_not_kept():
+    segmenter = StreamSegmenter(floor_sec=1)
+    for _ in range(20):
+        segmenter.feed(silence(0.5))
+        assert segmenter.pop_final() is None
+    assert segmenter.received == 10 * WHISPER_SAMPLE_RATE
+    assert len(segmenter._audio) <= WHISPER_SAMPLE_RATE
+    assert len(segmenter.pending()) == 0
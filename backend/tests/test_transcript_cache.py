@@ -0,0 +1,67 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from backend.src import transcript_cache
+from backend.src.transcript_cache import TranscriptCache, audio_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Makes every timestamp the cache records distinct and increasing."""
+    ticks = itertools.count(1000)
+    monkeypatch.setattr(transcript_cache.time, "time", lambda: float(next(ticks)))
+
+
+def test_key_follows_the_audio_and_the_options():
+    samples = np.linspace(-1, 1, 1600, dtype=np.float32)
+    assert audio_key(samples, model="base") == audio_key(samples.copy(), model="base")
+    # The same PCM hashes alike whatever dtype or layout it arrived in
+    assert audio_key(samples.astype(np.float64), model="base") == audio_key(samples, model="base")
+    assert audio_key(np.stack([samples, samples], axis=1)[:, 0], model="base") == audio_key(samples, model="base")
+    assert audio_key(samples, model="base", vad=True) == audio_key(samples, vad=True, model="base")
+
+    assert audio_key(samples, model="base") != audio_key(samples, model="small")
+    assert audio_key(samples, model="base") != audio_key(samples, model="base", vad=True)
+    changed = samples.copy()
+    changed[800] += 1e-3
+    assert audio_key(changed, model="base") != audio_key(samples, model="base")
+
+
+def test_memory_tier_evicts_the_least_recently_used():
+    cache = TranscriptCache(max_entries=2, db_path=None)
+    cache.put("a", "first")
+    cache.put("b", "second")
+    assert cache.get("a") == "first"  # "b" is now the least recently used
+    cache.put("c", "third")
+    assert cache.get("b") is None
+    assert cache.get("a") == "first"
+    assert cache.get("c") == "third"
+    assert cache.stats() == {"entries": 2, "hits": 3, "misses": 1, "hit_rate": 0.75}
+
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    db_path = str(tmp_path / "transcripts.db")
+    TranscriptCache(max_entries=1, db_path=db_path).put("a", "first")
+    cache = TranscriptCache(max_entries=1, db_path=db_path)
+    assert cache.get("a") == "first"
+    assert cache.stats()["entries"] == 1
+
+
+def test_disk_tier_evicts_the_least_recently_used(tmp_path, clock):
+    cache = TranscriptCache(max_entries=1, db_path=str(tmp_path / "transcripts.db"), max_disk_entries=2)
+    cache.put("a", "first")
+    cache.put("b", "second")
+    assert cache.get("a") == "first"  # from disk, which marks it as used
+    cache.put("c", "third")
+    assert cache.get("b") is None
+    assert cache.get("a") == "first"
+    assert cache.get("c") == "third"
+
+
+def test_clear_forgets_memory_and_disk(tmp_path):
+    cache = TranscriptCache(db_path=str(tmp_path / "transcripts.db"))
+    cache.put("a", "first")
+    cache.clear()
+    assert cache.get("a") is None
@@ -0,0 +1,60 @@
+import os
+
+import numpy as np
+
+from backend.src.audio_io import load_audio
+from backend.src.constants import WHISPER_SAMPLE_RATE
+from backend.src.vad import JOIN_PAUSE_SEC, detect_speech, trim_silence, untrimmed_time
+
+RECORDING = os.path.join(os.path.dirname(__file__), "..", "..", "out.wav")
+
+
+def babble(seconds, seed=0):
+    """Noise at speech level with a syllable-rate envelope, standing in for a voice."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * WHISPER_SAMPLE_RATE)) / WHISPER_SAMPLE_RATE
+    envelope = 0.6 + 0.4 * np.sin(2 * np.pi * 4 * t)
+    return (0.2 * envelope * rng.standard_normal(len(t))).astype(np.float32)
+
+
+def silence(seconds, level=1e-3, seed=1):
+    return (level * np.random.default_rng(seed).standard_normal(int(seconds * WHISPER_SAMPLE_RATE))).astype(np.float32)
+
+
+def test_continuous_speech_is_kept():
+    samples = babble(3)
+    assert detect_speech(samples) == [(0, len(samples))]
+
+
+def test_continuous_recording_is_kept():
+    samples = load_audio(RECORDING)
+    speech, regions = trim_silence(samples)
+    assert regions
+    assert len(speech) > 0.9 * len(samples)
+
+
+def test_silence_is_trimmed():
+    samples = np.concatenate([silence(2), babble(1), silence(2)])
+    regions = detect_speech(samples)
+    assert len(regions) == 1
+    start, end = regions[0]
+    assert 1.7 * WHISPER_SAMPLE_RATE < start < 2 * WHISPER_SAMPLE_RATE
+    assert 3 * WHISPER_SAMPLE_RATE < end < 3.3 * WHISPER_SAMPLE_RATE
+
+
+def test_silence_alone_has_no_speech():
+    assert detect_speech(silence(2)) == []
+
+
+def test_untrimmed_time_maps_through_the_kept_regions():
+    samples = np.concatenate([silence(2), babble(1), silence(2), babble(1)])
+    speech, regions = trim_silence(samples)
+    assert len(regions) == 2
+    (first_start, first_end), (second_start, _) = regions
+    rate = WHISPER_SAMPLE_RATE
+    assert untrimmed_time(0, regions) == first_start / rate
+    assert np.isclose(untrimmed_time(0.5, regions), first_start / rate + 0.5)
+    # Inside the joining pause, then just past it
+    assert untrimmed_time((first_end - first_start) / rate + 0.05, regions) == first_end / rate
+    second_in_trimmed = (first_end - first_start) / rate + JOIN_PAUSE_SEC
+    assert np.isclose(untrimmed_time(second_in_trimmed + 0.25, regions), second_start / rate + 0.25)
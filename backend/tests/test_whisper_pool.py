@@ -0,0 +1,94 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+
+import pytest
+
+from backend.src.whisper_pool import WhisperPool, WorkerDied
+
+
+class FakeProcess:
+    def __init__(self, alive, exitcode=None):
+        self.alive = alive
+        self.exitcode = exitcode
+
+    def is_alive(self):
+        return self.alive
+
+    def join(self):
+        pass
+
+
+def _crash(*args):
+    os._exit(3)
+
+
+class CrashingPool(WhisperPool):
+    """A pool whose workers exit while loading their model."""
+
+    def _spawn(self, index):
+        jobs = self._ctx.Queue()
+        process = self._ctx.Process(target=_crash, daemon=True)
+        process.start()
+        return process, jobs
+
+
+def test_cancelled_job_does_not_break_the_pool(thread_pool):
+    release = threading.Event()
+
+    async def run():
+        slow = asyncio.wrap_future(thread_pool.submit(release.wait))
+        await asyncio.sleep(0.05)
+        slow.cancel()
+        await asyncio.sleep(0.05)  # lets the cancellation reach the pool's future
+        release.set()
+        return await asyncio.wait_for(asyncio.wrap_future(thread_pool.submit(str, 42)), timeout=5)
+
+    assert asyncio.run(run()) == "42"
+    assert thread_pool._collector.is_alive()
+
+
+def test_unknown_job_id_is_ignored(thread_pool):
+    thread_pool._pending[0] += 1
+    thread_pool._results.put((0, "unknown", True, None))
+    assert thread_pool.submit(str, 7).result(timeout=5) == "7"
+
+
+def test_start_fails_when_a_worker_dies_while_loading():
+    pool = CrashingPool(size=1, poll_sec=0.1)
+    start = time.monotonic()
+    with pytest.raises(Exception, match="exited with code 3 while loading"):
+        pool.start()
+    assert time.monotonic() - start < 30
+
+
+def test_dead_worker_fails_its_jobs_and_is_replaced(thread_pool):
+    release = threading.Event()
+    running = thread_pool.submit(release.wait)
+    queued = thread_pool.submit(str, 1)
+    time.sleep(0.05)
+
+    # The worker process exits; its replacement takes over the job queue
+    thread_pool._processes = [FakeProcess(alive=False, exitcode=-9)]
+    thread_pool._spawn = lambda index: (FakeProcess(alive=True), queue.Queue())
+    with pytest.raises(WorkerDied):
+        running.result(timeout=5)
+    with pytest.raises(WorkerDied):
+        queued.result(timeout=5)
+    assert thread_pool._pending == [0]
+
+    after = thread_pool.submit(str, 2)
+    release.set()  # lets the stand-in worker thread move on to the replacement's queue
+    assert after.result(timeout=5) == "2"
+
+
+def test_worker_that_fails_to_restart_is_left_out(thread_pool):
+    thread_pool._starting.add(0)
+    thread_pool._results.put((0, None, False, "model file missing"))
+    deadline = time.monotonic() + 5
+    while 0 not in thread_pool._excluded and time.monotonic() < deadline:
+        time.sleep(0.01)
+    with pytest.raises(WorkerDied):
+        thread_pool.submit(str, 3)
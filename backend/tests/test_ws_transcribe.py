@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from backend.src.constants import WHISPER_SAMPLE_RATE
+
+
+def utterance():
+    """One second of speech-level noise between quiet stretches, as 16-bit PCM."""
+    rng = np.random.default_rng(0)
+    quiet = 1e-4 * rng.standard_normal(WHISPER_SAMPLE_RATE)
+    speech = 0.2 * rng.standard_normal(WHISPER_SAMPLE_RATE)
+    return (np.concatenate([quiet, speech, quiet, quiet]) * 32767).astype(np.int16).tobytes()
+
+
+def receive_until_closed(ws):
+    messages = []
+    with pytest.raises(WebSocketDisconnect) as closed:
+        while True:
+            messages.append(ws.receive_json())
+    return messages, closed.value.code
+
+
+def test_samples_split_across_messages_are_kept(api):
+    pcm = utterance()
+    with api.websocket_connect("/ws/transcribe") as ws:
+        # Odd-sized messages split samples between them
+        for start in range(0, len(pcm), 1001):
+            ws.send_bytes(pcm[start:start + 1001])
+        ws.send_text("end")
+        messages, code = receive_until_closed(ws)
+    finals = [message for message in messages if message["type"] == "final"]
+    assert len(finals) == 1
+    assert code == 1000
+
+
+def test_unexpected_text_is_rejected(api):
+    with api.websocket_connect("/ws/transcribe") as ws:
+        ws.send_text("hello")
+        messages, code = receive_until_closed(ws)
+    assert messages[-1]["type"] == "error"
+    assert code == 1003
+
+
+def test_stream_ending_mid_sample_is_rejected(api):
+    with api.websocket_connect("/ws/transcribe") as ws:
+        ws.send_bytes(utterance()[:-1])
+        ws.send_text("end")
+        messages, code = receive_until_closed(ws)
+    assert messages[-1] == {"type": "error", "message": "Stream ended in the middle of a 2-byte sample"}
+    assert code == 1007
+
+
+def test_non_finite_float_samples_are_rejected(api):
+    with api.websocket_connect("/ws/transcribe?format=f32le") as ws:
+        ws.send_bytes(np.array([0.1, np.nan, 0.2], dtype=np.float32).tobytes())
+        messages, code = receive_until_closed(ws)
+    assert messages[-1]["type"] == "error"
+    assert code == 1007
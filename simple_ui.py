@@ -2,22 +2,31 @@ import os
 import threading
 
 import FreeSimpleGUI as sg
-import numpy as np
-import sounddevice as sd
 import soundfile as sf
 from loguru import logger
 
-from backend.src import llm, local_transcription
-from backend.src.constants import APPLICATION_WIDTH, OUTPUT_FILE_NAME, RECORD_SEC, SAMPLE_RATE
+from backend.src import capture
+from backend.src.analysis_pipeline import AnalysisPipeline
+from backend.src.audio_buffer import AudioBuffer
+from backend.src.audio_writer import StreamingAudioWriter
+from backend.src.constants import APPLICATION_WIDTH, LIVE_CAPTIONS, OUTPUT_FILE_NAME, SAMPLE_RATE, STREAM_TO_DISK
+from backend.src.live_transcription import LiveTranscriber
+from backend.src.ollama_health import ollama_health
 
 def run_app():
     # Ensure output directory exists
     os.makedirs(os.path.dirname(OUTPUT_FILE_NAME), exist_ok=True)
+    # Watch Ollama from the start, so answers fail fast if it is down
+    ollama_health.start()
 
     # Global variables for recording state
     recording_thread = None
     is_recording = False
     recording_saved = False
+    # Transcription and answers run in the background; events from any analysis but analysis_run are ignored
+    analysis = AnalysisPipeline(lambda run, kind, data: window.write_event_value("-ANALYSIS-", (run, kind, data)))
+    analysis_run = 0
+    answer_boxes = {"short": "-SHORT-", "full": "-FULL-"}
 
     # Set up the GUI
     sg.theme("DarkAmber")
@@ -67,66 +76,21 @@ def run_app():
         resizable=True
     )
 
-    # Function to record from microphone
-    def record_microphone(seconds=RECORD_SEC, sample_rate=SAMPLE_RATE):
-        """Record audio from the microphone."""
-        logger.debug(f"Recording microphone audio for {seconds} second(s)...")
-        try:
-            # Record audio from microphone
-            recording = sd.rec(
-                int(seconds * sample_rate),
-                samplerate=sample_rate,
-                channels=1,
-                dtype='float32'
-            )
-            sd.wait()  # Wait until recording is finished
-            logger.debug("Microphone recording complete.")
-            return recording
-        except Exception as e:
-            logger.error(f"Error recording from microphone: {e}")
-            raise Exception(f"Failed to record from microphone: {e}")
-
-    # Function to record system audio using sounddevice
-    def record_system_audio_alt(seconds=RECORD_SEC, sample_rate=SAMPLE_RATE):
-        """Alternative method to record system audio."""
-        logger.debug(f"Recording system audio for {seconds} second(s) using alternative method...")
-        try:
-            # Try to get system audio devices - this is platform dependent
-            devices = sd.query_devices()
-            logger.debug(f"Available audio devices: {len(devices)}")
-
-            # Try to find a loopback device
-            loopback_device = None
-            for i, device in enumerate(devices):
-                device_name = device['name'].lower()
-                if any(word in device_name for word in ['loopback', 'output', 'monitor', 'system']):
-                    if device.get('max_input_channels', 0) > 0:
-                        loopback_device = i
-                        logger.debug(f"Found potential system audio device: {device['name']} (index {i})")
-                        break
-
-            if loopback_device is not None:
-                logger.debug(f"Using device {loopback_device} for system audio")
-                recording = sd.rec(
-                    int(seconds * sample_rate),
-                    samplerate=sample_rate,
-                    channels=1,
-                    dtype='float32',
-                    device=loopback_device
-                )
-                sd.wait()
-                logger.debug("System audio recording complete.")
-                return recording
-            else:
-                # Fallback to default input device
-                logger.warning("No loopback device found, falling back to default input")
-                return record_microphone(seconds, sample_rate)
-
-        except Exception as e:
-            logger.error(f"Error recording system audio (alt method): {e}")
-            # Fall back to microphone recording if system audio fails
-            logger.warning("Falling back to microphone recording")
-            return record_microphone(seconds, sample_rate)
+    # Function to open a capture stream for the selected source
+    def open_capture(use_system_audio):
+        """Start a streaming capture for the selected source, falling back to the microphone."""
+        if use_system_audio:
+            try:
+                stream = capture.AudioCapture("system")
+                stream.start()
+                logger.debug("Capturing system audio")
+                return stream
+            except Exception as e:
+                logger.error(f"System audio capture failed: {e}. Falling back to microphone.")
+        stream = capture.AudioCapture("microphone")
+        stream.start()
+        logger.debug("Capturing microphone audio")
+        return stream
 
     # Function to save audio data to file
     def save_audio_file(audio_data, output_file=OUTPUT_FILE_NAME):
@@ -143,7 +107,6 @@ def run_app():
     # Recording function that runs in a separate thread
     def recording_worker():
         nonlocal is_recording, recording_saved
-        audio_data = None
 
         logger.debug("Recording thread started")
         window["-STATUS-"].update("Recording...")
@@ -157,45 +120,53 @@ def run_app():
             except Exception as e:
                 logger.error(f"Could not remove previous recording: {e}")
 
-        while is_recording:
-            try:
-                # Choose recording method based on selected audio source
-                use_system_audio = values["-SYSTEM_SOURCE-"]
-                if use_system_audio:
-                    try:
-                        audio_sample = record_system_audio_alt()
-                        logger.debug("Recorded system audio batch")
-                    except Exception as e:
-                        logger.error(f"System audio recording failed: {e}. Falling back to microphone.")
-                        audio_sample = record_microphone()
-                else:
-                    # Use microphone recording
-                    audio_sample = record_microphone()
-                    logger.debug("Recorded microphone audio batch")
-
-                if audio_data is None:
-                    audio_data = audio_sample
-                else:
-                    audio_data = np.vstack((audio_data, audio_sample))
-
-            except Exception as e:
-                logger.error(f"Recording error: {e}")
-                is_recording = False
-                window["-STATUS-"].update(f"Error: {str(e)}")
-                break
+        stream = None
+        audio_data = StreamingAudioWriter() if STREAM_TO_DISK else AudioBuffer()
+        live = None
+        if LIVE_CAPTIONS:
+            live = LiveTranscriber(
+                lambda committed, tentative: window.write_event_value("-LIVE-", f"{committed} {tentative}".strip())
+            ).start()
+        try:
+            if STREAM_TO_DISK:
+                audio_data.start()
+            # One persistent stream for the whole recording, drained block by block
+            stream = open_capture(values["-SYSTEM_SOURCE-"])
+            while is_recording:
+                block = stream.read(timeout=0.5)
+                audio_data.append(block)
+                if live is not None:
+                    live.feed(block)
+            stream.stop()
+            audio_data.append(stream.read(timeout=0))
+        except Exception as e:
+            logger.error(f"Recording error: {e}")
+            is_recording = False
+            window["-STATUS-"].update(f"Error: {str(e)}")
+        finally:
+            if stream is not None:
+                stream.stop()
+            if live is not None:
+                live.stop()
 
         logger.debug("Recording thread ending, saving audio")
         window["-STATUS-"].update("Saving recording...")
 
-        # Save the audio when recording is stopped
-        if audio_data is not None and len(audio_data) > 0:
-            if save_audio_file(audio_data):
-                recording_saved = True
-                window["-STATUS-"].update("Recording saved")
-            else:
-                window["-STATUS-"].update("Failed to save recording")
+        # Save the audio when recording is stopped (a streamed recording only needs closing)
+        if STREAM_TO_DISK:
+            saved = audio_data.close()
         else:
+            saved = len(audio_data) > 0 and save_audio_file(audio_data.to_array())
+
+        if len(audio_data) == 0:
+            if os.path.exists(OUTPUT_FILE_NAME):
+                os.remove(OUTPUT_FILE_NAME)
             window["-STATUS-"].update("No audio recorded")
+        elif saved:
+            recording_saved = True
+            window["-STATUS-"].update("Recording saved")
+        else:
+            window["-STATUS-"].update("Failed to save recording")
 
     # Main event loop
     while True:
@@ -203,12 +174,33 @@ def run_app():
 
         if event in (sg.WIN_CLOSED, "Cancel"):
             logger.debug("Closing application")
-            # Stop recording if active
+            # Stop recording and any running analysis
             is_recording = False
+            analysis.cancel()
             if recording_thread and recording_thread.is_alive():
                 recording_thread.join(timeout=1.0)
             break
 
+        # Live captions posted by the recording thread
+        if event == "-LIVE-":
+            if is_recording:
+                window["-ANALYZED-"].update(values["-LIVE-"])
+            continue
+
+        # Progress of the background analysis
+        if event == "-ANALYSIS-":
+            run, kind, data = values["-ANALYSIS-"]
+            if run != analysis_run:
+                continue
+            if kind == "token":
+                name, token = data
+                window[answer_boxes[name]].update(token, append=True)
+            elif kind == "transcript":
+                window["-ANALYZED-"].update(data)
+            elif kind == "status":
+                window["-STATUS-"].update(data)
+            continue
+
         # Start/stop recording with either button or 'r' key
         if event in ("-RECORD_BUTTON-", "r", "R"):
             if not is_recording:
@@ -219,7 +211,9 @@ def run_app():
                 logger.debug(f"Starting recording from {source_type}")
                 window["-RECORD_BUTTON-"].update(f"🔴 Stop Recording ({source_type})")
 
-                # Clear previous analysis results
+                # Stop any analysis still generating and clear previous results
+                analysis.cancel()
+                analysis_run = 0
                 window["-ANALYZED-"].update("")
                 window["-SHORT-"].update("")
                 window["-FULL-"].update("")
@@ -247,40 +241,12 @@ def run_app():
                 continue
 
             logger.debug("Analyzing audio...")
-            window["-STATUS-"].update("Analyzing...")
-
-            # Transcribe audio
             try:
-                window["-STATUS-"].update("Transcribing audio...")
+                # Replaces (and cancels) any analysis still running
+                analysis_run = analysis.start()
                 window["-ANALYZED-"].update("Transcribing audio...")
-                window.refresh()
-
-                audio_transcript = local_transcription.transcribe_local()
-                window["-ANALYZED-"].update(audio_transcript)
-                window["-STATUS-"].update("Transcription complete")
-                window.refresh()
-
-                # Generate answers if transcription was successful
-                if "error" not in audio_transcript.lower() and "could not" not in audio_transcript.lower():
-                    # Short answer
-                    window["-STATUS-"].update("Generating short answer...")
-                    window["-SHORT-"].update("Generating short answer...")
-                    window.refresh()
-
-                    short_answer = llm.generate_answer(audio_transcript, short_answer=True, temperature=0)
-                    window["-SHORT-"].update(short_answer)
-
-                    # Full answer
-                    window["-STATUS-"].update("Generating full answer...")
-                    window["-FULL-"].update("Generating full answer...")
-                    window.refresh()
-
-                    full_answer = llm.generate_answer(audio_transcript, short_answer=False, temperature=0.2)
-                    window["-FULL-"].update(full_answer)
-
-                    window["-STATUS-"].update("Analysis complete")
-                else:
-                    window["-STATUS-"].update("Transcription failed")
+                window["-SHORT-"].update("")
+                window["-FULL-"].update("")
             except Exception as e:
                 logger.error(f"Error analyzing audio: {e}")
                 window["-ANALYZED-"].update(f"Error: {e}")